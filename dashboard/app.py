@@ -6,6 +6,7 @@ from flask import Flask, send_from_directory, abort
 from flask_cors import CORS
 
 from config import init_config, DASHBOARD_HOST, DASHBOARD_PORT, LOG_LEVEL
+from json_provider import ORJSONProvider, orjson
 from routes import gpu_bp, services_bp, system_bp, openwebui_bp, metrics_bp, totp_bp
 from benchmarking.routes import benchmarks_bp, init_benchmarking
 from chat.routes import chat_bp, init_chat
@@ -17,6 +18,8 @@ def create_app(config=None):
     init_config()
 
     app = Flask(__name__)
+    if orjson is not None:
+        app.json = ORJSONProvider(app)
     app.json.sort_keys = False
     CORS(app)
 
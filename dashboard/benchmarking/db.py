@@ -36,6 +36,17 @@ CREATE INDEX IF NOT EXISTS idx_runs_status ON benchmark_runs(status);
 CREATE INDEX IF NOT EXISTS idx_runs_created ON benchmark_runs(created_at);
 """
 
+INSERT_RUN_SQL = """INSERT INTO benchmark_runs
+   (id, service_name, model_path, status, params_json)
+   VALUES (?, ?, ?, ?, ?)"""
+
+RESULT_COLUMNS_SQL = """pp_avg_ts = ?, pp_stddev_ts = ?,
+   tg_avg_ts = ?, tg_stddev_ts = ?,
+   raw_output = ?,
+   build_commit = ?, model_type = ?,
+   model_size = ?, model_n_params = ?,
+   gpu_info = ?, cpu_info = ?"""
+
 
 class BenchmarkDB:
     def __init__(self, db_path: str = "benchmarks.db"):
@@ -52,6 +63,10 @@ class BenchmarkDB:
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA journal_mode=WAL")
+        # Safe under WAL: fsync once per checkpoint rather than every commit.
+        # Connections are opened per call, so page-cache/mmap tuning would
+        # not survive long enough to pay off.
+        conn.execute("PRAGMA synchronous=NORMAL")
         return conn
 
     def _close_conn(self, conn: sqlite3.Connection):
@@ -91,26 +106,35 @@ class BenchmarkDB:
             cpu_info=row["cpu_info"],
         )
 
+    @staticmethod
+    def _insert_params(run: BenchmarkRun) -> tuple:
+        return (
+            run.id,
+            run.service_name,
+            run.model_path,
+            run.status,
+            json.dumps(run.params_json),
+        )
+
     def create_run(self, run: BenchmarkRun) -> BenchmarkRun:
         conn = self._get_conn()
         try:
-            conn.execute(
-                """INSERT INTO benchmark_runs
-                   (id, service_name, model_path, status, params_json)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (
-                    run.id,
-                    run.service_name,
-                    run.model_path,
-                    run.status,
-                    json.dumps(run.params_json),
-                ),
-            )
+            conn.execute(INSERT_RUN_SQL, self._insert_params(run))
             conn.commit()
             return self.get_run(run.id)
         finally:
             self._close_conn(conn)
 
+    def create_runs(self, runs: List[BenchmarkRun]) -> int:
+        """Insert several runs in one transaction. Returns the number inserted."""
+        conn = self._get_conn()
+        try:
+            conn.executemany(INSERT_RUN_SQL, [self._insert_params(run) for run in runs])
+            conn.commit()
+            return len(runs)
+        finally:
+            self._close_conn(conn)
+
     def get_run(self, run_id: str) -> Optional[BenchmarkRun]:
         conn = self._get_conn()
         try:
@@ -210,15 +234,47 @@ class BenchmarkDB:
         conn = self._get_conn()
         try:
             conn.execute(
-                """UPDATE benchmark_runs SET
-                   pp_avg_ts = ?, pp_stddev_ts = ?,
-                   tg_avg_ts = ?, tg_stddev_ts = ?,
-                   raw_output = ?,
-                   build_commit = ?, model_type = ?,
-                   model_size = ?, model_n_params = ?,
-                   gpu_info = ?, cpu_info = ?
+                f"UPDATE benchmark_runs SET {RESULT_COLUMNS_SQL} WHERE id = ?",
+                (
+                    pp_avg_ts, pp_stddev_ts,
+                    tg_avg_ts, tg_stddev_ts,
+                    raw_output,
+                    build_commit, model_type,
+                    model_size, model_n_params,
+                    gpu_info, cpu_info,
+                    run_id,
+                ),
+            )
+            conn.commit()
+        finally:
+            self._close_conn(conn)
+
+    def complete_run(
+        self,
+        run_id: str,
+        completed_at: str,
+        pp_avg_ts: Optional[float] = None,
+        pp_stddev_ts: Optional[float] = None,
+        tg_avg_ts: Optional[float] = None,
+        tg_stddev_ts: Optional[float] = None,
+        raw_output: Optional[str] = None,
+        build_commit: Optional[str] = None,
+        model_type: Optional[str] = None,
+        model_size: Optional[int] = None,
+        model_n_params: Optional[int] = None,
+        gpu_info: Optional[str] = None,
+        cpu_info: Optional[str] = None,
+    ):
+        """Store results and mark the run completed in a single UPDATE/commit."""
+        conn = self._get_conn()
+        try:
+            conn.execute(
+                f"""UPDATE benchmark_runs SET
+                   status = 'completed', completed_at = ?,
+                   {RESULT_COLUMNS_SQL}
                    WHERE id = ?""",
                 (
+                    completed_at,
                     pp_avg_ts, pp_stddev_ts,
                     tg_avg_ts, tg_stddev_ts,
                     raw_output,
@@ -19,6 +19,12 @@ BENCHMARK_TIMEOUT = 600  # 10 minutes
 LLAMA_BENCH_PATH = "/llama.cpp/build/bin/llama-bench"
 LLAMACPP_IMAGE = "llm-dock-llamacpp"
 
+# llama-bench flags the executor sets itself (model path, JSON output)
+_RESERVED_FLAGS = frozenset({"-m", "-o"})
+
+# libyaml's C loader when PyYAML was built with it; same safe subset
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class BenchmarkExecutor:
     def __init__(self, db: BenchmarkDB, compose_file: str):
@@ -26,6 +32,8 @@ class BenchmarkExecutor:
         self.compose_file = compose_file
         self._lock = threading.Lock()
         self._active_processes: Dict[str, subprocess.Popen] = {}
+        # Parsed compose file, reused while (path, st_ino, st_mtime_ns, st_size) matches
+        self._compose_cache: Optional[tuple] = None
 
     def start_benchmark(
         self, service_name: str, model_path: str, params: Dict[str, str]
@@ -64,11 +72,22 @@ class BenchmarkExecutor:
     def is_running_for_service(self, service_name: str) -> bool:
         return self.db.has_running_benchmark(service_name)
 
+    def _read_compose(self) -> Dict:
+        """Parsed docker-compose.yml, reparsed only when the file changes"""
+        st = os.stat(self.compose_file)
+        key = (self.compose_file, st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._compose_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with open(self.compose_file, "r") as f:
+            compose = yaml.load(f, Loader=_YAML_LOADER) or {}
+        self._compose_cache = (key, compose)
+        return compose
+
     def _get_service_compose_config(self, service_name: str) -> Optional[Dict]:
         """Read the service's config from docker-compose.yml"""
         try:
-            with open(self.compose_file, "r") as f:
-                compose = yaml.safe_load(f) or {}
+            compose = self._read_compose()
             return compose.get("services", {}).get(service_name)
         except Exception as e:
             logger.warning(f"Failed to read compose config for {service_name}: {e}")
@@ -136,7 +155,7 @@ class BenchmarkExecutor:
         ])
 
         for flag, value in params.items():
-            if flag in ("-m", "-o"):
+            if flag in _RESERVED_FLAGS:
                 continue
             cmd.append(flag)
             if value:
@@ -186,9 +205,9 @@ class BenchmarkExecutor:
 
             logger.info(f"Benchmark {run_id}: returncode={proc.returncode}, stdout={len(stdout_text)} bytes, stderr={len(stderr_text)} bytes")
             if stdout_text:
-                logger.debug(f"Benchmark {run_id} stdout (first 500 chars): {stdout_text[:500]!r}")
+                logger.debug("Benchmark %s stdout (first 500 chars): %r", run_id, stdout_text[:500])
             if stderr_text:
-                logger.debug(f"Benchmark {run_id} stderr (first 500 chars): {stderr_text[:500]!r}")
+                logger.debug("Benchmark %s stderr (first 500 chars): %r", run_id, stderr_text[:500])
 
             if proc.returncode != 0:
                 error_msg = stderr_text.strip() or f"llama-bench exited with code {proc.returncode}"
@@ -286,8 +305,10 @@ class BenchmarkExecutor:
             if cpu_info is None:
                 cpu_info = entry.get("cpu_info")
 
-        self.db.update_results(
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.db.complete_run(
             run_id,
+            completed_at=now,
             pp_avg_ts=pp_avg,
             pp_stddev_ts=pp_stddev,
             tg_avg_ts=tg_avg,
@@ -300,9 +321,6 @@ class BenchmarkExecutor:
             gpu_info=gpu_info,
             cpu_info=cpu_info,
         )
-
-        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-        self.db.update_status(run_id, "completed", completed_at=now)
         logger.info(
             f"Benchmark {run_id} completed: pp={pp_avg} t/s, tg={tg_avg} t/s"
         )
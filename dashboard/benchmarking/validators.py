@@ -27,6 +27,7 @@ def validate_flag_name(flag: str) -> Tuple[bool, Optional[str]]:
 
 
 UNSAFE_VALUE_PATTERN = re.compile(r"[;|`$\n]")
+SERVICE_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9\-_]*$")
 
 
 def validate_flag_value(value: str) -> Tuple[bool, Optional[str]]:
@@ -71,7 +72,7 @@ def validate_service_name(service_name: str) -> Tuple[bool, Optional[str]]:
     if len(service_name) > 100:
         return False, "service_name too long"
 
-    if not re.match(r"^[a-zA-Z0-9][a-zA-Z0-9\-_]*$", service_name):
+    if not SERVICE_NAME_PATTERN.match(service_name):
         return False, "service_name contains invalid characters"
 
     return True, None
@@ -2,19 +2,28 @@
 Docker Compose file manager with safe atomic updates.
 """
 
+import copy
+import hashlib
 import os
 import shutil
 import subprocess
 import tempfile
+import threading
 import fcntl
 import yaml
 import json
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Any, Set, Optional
 import logging
 from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 from flag_metadata import render_cli_flag
 
+try:
+    import orjson
+except ImportError:  # optional speedup, see requirements.txt
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # Markers for dynamic services section
@@ -22,6 +31,63 @@ BEGIN_DYNAMIC_MARKER = "# <<<<<<< BEGIN DYNAMIC"
 END_DYNAMIC_MARKER = "# >>>>>>> END DYNAMIC"
 
 
+class ServiceInputError(ValueError):
+    """A service name or config supplied by the caller was rejected."""
+
+
+_jinja_env: Optional[Environment] = None
+
+
+def _get_jinja_env() -> Environment:
+    """Return the process-wide template environment, creating it on first use."""
+    global _jinja_env
+    if _jinja_env is None:
+        template_dir = Path(__file__).parent / "templates"
+        _jinja_env = Environment(
+            loader=FileSystemLoader(str(template_dir)), cache_size=-1, auto_reload=False
+        )
+    return _jinja_env
+
+
+# Rendered service YAML keyed on (service_name, hash of its config). A render
+# depends only on those two and the template files, so an edited config simply
+# misses; old entries age out of the LRU.
+_RENDER_CACHE_SIZE = 256
+_render_cache: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+
+def _config_digest(config: Dict[str, Any]) -> str:
+    canonical = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+# Parsed services.json per path, keyed on the file's identity so external
+# edits are still picked up:
+# {path: ((st_ino, st_mtime_ns, st_size), services, {port: service_name})}
+_services_db_cache: Dict[str, tuple] = {}
+_services_db_cache_lock = threading.Lock()
+
+# Service names and published host ports of the compose file (static services
+# included), keyed the same way: {path: (stat_key, frozenset(names), frozenset(ports))}
+_compose_index_cache: Dict[str, tuple] = {}
+
+
+def _stat_key(path: Path) -> tuple:
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _build_port_index(services: Dict[str, Any]) -> Dict[int, str]:
+    """Map each port to the first service configured on it."""
+    index: Dict[int, str] = {}
+    for name, config in services.items():
+        port = config.get("port") if isinstance(config, dict) else None
+        if port is not None:
+            index.setdefault(port, name)
+    return index
+
+
 class ComposeManager:
     """Manages docker-compose.yml with atomic updates and rollback"""
 
@@ -40,24 +106,20 @@ class ComposeManager:
         # Services database
         self.services_db_path = Path(compose_file).parent / services_db_file
 
-        # Jinja2 environment for templates
-        template_dir = Path(__file__).parent / "templates"
-        self.jinja_env = Environment(loader=FileSystemLoader(str(template_dir)))
-
-    def get_existing_services(self) -> Set[str]:
-        """Get list of existing service names"""
-        config = self._read_compose()
-        return set(config.get("services", {}).keys())
+        # Jinja2 environment for templates (shared, so compiled templates are reused)
+        self.jinja_env = _get_jinja_env()
 
-    def get_used_ports(self) -> Set[int]:
-        """
-        Get set of all ports currently in use by services.
+    def _compose_index(self) -> tuple[frozenset, frozenset]:
+        """(service names, used host ports) of the compose file, parsed once per file version."""
+        path = str(self.compose_path)
+        key = _stat_key(self.compose_path)
+        with _services_db_cache_lock:
+            cached = _compose_index_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
 
-        Returns:
-            Set of port numbers
-        """
         config = self._read_compose()
-        services = config.get("services", {})
+        services = config.get("services") or {}
         used_ports = set()
 
         for service_config in services.values():
@@ -70,7 +132,29 @@ class ComposeManager:
                 elif isinstance(port_mapping, int):
                     used_ports.add(port_mapping)
 
-        return used_ports
+        names, ports = frozenset(services), frozenset(used_ports)
+        with _services_db_cache_lock:
+            _compose_index_cache[path] = (key, names, ports)
+        return names, ports
+
+    def get_existing_services(self) -> Set[str]:
+        """Get list of existing service names"""
+        names, _ = self._compose_index()
+        return set(names)
+
+    def get_used_ports(self) -> Set[int]:
+        """
+        Get set of all ports currently in use by services.
+
+        Returns:
+            Set of port numbers
+        """
+        _, ports = self._compose_index()
+        return set(ports)
+
+    def is_port_used(self, port: int) -> bool:
+        """Whether any compose service publishes ``port``, without copying the port set."""
+        return port in self._compose_index()[1]
 
     def get_next_available_port(
         self, start_port: int = 3301, end_port: int = 3400
@@ -119,7 +203,7 @@ class ComposeManager:
         if not service_name.replace("-", "").replace("_", "").isalnum():
             return False, "Service name must be alphanumeric with hyphens/underscores"
 
-        if service_name in self.get_existing_services():
+        if service_name in self._compose_index()[0]:
             return False, f"Service '{service_name}' already exists"
 
         return True, None
@@ -137,7 +221,7 @@ class ComposeManager:
         if not (1024 <= port <= 65535):
             return False, "Port must be between 1024 and 65535"
 
-        if port in self.get_used_ports():
+        if self.is_port_used(port):
             next_port = self.get_next_available_port()
             return False, f"Port {port} already in use. Next available: {next_port}"
 
@@ -396,17 +480,46 @@ class ComposeManager:
     # SERVICES DATABASE METHODS
     # ============================================
 
-    def _load_services_db(self) -> Dict[str, Any]:
-        """Load services database from JSON file"""
-        if not self.services_db_path.exists():
-            return {}
+    def _cached_services_db(self) -> tuple[Dict[str, Any], Dict[int, str]]:
+        """Return the shared (services, port_index) for services.json.
+
+        Both are cached until the file's inode, mtime or size changes and
+        must not be mutated.
+        """
+        path = str(self.services_db_path)
+        try:
+            key = _stat_key(self.services_db_path)
+        except FileNotFoundError:
+            return {}, {}
+
+        with _services_db_cache_lock:
+            cached = _services_db_cache.get(path)
+            if cached is not None and cached[0] == key:
+                return cached[1], cached[2]
 
         try:
-            with open(self.services_db_path, "r") as f:
-                return json.load(f)
+            with open(self.services_db_path, "rb") as f:
+                raw = f.read()
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            services = orjson.loads(raw) if orjson else json.loads(raw)
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in services.json: {e}")
-            return {}
+            return {}, {}
+
+        port_index = _build_port_index(services)
+        with _services_db_cache_lock:
+            _services_db_cache[path] = (key, services, port_index)
+        return services, port_index
+
+    def _load_services_db(self) -> Dict[str, Any]:
+        """Load services database from JSON file; a private copy callers may mutate."""
+        services, _ = self._cached_services_db()
+        return copy.deepcopy(services)
+
+    def service_on_port(self, port: int) -> Optional[str]:
+        """Name of the service configured on ``port`` in services.json, if any."""
+        _, port_index = self._cached_services_db()
+        return port_index.get(port)
 
     def _save_services_db(self, services: Dict[str, Any]):
         """Save services database to JSON file atomically.
@@ -431,6 +544,14 @@ class ComposeManager:
                 os.unlink(tmp_path)
             raise
 
+        with _services_db_cache_lock:
+            saved = copy.deepcopy(services)
+            _services_db_cache[str(self.services_db_path)] = (
+                _stat_key(self.services_db_path),
+                saved,
+                _build_port_index(saved),
+            )
+
     def save_services_db(self, services: Dict[str, Any]):
         """Replace the entire services database in one write.
 
@@ -472,25 +593,26 @@ class ComposeManager:
             new_name: New service name
 
         Raises:
-            ValueError: If old service doesn't exist or new name is invalid/taken
+            ServiceInputError: If old service doesn't exist or new name is invalid/taken
+            ValueError: If the rebuilt compose file is invalid
         """
         # Validate new name (skip the "already exists" check done by validate_service_name
         # since we do our own check)
         if not new_name:
-            raise ValueError("Service name cannot be empty")
+            raise ServiceInputError("Service name cannot be empty")
         if len(new_name) > 63:
-            raise ValueError("Service name too long (max 63 characters)")
+            raise ServiceInputError("Service name too long (max 63 characters)")
         if not new_name.replace("-", "").replace("_", "").isalnum():
-            raise ValueError(
+            raise ServiceInputError(
                 "Service name must be alphanumeric with hyphens/underscores"
             )
 
         services = self._load_services_db()
 
         if old_name not in services:
-            raise ValueError(f"Service '{old_name}' not found in database")
+            raise ServiceInputError(f"Service '{old_name}' not found in database")
         if new_name in services:
-            raise ValueError(f"Service '{new_name}' already exists")
+            raise ServiceInputError(f"Service '{new_name}' already exists")
 
         # Pop old key and insert under new key
         config = services.pop(old_name)
@@ -501,9 +623,10 @@ class ComposeManager:
         self.rebuild_compose_file()
 
     def get_service_from_db(self, service_name: str) -> Optional[Dict[str, Any]]:
-        """Get service config from database"""
-        services = self._load_services_db()
-        return services.get(service_name)
+        """Get service config from database (a private copy of just that entry)"""
+        services, _ = self._cached_services_db()
+        config = services.get(service_name)
+        return copy.deepcopy(config) if config is not None else None
 
     def list_services_in_db(self) -> Dict[str, Any]:
         """List all services in database"""
@@ -522,7 +645,8 @@ class ComposeManager:
 
     def _render_service(self, service_name: str, config: Dict[str, Any]) -> str:
         """
-        Render service YAML from template and config.
+        Render service YAML from template and config, reusing a cached render
+        when this service's config is unchanged.
 
         Args:
             service_name: Name of the service
@@ -531,6 +655,22 @@ class ComposeManager:
         Returns:
             Rendered YAML as string
         """
+        key = (service_name, _config_digest(config))
+        with _render_cache_lock:
+            rendered = _render_cache.get(key)
+            if rendered is not None:
+                _render_cache.move_to_end(key)
+                return rendered
+
+        rendered = self._render_service_uncached(service_name, config)
+
+        with _render_cache_lock:
+            _render_cache[key] = rendered
+            if len(_render_cache) > _RENDER_CACHE_SIZE:
+                _render_cache.popitem(last=False)
+        return rendered
+
+    def _render_service_uncached(self, service_name: str, config: Dict[str, Any]) -> str:
         template_type = config["template_type"]
 
         try:
@@ -607,21 +747,28 @@ class ComposeManager:
         backup_path = self.compose_path.with_suffix(".yml.backup")
         temp_path = self.compose_path.with_suffix(".yml.tmp")
 
+        with open(self.compose_path, "r") as f:
+            current = f.read()
+
+        # Read file and split into sections
+        prefix, suffix = self._split_compose_content(current)
+
+        # Generate dynamic section from database
+        new_content = prefix + self._generate_dynamic_section() + suffix
+
+        # Nothing changed (e.g. a write that didn't touch rendered fields):
+        # skip the backup, the `docker compose config` validation and the write.
+        if new_content == current:
+            logger.debug("docker-compose.yml already up to date")
+            return
+
         try:
             # Backup current file
             shutil.copy2(self.compose_path, backup_path)
 
-            # Read file and split into sections
-            prefix, suffix = self._split_compose_file()
-
-            # Generate dynamic section from database
-            dynamic_section = self._generate_dynamic_section()
-
             # Write complete file
             with open(temp_path, "w") as f:
-                f.write(prefix)
-                f.write(dynamic_section)
-                f.write(suffix)
+                f.write(new_content)
 
             # Validate
             validation_result = self._validate_compose_file(temp_path)
@@ -655,7 +802,11 @@ class ComposeManager:
         """
         with open(self.compose_path, "r") as f:
             content = f.read()
+        return self._split_compose_content(content)
 
+    @staticmethod
+    def _split_compose_content(content: str) -> tuple[str, str]:
+        """Split compose file content into (prefix, suffix) around the markers."""
         # Find markers
         begin_idx = content.find(BEGIN_DYNAMIC_MARKER)
         end_idx = content.find(END_DYNAMIC_MARKER)
@@ -684,7 +835,8 @@ class ComposeManager:
 
     def _generate_dynamic_section(self) -> str:
         """Generate dynamic section from services database"""
-        services_db = self._load_services_db()
+        # Read-only pass, so the shared cached dict is used without a copy
+        services_db, _ = self._cached_services_db()
 
         if not services_db:
             # No services - return empty string
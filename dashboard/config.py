@@ -19,6 +19,11 @@ OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 # Optional. When set, TOTP (time-based one-time password) authentication is
 # enabled alongside the bearer-token method. Read via ``config.TOTP_SECRET``.
 TOTP_SECRET = os.getenv("TOTP_SECRET")
+# Optional. Host path of Open WebUI's webui.db (e.g. a bind mount of the
+# open-webui data directory). When set and present, service registration
+# reads and writes it directly instead of running a script inside the
+# open-webui container via ``docker exec``. Read via ``config.OPENWEBUI_DB_PATH``.
+OPENWEBUI_DB_PATH = os.getenv("OPENWEBUI_DB_PATH")
 
 
 def set_global_api_key(new_key: str, dotenv_path: str = DOTENV_PATH):
@@ -1,7 +1,10 @@
 import logging
+import os
 import subprocess
+import threading
 import yaml
 import docker
+import requests
 
 from config import COMPOSE_FILE, COMPOSE_PROJECT
 from compose_manager import ComposeManager
@@ -10,6 +13,45 @@ from openwebui_integration import get_openwebui_registered_urls
 
 logger = logging.getLogger(__name__)
 
+# One DockerClient (and its connection pool) for the process, created on first
+# use and dropped when the daemon connection breaks so the next call reconnects.
+_docker_client = None
+_docker_client_lock = threading.Lock()
+
+
+def _get_docker_client():
+    global _docker_client
+    with _docker_client_lock:
+        if _docker_client is None:
+            _docker_client = docker.from_env()
+        return _docker_client
+
+
+def _drop_docker_client(client):
+    global _docker_client
+    with _docker_client_lock:
+        if _docker_client is client:
+            _docker_client = None
+    try:
+        client.close()
+    except Exception:
+        pass
+
+
+def _docker_call(fn):
+    """Return fn(client) for the shared client, reconnecting once if the connection went stale."""
+    client = _get_docker_client()
+    try:
+        return fn(client)
+    except requests.exceptions.ConnectionError:
+        _drop_docker_client(client)
+        return fn(_get_docker_client())
+
+
+def _list_containers(**kwargs):
+    """containers.list() on the shared client."""
+    return _docker_call(lambda client: client.containers.list(**kwargs))
+
 
 def check_nvidia_smi():
     """Check if nvidia-smi is available"""
@@ -27,7 +69,7 @@ def check_nvidia_smi():
 def get_image_build_metadata(image_name: str) -> dict:
     """Get build metadata labels from a Docker image"""
     try:
-        client = docker.from_env()
+        client = _get_docker_client()
         image = client.images.get(image_name)
         labels = image.labels or {}
 
@@ -48,12 +90,48 @@ def get_image_build_metadata(image_name: str) -> dict:
         }
 
 
+# Service names and host ports of COMPOSE_FILE, parsed once per file version:
+# (st_ino, st_mtime_ns, st_size) -> (names, {service_name: host port})
+_compose_cache = {"key": None, "names": frozenset(), "ports": {}}
+_compose_cache_lock = threading.Lock()
+
+
+def _compose_file_index():
+    """(service names, port map) of docker-compose.yml, reparsed only when the file changes"""
+    st = os.stat(COMPOSE_FILE)
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    with _compose_cache_lock:
+        if _compose_cache["key"] == key:
+            return _compose_cache["names"], _compose_cache["ports"]
+
+    with open(COMPOSE_FILE) as f:
+        config = yaml.safe_load(f)
+    services = config.get("services", {})
+
+    port_map = {}
+    for service_name, service_config in services.items():
+        ports = service_config.get("ports", [])
+        if ports:
+            # Parse "3300:8080" format to get host port
+            first_port = str(ports[0])
+            if ":" in first_port:
+                host_port = int(first_port.split(":")[0])
+                port_map[service_name] = host_port
+            else:
+                port_map[service_name] = int(first_port)
+        else:
+            port_map[service_name] = 9999  # No port = sort to end
+
+    names = frozenset(services)
+    with _compose_cache_lock:
+        _compose_cache.update(key=key, names=names, ports=port_map)
+    return names, port_map
+
+
 def get_compose_services():
     """Load service names from docker-compose.yml"""
     try:
-        with open(COMPOSE_FILE) as f:
-            config = yaml.safe_load(f)
-            return set(config.get("services", {}).keys())
+        return set(_compose_file_index()[0])
     except Exception as e:
         logger.error(f"Failed to read compose file: {e}")
         return set()
@@ -62,25 +140,7 @@ def get_compose_services():
 def get_compose_service_ports():
     """Load service port mappings from docker-compose.yml"""
     try:
-        with open(COMPOSE_FILE) as f:
-            config = yaml.safe_load(f)
-            services = config.get("services", {})
-
-            port_map = {}
-            for service_name, service_config in services.items():
-                ports = service_config.get("ports", [])
-                if ports:
-                    # Parse "3300:8080" format to get host port
-                    first_port = str(ports[0])
-                    if ":" in first_port:
-                        host_port = int(first_port.split(":")[0])
-                        port_map[service_name] = host_port
-                    else:
-                        port_map[service_name] = int(first_port)
-                else:
-                    port_map[service_name] = 9999  # No port = sort to end
-
-            return port_map
+        return dict(_compose_file_index()[1])
     except Exception as e:
         logger.error(f"Failed to read compose ports: {e}")
         return {}
@@ -89,10 +149,14 @@ def get_compose_service_ports():
 def check_docker():
     """Check if Docker is available"""
     try:
-        client = docker.from_env()
+        client = _get_docker_client()
+    except Exception:
+        return False
+    try:
         client.ping()
         return True
     except Exception:
+        _drop_docker_client(client)
         return False
 
 
@@ -116,7 +180,6 @@ def _service_kind(config):
 
 def get_docker_services():
     """Get status of compose services from Docker"""
-    client = docker.from_env()
     allowed_services = get_compose_services()
     port_map = get_compose_service_ports()
 
@@ -151,7 +214,7 @@ def get_docker_services():
         return expected_url in openwebui_urls
 
     # Get existing containers
-    containers = client.containers.list(
+    containers = _list_containers(
         all=True, filters={"label": f"com.docker.compose.project={COMPOSE_PROJECT}"}
     )
 
@@ -219,13 +282,12 @@ def get_docker_services():
 
 def get_service_container(service_name):
     """Get container for a specific service"""
-    client = docker.from_env()
     allowed_services = get_compose_services()
 
     if service_name not in allowed_services:
         return None
 
-    containers = client.containers.list(
+    containers = _list_containers(
         all=True,
         filters={
             "label": [
@@ -238,6 +300,21 @@ def get_service_container(service_name):
     return containers[0] if containers else None
 
 
+def get_service_containers(service_names):
+    """Map each of the given services to its container (or None) with one daemon call"""
+    wanted = set(service_names) & get_compose_services()
+    found = {}
+    if wanted:
+        containers = _list_containers(
+            all=True, filters={"label": f"com.docker.compose.project={COMPOSE_PROJECT}"}
+        )
+        for container in containers:
+            name = container.labels.get("com.docker.compose.service")
+            if name in wanted:
+                found.setdefault(name, container)
+    return {name: found.get(name) for name in service_names}
+
+
 def control_service(service_name, action):
     """Control a service (start/stop/restart)"""
     container = get_service_container(service_name)
@@ -1399,6 +1399,22 @@ def validate_custom_flag_name(flag_name: str) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
+def validate_port(value: Any) -> Optional[str]:
+    """
+    Validate a service port number.
+
+    Returns:
+        Error message, or None if the port is valid
+    """
+    try:
+        port = int(value)
+    except (ValueError, TypeError):
+        return f"Invalid port: {value}"
+    if port < 1024 or port > 65535:
+        return f"Port must be between 1024 and 65535, got {port}"
+    return None
+
+
 def validate_service_config(
     template_type: str, config: Dict[str, Any]
 ) -> Tuple[bool, List[str]]:
@@ -1424,12 +1440,9 @@ def validate_service_config(
     if "port" not in config:
         errors.append("Missing port number")
     else:
-        try:
-            port = int(config["port"])
-            if port < 1024 or port > 65535:
-                errors.append(f"Port must be between 1024 and 65535, got {port}")
-        except (ValueError, TypeError):
-            errors.append(f"Invalid port: {config['port']}")
+        port_error = validate_port(config["port"])
+        if port_error:
+            errors.append(port_error)
 
     # Validate params (unified CLI-keyed format)
     params = config.get("params", {})
@@ -3,6 +3,18 @@ import { fetchAPI } from '../api'
 import { startService, stopService, restartService } from '../services/lifecycle'
 import useServicesSSE from './useServicesSSE'
 
+// Open WebUI register/unregister answer 202 with a task_id and apply the
+// change on a background queue. Poll the task until it settles so callers
+// only report success once the change has actually landed.
+async function waitForOpenWebUITask(taskId) {
+  for (;;) {
+    const task = await fetchAPI(`/openwebui/tasks/${taskId}`)
+    if (task.state === 'succeeded') return task
+    if (task.state === 'failed') throw new Error(task.error || 'Open WebUI change failed')
+    await new Promise(resolve => setTimeout(resolve, 250))
+  }
+}
+
 export default function useServiceDetails(serviceName) {
   const [config, setConfig] = useState(null)
   const [configError, setConfigError] = useState(null)
@@ -120,13 +132,18 @@ export default function useServiceDetails(serviceName) {
 
   const registerOpenWebUI = useCallback(async () => {
     const data = await fetchAPI(`/services/${serviceName}/register-openwebui`, { method: 'POST' })
+    if (data.task_id) await waitForOpenWebUITask(data.task_id)
+    // openwebui_registered is not part of the SSE deltas; pull a fresh snapshot.
+    refreshSSE()
     return data
-  }, [serviceName])
+  }, [serviceName, refreshSSE])
 
   const unregisterOpenWebUI = useCallback(async () => {
     const data = await fetchAPI(`/services/${serviceName}/unregister-openwebui`, { method: 'POST' })
+    if (data.task_id) await waitForOpenWebUITask(data.task_id)
+    refreshSSE()
     return data
-  }, [serviceName])
+  }, [serviceName, refreshSSE])
 
   return {
     config, runtime, loading, error, transitioning,
@@ -0,0 +1,75 @@
+"""
+Flask JSON provider backed by orjson.
+
+orjson is optional: create_app only installs ORJSONProvider when it can be
+imported, otherwise Flask's stdlib-based DefaultJSONProvider stays in place.
+"""
+
+import re
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see requirements.txt
+    orjson = None
+
+# orjson parses integers wider than 64 bits as floats. Any input with a run of
+# 20+ digits goes to the stdlib parser instead, so such values stay exact.
+_LONG_DIGITS = re.compile(r"\d{20}")
+_LONG_DIGITS_BYTES = re.compile(rb"\d{20}")
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes and decodes with orjson.
+
+    Datetimes still go through ``default`` (RFC 822 strings), ``sort_keys``
+    and ``compact`` are honoured, and anything orjson refuses (e.g. integers
+    wider than 64 bits, or calls passing json.dumps keyword arguments) falls
+    back to the stdlib encoder. One difference remains: NaN and Infinity are
+    written as ``null`` instead of the stdlib's non-standard bare tokens.
+
+    Parsing accepts what the stdlib accepts: input orjson rejects (NaN,
+    Infinity, out-of-range floats) or would round (integers wider than 64
+    bits) is handed to the stdlib decoder.
+    """
+
+    def _options(self, indent: bool = False) -> int:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        long_digits = _LONG_DIGITS_BYTES if isinstance(s, (bytes, bytearray)) else _LONG_DIGITS
+        if long_digits.search(s):
+            return super().loads(s)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            return super().loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(
+                obj,
+                default=self.default,
+                option=self._options(indent) | orjson.OPT_APPEND_NEWLINE,
+            )
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -3,11 +3,18 @@ Model discovery for HuggingFace cache.
 Adapted from ai-toolbox/models-backup for dashboard use.
 """
 
+import ctypes
+import errno
+import heapq
 import logging
 import os
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any, Set, Tuple, Optional
+from typing import List, Dict, Any, Set, Tuple, Optional, Iterator
 import re
+import threading
+import time
+from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +24,152 @@ _CONTAINER_PATH_MAP = [
     ("/local-models/", os.path.expanduser("~/.cache/models/")),
 ]
 
+# Quantization tag in a GGUF filename: optional UD- prefix + Q/IQ + digit + optional suffix
+_QUANT_RE = re.compile(
+    r'(UD-Q\d+[_A-Z0-9]*'  # UD-Q6_K_XL, UD-Q4_0
+    r'|IQ\d+[_A-Z0-9]*'     # IQ3_XXS, IQ4_XS
+    r'|Q\d+[_A-Z0-9]*)'     # Q4_0, Q5_K_M, Q8_0
+)
+
+# Snapshot subdirectory names that look like a quantization (Q4_0, Q5_K_M, UD-Q6_K_XL, ...)
+_QUANT_DIR_RE = re.compile(r'Q[2-68]|IQ|K_|UD-')
+
+# Significant model file extensions (safetensors, bin, pt, gguf, etc.)
+_MODEL_EXT = ('.safetensors', '.bin', '.pt', '.pth', '.onnx', '.msgpack', '.gguf', '.mmproj')
+_GGUF_EXT = ('.gguf', '.mmproj')
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Results of the module-level discover_* functions:
+# (kind, scan root) -> (root mtime_ns, monotonic time stored, models)
+_discovery_cache: Dict[Tuple[str, str], Tuple[int, float, List[Dict[str, Any]]]] = {}
+_DISCOVERY_CACHE_TTL = 10.0
+
+# Sizes computed by compute_model_size: model directory -> (dir mtime_ns,
+# monotonic time stored, size). Reused on the same terms as _discovery_cache.
+_model_size_cache: Dict[str, Tuple[int, float, int]] = {}
+_MODEL_SIZE_CACHE_TTL = 60.0
+
+# Model directories currently being walked by some thread. A second caller
+# for the same directory gets the last known size (or None) instead of
+# walking it again in parallel.
+_model_size_inflight: Set[str] = set()
+_model_size_lock = threading.Lock()
+
+# Active snapshot per refs/main file, valid while the ref's mtime is unchanged:
+# refs/main path -> (mtime_ns, snapshot path)
+_snapshot_ref_cache: Dict[str, Tuple[int, Path]] = {}
+
+# statx(2) constants (linux/stat.h, linux/fcntl.h)
+_AT_FDCWD = -100
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_TYPE = 0x0001
+_STATX_SIZE = 0x0200
+
+
+class _Statx(ctypes.Structure):
+    """Leading fields of struct statx; the remainder is padding up to its 256-byte size."""
+
+    _fields_ = [
+        ("stx_mask", ctypes.c_uint32),
+        ("stx_blksize", ctypes.c_uint32),
+        ("stx_attributes", ctypes.c_uint64),
+        ("stx_nlink", ctypes.c_uint32),
+        ("stx_uid", ctypes.c_uint32),
+        ("stx_gid", ctypes.c_uint32),
+        ("stx_mode", ctypes.c_uint16),
+        ("stx_spare0", ctypes.c_uint16),
+        ("stx_ino", ctypes.c_uint64),
+        ("stx_size", ctypes.c_uint64),
+        ("stx_rest", ctypes.c_uint8 * 208),
+    ]
+
+
+# None until first use, then the libc statx function or False if unavailable
+_libc_statx = None
+
+# statx failures that describe the path itself; anything else falls back to os.stat
+_PATH_ERRNOS = frozenset({errno.ENOENT, errno.ENOTDIR, errno.EACCES, errno.ELOOP, errno.ENAMETOOLONG})
+
+
+def _load_statx():
+    global _libc_statx
+    if _libc_statx is None:
+        try:
+            fn = ctypes.CDLL(None, use_errno=True).statx
+            fn.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.POINTER(_Statx)]
+            fn.restype = ctypes.c_int
+            _libc_statx = fn
+        except (OSError, AttributeError):
+            _libc_statx = False
+    return _libc_statx
+
+
+def _fast_size(path: str) -> int:
+    """
+    Return the size of the file at path, following symlinks.
+
+    Uses statx() asking only for size and type, without forcing a sync on
+    network filesystems. Falls back to os.stat() where statx is unavailable
+    (non-Linux, glibc < 2.28, kernel < 4.11, or a seccomp profile that
+    rejects it with EPERM). Raises OSError like os.stat().
+    """
+    global _libc_statx
+    statx = _load_statx()
+    if statx:
+        buf = _Statx()
+        if statx(_AT_FDCWD, os.fsencode(path), _AT_STATX_DONT_SYNC, _STATX_TYPE | _STATX_SIZE, ctypes.byref(buf)) == 0:
+            return buf.stx_size
+        err = ctypes.get_errno()
+        if err in _PATH_ERRNOS:
+            raise OSError(err, os.strerror(err), path)
+        if err in (errno.ENOSYS, errno.EPERM):
+            # Not implemented, or blocked by older Docker/runc seccomp profiles
+            _libc_statx = False
+    return os.stat(path).st_size
+
+
+def _iter_files(path) -> Iterator[os.DirEntry]:
+    """Recursively yield file entries under path, without descending into symlinked directories."""
+    try:
+        it = os.scandir(path)
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return
+    with it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_files(entry.path)
+                elif entry.is_file():
+                    yield entry
+            except OSError as e:
+                logger.warning("Failed to read %s: %s", entry.path, e)
+
+
+def _walk_size(path: str) -> int:
+    """Total size of the files under path, following file symlinks and counting each inode once."""
+    seen_inodes = set()
+    size = 0
+    for entry in _iter_files(path):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        inode = (st.st_dev, st.st_ino)
+        if inode not in seen_inodes:
+            seen_inodes.add(inode)
+            size += st.st_size
+    return size
+
+
+def format_size(size_bytes: int) -> str:
+    """Format size in bytes to human-readable format."""
+    if size_bytes < 1024:
+        return f"{size_bytes:.2f} B"
+    # Each unit is 2**10 of the previous one, so the unit index is log2 // 10
+    idx = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (idx * 10)):.2f} {_SIZE_UNITS[idx]}"
+
 
 def resolve_host_path(container_path: str) -> Optional[str]:
     """Translate a container model path to the corresponding host path."""
@@ -33,6 +186,8 @@ def compute_model_size(
     Compute model directory size on-the-fly.
 
     Returns (size_bytes, size_str) or (None, None) if the path cannot be resolved.
+    While another thread is walking the same directory, returns the previously
+    cached size if there is one, else (None, None).
     """
     try:
         target = None
@@ -51,19 +206,27 @@ def compute_model_size(
         if not target or not target.exists():
             return None, None
 
-        seen_inodes = set()
-        size = 0
-        for f in target.rglob("*"):
-            if f.is_file():
-                real = f.resolve()
-                st = real.stat()
-                inode = (st.st_dev, st.st_ino)
-                if inode not in seen_inodes:
-                    seen_inodes.add(inode)
-                    size += st.st_size
+        key = str(target)
+        mtime_ns = os.stat(key).st_mtime_ns
+        now = time.monotonic()
+        with _model_size_lock:
+            cached = _model_size_cache.get(key)
+            if cached and cached[0] == mtime_ns and now - cached[1] < _MODEL_SIZE_CACHE_TTL:
+                return cached[2], format_size(cached[2])
+            if key in _model_size_inflight:
+                if cached:
+                    return cached[2], format_size(cached[2])
+                return None, None
+            _model_size_inflight.add(key)
+        try:
+            size = _walk_size(key)
+            with _model_size_lock:
+                _model_size_cache[key] = (mtime_ns, now, size)
+        finally:
+            with _model_size_lock:
+                _model_size_inflight.discard(key)
 
-        formatter = ModelDiscovery(Path.home())
-        return size, formatter.format_size(size)
+        return size, format_size(size)
 
     except Exception as e:
         logger.debug("Could not compute model size: %s", e)
@@ -88,7 +251,7 @@ class ModelDiscovery:
             for item in path.rglob('*'):
                 # Skip symlinks to avoid double-counting (HuggingFace uses symlinks to blobs)
                 if item.is_file() and not item.is_symlink():
-                    total_size += item.stat().st_size
+                    total_size += _fast_size(str(item))
         except PermissionError:
             # Skip files we can't access
             pass
@@ -96,11 +259,7 @@ class ModelDiscovery:
 
     def format_size(self, size_bytes: int) -> str:
         """Format size in bytes to human-readable format."""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.2f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.2f} PB"
+        return format_size(size_bytes)
 
 
 class GenericModelDiscovery(ModelDiscovery):
@@ -109,65 +268,68 @@ class GenericModelDiscovery(ModelDiscovery):
     def discover(self) -> List[Dict[str, Any]]:
         """Discover GGUF models in a generic directory structure."""
         models = []
+        base_path_str = str(self.base_path)
+
+        # Walk the tree once, grouping GGUF and mmproj files by directory
+        gguf_by_parent = defaultdict(list)
+        mmproj_by_parent = defaultdict(list)
+        for entry in _iter_files(self.base_path):
+            if entry.name.endswith('.gguf'):
+                gguf_by_parent[os.path.dirname(entry.path)].append(entry)
+            elif entry.name.endswith('.mmproj'):
+                mmproj_by_parent[os.path.dirname(entry.path)].append(entry)
+
+        for parent, gguf_entries in gguf_by_parent.items():
+            # mmproj files in the same directory are shared by every GGUF in it
+            mmproj_files = []
+            for item in mmproj_by_parent.get(parent, ()):
+                try:
+                    mmproj_size = item.stat().st_size
+                    mmproj_files.append({
+                        'name': item.name,
+                        'path': item.path,
+                        'actual_path': os.path.realpath(item.path),
+                        'size': mmproj_size,
+                        'size_str': self.format_size(mmproj_size),
+                        'related': True
+                    })
+                except Exception as e:
+                    logger.warning("Failed to read mmproj file %s: %s", item.path, e)
 
-        if not self.base_path.exists():
-            return models
+            # Use relative path from base as the model name prefix if it's not the base path
+            rel_parent = os.path.relpath(parent, base_path_str) if parent != base_path_str else None
 
-        # Find all .gguf files recursively
-        for gguf_file in self.base_path.rglob('*.gguf'):
-            try:
-                size = gguf_file.stat().st_size
-
-                # Extract a display name from the file
-                # Use parent directory name if it's not the base path
-                if gguf_file.parent != self.base_path:
-                    # Use relative path from base as the model name
-                    rel_path = gguf_file.relative_to(self.base_path)
-                    name = str(rel_path.parent / gguf_file.stem)
-                else:
-                    name = gguf_file.stem
-
-                # Check for related files (mmproj, etc.)
-                files = [{
-                    'name': gguf_file.name,
-                    'path': str(gguf_file),
-                    'actual_path': str(gguf_file.resolve()),
-                    'size': size,
-                    'size_str': self.format_size(size)
-                }]
-
-                # Look for mmproj files in same directory
-                for item in gguf_file.parent.iterdir():
-                    if item != gguf_file and item.is_file() and item.suffix == '.mmproj':
-                        try:
-                            mmproj_size = item.stat().st_size
-                            files.append({
-                                'name': item.name,
-                                'path': str(item),
-                                'actual_path': str(item.resolve()),
-                                'size': mmproj_size,
-                                'size_str': self.format_size(mmproj_size),
-                                'related': True
-                            })
-                        except Exception as e:
-                            logger.warning("Failed to read mmproj file %s: %s", item, e)
-
-                total_size = sum(f['size'] for f in files)
-                models.append({
-                    "name": name,
-                    "path": str(gguf_file.parent),
-                    "type": "generic",
-                    "files": files,
-                    "file_count": len(files),
-                    "size": total_size,
-                    "size_str": self.format_size(total_size),
-                    "source_path": str(self.base_path)
-                })
+            for gguf_file in gguf_entries:
+                try:
+                    size = gguf_file.stat().st_size
+                    stem = gguf_file.name[:-5]
+                    name = os.path.join(rel_parent, stem) if rel_parent else stem
+
+                    files = [{
+                        'name': gguf_file.name,
+                        'path': gguf_file.path,
+                        'actual_path': os.path.realpath(gguf_file.path),
+                        'size': size,
+                        'size_str': self.format_size(size)
+                    }]
+                    files.extend(mmproj_files)
+
+                    total_size = sum(f['size'] for f in files)
+                    models.append({
+                        "name": name,
+                        "path": parent,
+                        "type": "generic",
+                        "files": files,
+                        "file_count": len(files),
+                        "size": total_size,
+                        "size_str": self.format_size(total_size),
+                        "source_path": base_path_str
+                    })
 
-            except Exception as e:
-                logger.warning("Failed to process model %s: %s", gguf_file, e)
+                except Exception as e:
+                    logger.warning("Failed to process model %s: %s", gguf_file.path, e)
 
-        return sorted(models, key=lambda x: x["size"], reverse=True)
+        return sorted(models, key=itemgetter("size"), reverse=True)
 
 
 class HuggingFaceDiscovery(ModelDiscovery):
@@ -175,15 +337,21 @@ class HuggingFaceDiscovery(ModelDiscovery):
 
     def _get_active_snapshot(self, model_path: Path) -> Path | None:
         """Get the active snapshot directory from refs/main."""
-        refs_main = model_path / "refs" / "main"
-        if not refs_main.exists():
-            return None
-
+        refs_main = str(model_path / "refs" / "main")
         try:
-            snapshot_hash = refs_main.read_text().strip()
+            mtime_ns = os.stat(refs_main).st_mtime_ns
+            cached = _snapshot_ref_cache.get(refs_main)
+            if cached and cached[0] == mtime_ns:
+                return cached[1]
+
+            with open(refs_main) as f:
+                snapshot_hash = f.read().strip()
             snapshot_path = model_path / "snapshots" / snapshot_hash
-            if snapshot_path.exists():
-                return snapshot_path
+            os.stat(snapshot_path)
+            _snapshot_ref_cache[refs_main] = (mtime_ns, snapshot_path)
+            return snapshot_path
+        except (FileNotFoundError, NotADirectoryError):
+            return None
         except Exception as e:
             logger.warning("Failed to read snapshot ref for %s: %s", model_path.name, e)
 
@@ -198,22 +366,10 @@ class HuggingFaceDiscovery(ModelDiscovery):
         - 'Model-IQ3_XXS.gguf' -> 'IQ3_XXS'
         """
         # Remove .gguf extension
-        name = filename.replace('.gguf', '')
-
-        # Look for quantization patterns
-        # Pattern: Optional UD- prefix + Q/IQ + digit + optional suffix
-        patterns = [
-            r'(UD-Q\d+[_A-Z0-9]*)',  # UD-Q6_K_XL, UD-Q4_0
-            r'(IQ\d+[_A-Z0-9]*)',     # IQ3_XXS, IQ4_XS
-            r'(Q\d+[_A-Z0-9]*)',      # Q4_0, Q5_K_M, Q8_0
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, name.upper())
-            if match:
-                return match.group(1)
+        name = filename[:-5] if filename.endswith('.gguf') else filename
 
-        return None
+        match = _QUANT_RE.search(name.upper())
+        return match.group(1) if match else None
 
     def _get_quantizations(self, snapshot_path: Path) -> tuple[List[str], str]:
         """
@@ -222,35 +378,35 @@ class HuggingFaceDiscovery(ModelDiscovery):
         Returns:
             Tuple of (quantization_list, type) where type is 'directory' or 'file'
         """
-        quantizations = []
-        quant_type = None
-
-        if not snapshot_path.exists():
-            return quantizations, quant_type
+        dir_quants = []
+        gguf_names = []
 
-        # First check for directory-based quantizations
-        for item in snapshot_path.iterdir():
-            if item.is_dir():
-                # Check if this looks like a quantization directory
-                # Typical names: Q4_0, Q5_K_M, UD-Q6_K_XL, etc.
-                name = item.name
-                if any(q in name.upper() for q in ['Q2', 'Q3', 'Q4', 'Q5', 'Q6', 'Q8', 'IQ', 'K_', 'UD-']):
-                    quantizations.append(name)
-                    quant_type = 'directory'
-
-        # If no directory-based quantizations found, check for file-based
-        if not quantizations:
-            seen = set()
-            for item in snapshot_path.iterdir():
-                if item.is_file() and item.name.endswith('.gguf'):
-                    # Extract quantization from filename
-                    quant = self._extract_quantization_from_filename(item.name)
-                    if quant and quant not in seen:
-                        seen.add(quant)
-                        quantizations.append(quant)
-                        quant_type = 'file'
-
-        return sorted(quantizations), quant_type
+        # Read the snapshot once, routing entries into directory and GGUF-file candidates
+        try:
+            with os.scandir(snapshot_path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Check if this looks like a quantization directory
+                        # Typical names: Q4_0, Q5_K_M, UD-Q6_K_XL, etc.
+                        if _QUANT_DIR_RE.search(entry.name.upper()):
+                            dir_quants.append(entry.name)
+                    elif entry.name.endswith('.gguf') and entry.is_file():
+                        gguf_names.append(entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return [], None
+
+        if dir_quants:
+            return sorted(dir_quants), 'directory'
+
+        # No directory-based quantizations found, use file-based
+        file_quants = set()
+        for name in gguf_names:
+            # Extract quantization from filename
+            quant = self._extract_quantization_from_filename(name)
+            if quant:
+                file_quants.add(quant)
+
+        return sorted(file_quants), 'file' if file_quants else None
 
     def _get_blobs_for_quantization(self, quantization_path: Path, is_directory: bool = True) -> Set[str]:
         """
@@ -265,9 +421,6 @@ class HuggingFaceDiscovery(ModelDiscovery):
         """
         blobs = set()
 
-        if not quantization_path.exists():
-            return blobs
-
         if is_directory:
             # Directory-based: scan all files in the directory
             for item in quantization_path.rglob('*'):
@@ -315,23 +468,21 @@ class HuggingFaceDiscovery(ModelDiscovery):
                     matches.append(item)
         return sorted(matches)
 
-    def _get_quantization_size(self, model_path: Path, blobs: Set[str]) -> int:
-        """Calculate total size of blobs for a quantization."""
-        total_size = 0
-        blobs_dir = model_path / "blobs"
-
-        if not blobs_dir.exists():
-            return total_size
-
-        for blob_hash in blobs:
-            blob_path = blobs_dir / blob_hash
-            if blob_path.exists() and blob_path.is_file():
-                try:
-                    total_size += blob_path.stat().st_size
-                except Exception as e:
-                    logger.warning("Failed to stat blob %s: %s", blob_path, e)
+    def _get_blob_sizes(self, model_path: Path) -> Dict[str, int]:
+        """Map blob hash to size for every blob stored under the model directory."""
+        size_by_hash = {}
+        try:
+            with os.scandir(model_path / "blobs") as it:
+                for entry in it:
+                    try:
+                        if entry.is_file():
+                            size_by_hash[entry.name] = _fast_size(entry.path)
+                    except OSError as e:
+                        logger.warning("Failed to stat blob %s: %s", entry.path, e)
+        except (FileNotFoundError, NotADirectoryError):
+            pass
 
-        return total_size
+        return size_by_hash
 
     def _get_files_for_quantization(self, quantization_path: Path, is_directory: bool = True) -> List[Dict[str, Any]]:
         """
@@ -346,60 +497,59 @@ class HuggingFaceDiscovery(ModelDiscovery):
         """
         files = []
 
-        if not quantization_path.exists():
-            return files
-
         if is_directory:
             # Directory-based: find all .gguf and related files
-            for item in sorted(quantization_path.rglob('*')):
-                if item.is_file() and (item.suffix in ['.gguf', '.mmproj'] or 'gguf' in item.name.lower()):
-                    try:
-                        # Resolve symlink to get actual file
-                        actual_path = item.resolve()
-                        size = actual_path.stat().st_size
-
-                        files.append({
-                            'name': item.name,
-                            'path': str(item),
-                            'actual_path': str(actual_path),
-                            'size': size,
-                            'size_str': self.format_size(size)
-                        })
-                    except Exception as e:
-                        logger.warning("Failed to read file %s: %s", item, e)
+            entries = [
+                e for e in _iter_files(quantization_path)
+                if e.name.endswith(_GGUF_EXT) or 'gguf' in e.name.lower()
+            ]
+            entries.sort(key=lambda e: e.path)
+            for entry in entries:
+                try:
+                    # Stat through the symlink to get the actual file
+                    size = entry.stat().st_size
+
+                    files.append({
+                        'name': entry.name,
+                        'path': entry.path,
+                        'actual_path': os.path.realpath(entry.path),
+                        'size': size,
+                        'size_str': self.format_size(size)
+                    })
+                except Exception as e:
+                    logger.warning("Failed to read file %s: %s", entry.path, e)
         else:
             # File-based: single file (or check for related files like mmproj)
             try:
-                actual_path = quantization_path.resolve()
-                size = actual_path.stat().st_size
+                quant_path_str = str(quantization_path)
+                size = os.stat(quant_path_str).st_size
 
                 files.append({
                     'name': quantization_path.name,
-                    'path': str(quantization_path),
-                    'actual_path': str(actual_path),
+                    'path': quant_path_str,
+                    'actual_path': os.path.realpath(quant_path_str),
                     'size': size,
                     'size_str': self.format_size(size)
                 })
 
                 # Check for related non-quantization files (e.g., mmproj)
-                parent_dir = quantization_path.parent
-                for item in parent_dir.iterdir():
-                    if item != quantization_path and item.is_file() and item.suffix in ['.mmproj', '.gguf'] \
-                            and not self._extract_quantization_from_filename(item.name):
-                        try:
-                            actual_path = item.resolve()
-                            size = actual_path.stat().st_size
-
-                            files.append({
-                                'name': item.name,
-                                'path': str(item),
-                                'actual_path': str(actual_path),
-                                'size': size,
-                                'size_str': self.format_size(size),
-                                'related': True  # Mark as related file
-                            })
-                        except Exception as e:
-                            logger.warning("Failed to read related file %s: %s", item, e)
+                with os.scandir(os.path.dirname(quant_path_str)) as it:
+                    for entry in it:
+                        if entry.path != quant_path_str and entry.name.endswith(_GGUF_EXT) and entry.is_file() \
+                                and not self._extract_quantization_from_filename(entry.name):
+                            try:
+                                size = entry.stat().st_size
+
+                                files.append({
+                                    'name': entry.name,
+                                    'path': entry.path,
+                                    'actual_path': os.path.realpath(entry.path),
+                                    'size': size,
+                                    'size_str': self.format_size(size),
+                                    'related': True  # Mark as related file
+                                })
+                            except Exception as e:
+                                logger.warning("Failed to read related file %s: %s", entry.path, e)
 
             except Exception as e:
                 logger.warning("Failed to process quantization %s: %s", quantization_path, e)
@@ -418,124 +568,132 @@ class HuggingFaceDiscovery(ModelDiscovery):
         """
         files = []
 
-        if not snapshot_path.exists():
-            return files
+        entries = [e for e in _iter_files(snapshot_path) if e.name.endswith(_MODEL_EXT)]
+        entries.sort(key=lambda e: e.path)
+        for entry in entries:
+            try:
+                size = entry.stat().st_size
 
-        # Get all significant model files (safetensors, bin, pt, gguf, etc.)
-        model_extensions = ['.safetensors', '.bin', '.pt', '.pth', '.onnx', '.msgpack', '.gguf', '.mmproj']
+                files.append({
+                    'name': entry.name,
+                    'path': entry.path,
+                    'actual_path': os.path.realpath(entry.path),
+                    'size': size,
+                    'size_str': self.format_size(size)
+                })
+            except Exception as e:
+                logger.warning("Failed to read snapshot file %s: %s", entry.path, e)
 
-        for item in sorted(snapshot_path.rglob('*')):
-            if item.is_file() and item.suffix in model_extensions:
-                try:
-                    actual_path = item.resolve()
-                    size = actual_path.stat().st_size
+        return files
 
-                    files.append({
-                        'name': item.name,
-                        'path': str(item),
-                        'actual_path': str(actual_path),
-                        'size': size,
-                        'size_str': self.format_size(size)
-                    })
-                except Exception as e:
-                    logger.warning("Failed to read snapshot file %s: %s", item, e)
+    def _process_model_dir(self, path: Path) -> List[Dict[str, Any]]:
+        """Build the model entries (one per quantization, if any) for a models--org--name directory."""
+        # Extract org and model name
+        parts = path.name.split("--")
+        org = parts[1]
+        model = "--".join(parts[2:])  # Handle names with dashes
+        model_name = f"{org}/{model}"
+
+        # Get active snapshot
+        snapshot_path = self._get_active_snapshot(path)
+        if not snapshot_path:
+            # No snapshot found, list as single model (old behavior)
+            size = self.get_size(path)
+            return [{
+                "name": model_name,
+                "path": str(path),
+                "type": "huggingface",
+                "size": size,
+                "size_str": self.format_size(size)
+            }]
+
+        # Get quantizations
+        quantizations, quant_type = self._get_quantizations(snapshot_path)
 
-        return files
+        if not quantizations:
+            # No quantizations found - get all model files (safetensors, bin, etc.)
+            size = self.get_size(path)
+            files = self._get_snapshot_files(snapshot_path)
+
+            return [{
+                "name": model_name,
+                "path": str(path),
+                "type": "huggingface",
+                "size": size,
+                "size_str": self.format_size(size),
+                "files": files,
+                "file_count": len(files),
+                "snapshot_path": str(snapshot_path)
+            }]
+
+        # Scan the blobs directory once and share it across all quantizations
+        blob_sizes = self._get_blob_sizes(path)
+
+        # Path strings are shared by every quantization entry of this model
+        base_path_str = str(path)
+        snapshot_path_str = str(snapshot_path)
+
+        # List each quantization separately
+        models = []
+        for quant in quantizations:
+            if quant_type == 'directory':
+                # Directory-based quantization
+                quant_path = snapshot_path / quant
+                blobs = self._get_blobs_for_quantization(quant_path, is_directory=True)
+                files = self._get_files_for_quantization(quant_path, is_directory=True)
+            else:  # file-based
+                # File-based quantization (may be sharded)
+                quant_files = self._get_files_for_quantization_flat(snapshot_path, quant)
+                if not quant_files:
+                    continue
+                quant_path = quant_files[0]
+                # Collect blobs and file info from all shards
+                blobs = set()
+                files = []
+                for i, qf in enumerate(quant_files):
+                    blobs |= self._get_blobs_for_quantization(qf, is_directory=False)
+                    shard_files = self._get_files_for_quantization(qf, is_directory=False)
+                    if i == 0:
+                        # First shard: include related files (mmproj etc.)
+                        files.extend(shard_files)
+                    else:
+                        # Subsequent shards: only the shard file itself
+                        files.extend(f for f in shard_files if not f.get('related'))
+
+            size = sum(blob_sizes.get(blob_hash, 0) for blob_hash in blobs)
+
+            models.append({
+                "name": model_name,
+                "quantization": quant,
+                "quantization_type": quant_type,  # 'directory' or 'file'
+                "full_name": f"{model_name} [{quant}]",
+                "base_path": base_path_str,
+                "snapshot_path": snapshot_path_str,
+                "quantization_path": str(quant_path),
+                "files": files,
+                "file_count": len(files),
+                "type": "huggingface",
+                "size": size,
+                "size_str": self.format_size(size)
+            })
+
+        return models
 
     def discover(self) -> List[Dict[str, Any]]:
         """Discover HuggingFace models in the cache directory, listing each quantization separately."""
         models = []
 
-        if not self.base_path.exists():
+        try:
+            model_dirs = list(self.base_path.iterdir())
+        except (FileNotFoundError, NotADirectoryError):
             return models
 
         # HuggingFace uses models--org--name format
-        for path in self.base_path.iterdir():
-            if path.is_dir() and path.name.startswith("models--"):
-                # Extract org and model name
-                parts = path.name.split("--")
-                if len(parts) >= 3:
-                    org = parts[1]
-                    model = "--".join(parts[2:])  # Handle names with dashes
-                    model_name = f"{org}/{model}"
-
-                    # Get active snapshot
-                    snapshot_path = self._get_active_snapshot(path)
-                    if not snapshot_path:
-                        # No snapshot found, list as single model (old behavior)
-                        size = self.get_size(path)
-                        models.append({
-                            "name": model_name,
-                            "path": str(path),
-                            "type": "huggingface",
-                            "size": size,
-                            "size_str": self.format_size(size)
-                        })
-                        continue
-
-                    # Get quantizations
-                    quantizations, quant_type = self._get_quantizations(snapshot_path)
-
-                    if not quantizations:
-                        # No quantizations found - get all model files (safetensors, bin, etc.)
-                        size = self.get_size(path)
-                        files = self._get_snapshot_files(snapshot_path)
-
-                        models.append({
-                            "name": model_name,
-                            "path": str(path),
-                            "type": "huggingface",
-                            "size": size,
-                            "size_str": self.format_size(size),
-                            "files": files,
-                            "file_count": len(files),
-                            "snapshot_path": str(snapshot_path)
-                        })
-                    else:
-                        # List each quantization separately
-                        for quant in quantizations:
-                            if quant_type == 'directory':
-                                # Directory-based quantization
-                                quant_path = snapshot_path / quant
-                                blobs = self._get_blobs_for_quantization(quant_path, is_directory=True)
-                                files = self._get_files_for_quantization(quant_path, is_directory=True)
-                            else:  # file-based
-                                # File-based quantization (may be sharded)
-                                quant_files = self._get_files_for_quantization_flat(snapshot_path, quant)
-                                if not quant_files:
-                                    continue
-                                quant_path = quant_files[0]
-                                # Collect blobs and file info from all shards
-                                blobs = set()
-                                files = []
-                                for i, qf in enumerate(quant_files):
-                                    blobs |= self._get_blobs_for_quantization(qf, is_directory=False)
-                                    shard_files = self._get_files_for_quantization(qf, is_directory=False)
-                                    if i == 0:
-                                        # First shard: include related files (mmproj etc.)
-                                        files.extend(shard_files)
-                                    else:
-                                        # Subsequent shards: only the shard file itself
-                                        files.extend(f for f in shard_files if not f.get('related'))
-
-                            size = self._get_quantization_size(path, blobs)
-
-                            models.append({
-                                "name": model_name,
-                                "quantization": quant,
-                                "quantization_type": quant_type,  # 'directory' or 'file'
-                                "full_name": f"{model_name} [{quant}]",
-                                "base_path": str(path),
-                                "snapshot_path": str(snapshot_path),
-                                "quantization_path": str(quant_path),
-                                "files": files,
-                                "file_count": len(files),
-                                "type": "huggingface",
-                                "size": size,
-                                "size_str": self.format_size(size)
-                            })
-
-        return sorted(models, key=lambda x: x["size"], reverse=True)
+        for path in model_dirs:
+            if path.is_dir() and path.name.startswith("models--") and len(path.name.split("--")) >= 3:
+                models.extend(self._process_model_dir(path))
+
+        return sorted(models, key=itemgetter("size"), reverse=True)
 
 
 def get_disk_usage(path: str = None) -> Dict[str, Any]:
@@ -550,17 +708,15 @@ def get_disk_usage(path: str = None) -> Dict[str, Any]:
         used = total - free
         percent = (used / total) * 100 if total > 0 else 0
 
-        discovery = ModelDiscovery(Path(path))
-
         return {
             "path": path,
             "total": total,
             "used": used,
             "free": free,
             "percent": round(percent, 2),
-            "total_str": discovery.format_size(total),
-            "used_str": discovery.format_size(used),
-            "free_str": discovery.format_size(free)
+            "total_str": format_size(total),
+            "used_str": format_size(used),
+            "free_str": format_size(free)
         }
     except Exception as e:
         return {
@@ -569,6 +725,38 @@ def get_disk_usage(path: str = None) -> Dict[str, Any]:
         }
 
 
+def _cached_discovery(kind: str, path: str, discover_fn) -> List[Dict[str, Any]]:
+    """
+    Return a recent discovery result for path, or run discover_fn and remember it.
+
+    A result is reused while the scan root's mtime is unchanged (a model
+    directory was added or removed) and it is younger than _DISCOVERY_CACHE_TTL.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return discover_fn()
+
+    key = (kind, path)
+    now = time.monotonic()
+    cached = _discovery_cache.get(key)
+    if cached and cached[0] == mtime_ns and now - cached[1] < _DISCOVERY_CACHE_TTL:
+        return cached[2]
+
+    models = discover_fn()
+    _discovery_cache[key] = (mtime_ns, now, models)
+    return models
+
+
+def discover_huggingface_models_fresh(cache_path: str = None) -> List[Dict[str, Any]]:
+    """Discover HuggingFace models, bypassing the discovery cache."""
+    if cache_path is None:
+        cache_path = os.path.expanduser("~/.cache/huggingface/hub")
+
+    discovery = HuggingFaceDiscovery(Path(cache_path))
+    return discovery.discover()
+
+
 def discover_huggingface_models(cache_path: str = None) -> List[Dict[str, Any]]:
     """
     Discover HuggingFace models in the cache directory.
@@ -582,7 +770,14 @@ def discover_huggingface_models(cache_path: str = None) -> List[Dict[str, Any]]:
     if cache_path is None:
         cache_path = os.path.expanduser("~/.cache/huggingface/hub")
 
-    discovery = HuggingFaceDiscovery(Path(cache_path))
+    return _cached_discovery(
+        "huggingface", cache_path, lambda: discover_huggingface_models_fresh(cache_path)
+    )
+
+
+def discover_generic_models_fresh(model_path: str) -> List[Dict[str, Any]]:
+    """Discover GGUF models in a generic directory, bypassing the discovery cache."""
+    discovery = GenericModelDiscovery(Path(model_path))
     return discovery.discover()
 
 
@@ -596,25 +791,21 @@ def discover_generic_models(model_path: str) -> List[Dict[str, Any]]:
     Returns:
         List of model dictionaries with metadata
     """
-    discovery = GenericModelDiscovery(Path(model_path))
-    return discovery.discover()
+    return _cached_discovery("generic", model_path, lambda: discover_generic_models_fresh(model_path))
 
 
-def discover_all_models(additional_paths: List[str] = None) -> List[Dict[str, Any]]:
+def iter_all_models(additional_paths: List[str] = None) -> Iterator[Dict[str, Any]]:
     """
-    Discover models from all configured sources.
+    Lazily yield models from all configured sources, largest first.
+
+    Each source is already sorted by size, so they are merged rather than
+    concatenated and re-sorted.
 
     Args:
         additional_paths: Additional paths to scan for GGUF models
-
-    Returns:
-        Combined list of models from all sources, sorted by size
     """
-    all_models = []
-
     # Discover HuggingFace models
-    hf_models = discover_huggingface_models()
-    all_models.extend(hf_models)
+    sources = [discover_huggingface_models()]
 
     # Default additional paths
     default_additional = [
@@ -628,8 +819,19 @@ def discover_all_models(additional_paths: List[str] = None) -> List[Dict[str, An
     for path in paths_to_scan:
         expanded_path = os.path.expanduser(path)
         if os.path.exists(expanded_path):
-            generic_models = discover_generic_models(expanded_path)
-            all_models.extend(generic_models)
+            sources.append(discover_generic_models(expanded_path))
+
+    return heapq.merge(*sources, key=itemgetter("size"), reverse=True)
+
+
+def discover_all_models(additional_paths: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    Discover models from all configured sources.
+
+    Args:
+        additional_paths: Additional paths to scan for GGUF models
 
-    # Sort all models by size
-    return sorted(all_models, key=lambda x: x["size"], reverse=True)
+    Returns:
+        Combined list of models from all sources, sorted by size
+    """
+    return list(iter_all_models(additional_paths))
@@ -6,375 +6,672 @@ Automatically register/unregister llm-dock services with Open WebUI
 by directly modifying the Open WebUI SQLite database config table.
 """
 
+import contextlib
+import copy
 import json
 import logging
-import subprocess
+import os
+import queue
+import sqlite3
+import struct
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 # Enable more verbose logging for this module
 logger.setLevel(logging.DEBUG)
 
+# Statements used on the shared webui.db connection. Values are always bound
+# as parameters, and the fixed text lets sqlite3's statement cache reuse the
+# prepared statements across calls.
+SELECT_OPENAI_SQL = "SELECT id, json_extract(data, '$.openai') FROM config WHERE id = 1"
+SELECT_URLS_SQL = "SELECT json_extract(data, '$.openai.api_base_urls') FROM config WHERE id = 1"
+UPDATE_OPENAI_SQL = (
+    "UPDATE config SET data = json_set(data, '$.openai', json(?)), updated_at = ? "
+    "WHERE id = ?"
+)
+
+
+def _json_loads(text):
+    """Decode JSON with orjson when it is installed, else the stdlib."""
+    return orjson.loads(text) if orjson else json.loads(text)
+
+
+def _json_dumps(obj) -> str:
+    """Encode JSON to str with orjson when it is installed, else the stdlib."""
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj)
+
+
+def _default_api_config() -> dict:
+    """Per-connection settings Open WebUI expects for an external OpenAI endpoint."""
+    return {
+        "enable": True,
+        "tags": [],
+        "prefix_id": "",
+        "model_ids": [],
+        "connection_type": "external",
+        "auth_type": "bearer",
+    }
+
+
+def _direct_db_path() -> str | None:
+    """Return the webui.db path if it is reachable from this process, else None."""
+    db_path = config.OPENWEBUI_DB_PATH
+    if db_path and os.path.exists(db_path):
+        return db_path
+    return None
+
+
+# Short-lived snapshot of the registered URLs. Status probes (services list,
+# register/unregister checks) hit this instead of webui.db; the registration
+# worker resets it after applying a batch.
+_URL_CACHE_TTL = 2.0
+_url_cache = {"ts": 0.0, "urls": frozenset()}
+
+
+# One long-lived connection to webui.db, shared by all request threads.
+# _conn_lock serialises every use of it.
+_conn: sqlite3.Connection | None = None
+_conn_path: str | None = None
+_conn_lock = threading.Lock()
 
-def get_openwebui_registered_urls() -> list[str]:
+
+def _get_conn(db_path: str) -> sqlite3.Connection:
+    """Return the shared connection, (re)opening it if needed. Caller holds _conn_lock."""
+    global _conn, _conn_path
+    if _conn is None or _conn_path != db_path:
+        _close_conn()
+        _conn = sqlite3.connect(
+            db_path, timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        _conn.execute("PRAGMA busy_timeout=5000")
+        # WAL lets Open WebUI keep reading while we write, and NORMAL syncs
+        # once per checkpoint rather than on every commit. journal_mode is
+        # persistent in the file; the rest only affect this connection.
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.execute("PRAGMA temp_store=MEMORY")
+        # Serve reads of the config row from the OS page cache via mmap and
+        # keep ~16 MB of b-tree pages hot in this connection.
+        _conn.execute("PRAGMA mmap_size=67108864")
+        _conn.execute("PRAGMA cache_size=-16000")
+        _conn_path = db_path
+    return _conn
+
+
+def _close_conn():
+    """Drop the shared connection so the next call reopens it. Caller holds _conn_lock."""
+    global _conn, _conn_path
+    if _conn is not None:
+        try:
+            _conn.close()
+        except sqlite3.Error:
+            pass
+    _conn = None
+    _conn_path = None
+
+
+@contextlib.contextmanager
+def _db_cursor(db_path: str, write: bool = False):
     """
-    Get list of all registered API base URLs from Open WebUI.
+    Yield a cursor on the shared connection while holding _conn_lock.
 
-    Returns:
-        List of registered URLs, or empty list on error
+    With write=True the body runs inside BEGIN IMMEDIATE ... COMMIT so the
+    read-modify-write of the config row cannot interleave with Open WebUI's
+    own writes. On a SQLite error the connection is dropped and reopened on
+    the next call (e.g. after the Open WebUI volume was recreated).
     """
-    try:
-        python_script = """
-import sqlite3
+    with _conn_lock:
+        cursor = _get_conn(db_path).cursor()
+        try:
+            if write:
+                cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                if write:
+                    cursor.execute("ROLLBACK")
+                raise
+            if write:
+                cursor.execute("COMMIT")
+        except sqlite3.Error:
+            _close_conn()
+            raise
+
+
+# Fallback when webui.db is not reachable from this process: one long-lived
+# Python process inside the open-webui container, started on first use over a
+# Docker exec socket. It keeps its SQLite connection open and answers one JSON
+# request per line, so calls skip interpreter startup:
+#   {"op": "get"} -> {"ok": true, "digest": ..., "openai": {...} | null}
+#   {"op": "put", "digest": <as read>, "openai": {...}}
+#       -> {"ok": true} | {"ok": false, "conflict": true}
+# "put" only applies if the openai section still hashes to the digest from
+# the "get"; it compares content, not the second-granular updated_at.
+_HELPER_SCRIPT = """
+import hashlib
 import json
+import sqlite3
+import sys
+from datetime import datetime
 
-try:
-    conn = sqlite3.connect('/app/backend/data/webui.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT data FROM config WHERE id = 1')
-    row = cursor.fetchone()
-
-    if row:
-        data = json.loads(row[0]) if isinstance(row[0], str) else row[0]
-        urls = data.get('openai', {}).get('api_base_urls', [])
-        print(json.dumps(urls))
-    else:
-        print('[]')
+conn = sqlite3.connect('/app/backend/data/webui.db', isolation_level=None)
+conn.execute('PRAGMA busy_timeout=5000')
 
-    conn.close()
-except Exception as e:
-    print('[]')
-"""
-        result = subprocess.run(
-            ['docker', 'exec', 'open-webui', 'python', '-c', python_script],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
 
-        if result.returncode == 0:
-            return json.loads(result.stdout.strip())
-        return []
-    except Exception as e:
-        logger.error(f"Error getting registered URLs: {e}")
-        return []
+def read_openai():
+    return conn.execute(
+        "SELECT json_extract(data, '$.openai') FROM config WHERE id = 1"
+    ).fetchone()
 
 
-def is_service_registered_in_openwebui(service_name: str, engine: str) -> bool:
-    """
-    Check if a service is registered in Open WebUI.
+def digest(openai_json):
+    return hashlib.sha256((openai_json or '').encode()).hexdigest()
 
-    Args:
-        service_name: Name of the service
-        engine: Engine type ("llamacpp" or "vllm")
 
-    Returns:
-        True if registered, False otherwise
-    """
-    internal_port = 8080 if engine == "llamacpp" else 8000
-    base_url = f"http://{service_name}:{internal_port}/v1"
+def put(req):
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        row = read_openai()
+        if not row:
+            conn.execute('ROLLBACK')
+            return {'ok': False, 'error': 'No config found'}
+        if digest(row[0]) != req['digest']:
+            conn.execute('ROLLBACK')
+            return {'ok': False, 'conflict': True}
+        conn.execute(
+            "UPDATE config SET data = json_set(data, '$.openai', json(?)), updated_at = ? "
+            "WHERE id = 1",
+            (json.dumps(req['openai']), datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')),
+        )
+        conn.execute('COMMIT')
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    return {'ok': True}
+
+
+def handle(req):
+    if req['op'] == 'get':
+        row = read_openai()
+        if not row:
+            return {'ok': False, 'error': 'No config found'}
+        return {'ok': True, 'digest': digest(row[0]), 'openai': json.loads(row[0]) if row[0] else None}
+    if req['op'] == 'urls':
+        row = conn.execute(
+            "SELECT json_extract(data, '$.openai.api_base_urls') FROM config WHERE id = 1"
+        ).fetchone()
+        if not row:
+            return {'ok': False, 'error': 'No config found'}
+        return {'ok': True, 'urls': json.loads(row[0]) if row[0] else []}
+    if req['op'] == 'put':
+        return put(req)
+    return {'ok': False, 'error': 'Unknown op: %s' % req['op']}
+
+
+for line in sys.stdin:
+    try:
+        resp = handle(json.loads(line))
+    except Exception as e:
+        resp = {'ok': False, 'error': str(e)}
+    sys.stdout.write(json.dumps(resp) + '\\n')
+    sys.stdout.flush()
+"""
+_HELPER_TIMEOUT = 10
+_HELPER_PUT_ATTEMPTS = 3
 
-    registered_urls = get_openwebui_registered_urls()
-    return base_url in registered_urls
 
+class _OpenWebUIHelper:
+    """A running _HELPER_SCRIPT attached over a Docker exec socket."""
 
-def add_service_to_openwebui(service_name: str, port: int, api_key: str, engine: str):
+    def __init__(self, container):
+        _, sock = container.exec_run(
+            ["python", "-u", "-c", _HELPER_SCRIPT], stdin=True, socket=True
+        )
+        # exec_run hands back a SocketIO wrapper; talk to the socket under it.
+        self._sock = getattr(sock, "_sock", sock)
+        self._sock.settimeout(_HELPER_TIMEOUT)
+        self._buf = b""
+
+    def _recv_exactly(self, n: int) -> bytes:
+        data = b""
+        while len(data) < n:
+            chunk = self._sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("Open WebUI helper exited")
+            data += chunk
+        return data
+
+    def call(self, request: dict) -> dict:
+        self._sock.sendall(_json_dumps(request).encode() + b"\n")
+        # Without a TTY the exec output is multiplexed into frames: an 8-byte
+        # header (stream id, 3 pad bytes, big-endian length) then the payload.
+        while b"\n" not in self._buf:
+            stream, size = struct.unpack(">BxxxL", self._recv_exactly(8))
+            data = self._recv_exactly(size)
+            if stream == 1:
+                self._buf += data
+            else:
+                logger.warning(f"Open WebUI helper stderr: {data.decode(errors='replace').strip()}")
+        line, self._buf = self._buf.split(b"\n", 1)
+        return _json_loads(line)
+
+    def close(self):
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+_helper: _OpenWebUIHelper | None = None
+_helper_lock = threading.Lock()
+
+
+def _helper_call(request: dict) -> dict:
     """
-    Add a newly created service to Open WebUI's configuration.
+    Send one request to the in-container helper, starting it if needed.
 
-    Args:
-        service_name: Name of the service (e.g., "llamacpp-qwen3-vl-8b-q8")
-        port: Host port the service is exposed on
-        api_key: API key for the service
-        engine: Engine type ("llamacpp" or "vllm")
+    If the helper has gone away (e.g. Open WebUI was restarted) it is
+    started again and the request retried once. Any other failure drops the
+    helper so the next call starts from a clean stream.
+    """
+    global _helper
+    # docker_utils imports this module, so resolve the shared client lazily.
+    from docker_utils import _docker_call
+
+    with _helper_lock:
+        for attempt in range(2):
+            if _helper is None:
+                _helper = _OpenWebUIHelper(
+                    _docker_call(lambda client: client.containers.get("open-webui"))
+                )
+            try:
+                return _helper.call(request)
+            except ConnectionError:
+                _helper.close()
+                _helper = None
+                if attempt:
+                    raise
+            except BaseException:
+                _helper.close()
+                _helper = None
+                raise
+
+
+def _update_openai_via_helper(apply, *args):
+    """
+    Read-modify-write the openai section through the helper.
 
-    Returns:
-        bool: True if successful, False otherwise
+    apply(openai_config, *args) returns (openai_config, result); nothing is
+    written when result is falsy. A concurrent write by Open WebUI makes the
+    put conflict, in which case the section is re-read and apply re-run.
+    Returns result, or None on failure.
     """
-    logger.info("=" * 60)
-    logger.info("OPEN WEBUI INTEGRATION: add_service_to_openwebui() called")
-    logger.info(f"  service_name: {service_name}")
-    logger.info(f"  port: {port}")
-    logger.info(f"  api_key: {api_key[:10] if api_key else 'None'}...")
-    logger.info(f"  engine: {engine}")
-    logger.info("=" * 60)
+    for _ in range(_HELPER_PUT_ATTEMPTS):
+        got = _helper_call({"op": "get"})
+        if not got.get("ok"):
+            logger.error(f"Open WebUI helper error: {got.get('error')}")
+            return None
+        openai_config, result = apply(got["openai"], *args)
+        if not result:
+            return result
+        put = _helper_call(
+            {"op": "put", "digest": got["digest"], "openai": openai_config}
+        )
+        if put.get("ok"):
+            return result
+        if not put.get("conflict"):
+            logger.error(f"Open WebUI helper error: {put.get('error')}")
+            return None
+    logger.error("Open WebUI config kept changing underneath us; giving up")
+    return None
 
-    try:
-        # Construct the base URL (internal docker network address)
-        # For llamacpp: http://service:8080/v1
-        # For vllm: http://service:8000/v1
-        internal_port = 8080 if engine == "llamacpp" else 8000
-        base_url = f"http://{service_name}:{internal_port}/v1"
 
-        logger.info(f"Constructed base URL: {base_url}")
+# Last decoded "openai" section, keyed by its JSON text. The text is re-read
+# in every transaction; only the decode is skipped while it is unchanged.
+# Writes patch that one key with json_set instead of re-encoding the whole blob.
+_openai_state = {"json": None, "openai": None}
 
-        # Python script to execute inside the Open WebUI container
-        python_script = f"""
-import sqlite3
-import json
-from datetime import datetime
 
-try:
-    conn = sqlite3.connect('/app/backend/data/webui.db')
-    cursor = conn.cursor()
+def _read_openai(cursor) -> tuple[int | None, dict | None]:
+    """
+    Read the "openai" section of Open WebUI's config row.
 
-    # Read current config
-    cursor.execute('SELECT id, data, version FROM config WHERE id = 1')
+    Returns (config_id, openai) or (None, None) if there is no config row.
+    openai is None when the section does not exist yet. The dict is a
+    private copy the caller may mutate.
+    """
+    cursor.execute(SELECT_OPENAI_SQL)
     row = cursor.fetchone()
-
     if not row:
-        print('ERROR: No config found')
-        exit(1)
+        return None, None
+    config_id, openai_json = row
 
-    config_id, data_json, version = row
-    data = json.loads(data_json)
+    if openai_json is None or _openai_state["json"] != openai_json:
+        _openai_state["openai"] = _json_loads(openai_json) if openai_json else None
+        _openai_state["json"] = openai_json
+    return config_id, copy.deepcopy(_openai_state["openai"])
+
+
+def _write_openai(cursor, config_id: int, openai_config: dict):
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+    cursor.execute(UPDATE_OPENAI_SQL, (_json_dumps(openai_config), now, config_id))
 
-    # Ensure openai section exists
-    if 'openai' not in data:
-        data['openai'] = {{
-            'enable': True,
-            'api_base_urls': [],
-            'api_keys': [],
-            'api_configs': {{}}
-        }}
-
-    openai_config = data['openai']
-
-    # Check if this service is already registered
-    base_url = '{base_url}'
-    if base_url in openai_config.get('api_base_urls', []):
-        print(f'Service already registered: {{base_url}}')
-        exit(0)
-
-    # Add the new service
-    api_base_urls = openai_config.get('api_base_urls', [])
-    api_keys = openai_config.get('api_keys', [])
-    api_configs = openai_config.get('api_configs', {{}})
-
-    # Append new values
-    api_base_urls.append(base_url)
-    api_keys.append('{api_key}')
-
-    # Create new config entry with the next index
-    next_index = str(len(api_base_urls) - 1)
-    api_configs[next_index] = {{
-        'enable': True,
-        'tags': [],
-        'prefix_id': '',
-        'model_ids': [],
-        'connection_type': 'external',
-        'auth_type': 'bearer'
-    }}
-
-    # Update openai section
-    openai_config['enable'] = True
-    openai_config['api_base_urls'] = api_base_urls
-    openai_config['api_keys'] = api_keys
-    openai_config['api_configs'] = api_configs
-
-    data['openai'] = openai_config
-
-    # Save back to database
-    updated_json = json.dumps(data)
-    now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')
-
-    cursor.execute(
-        'UPDATE config SET data = ?, updated_at = ? WHERE id = ?',
-        (updated_json, now, config_id)
-    )
-
-    conn.commit()
-    conn.close()
-
-    print(f'Successfully added {{base_url}} to Open WebUI')
-
-except Exception as e:
-    print(f'ERROR: {{str(e)}}')
-    import traceback
-    traceback.print_exc()
-    exit(1)
-"""
 
-        # Execute the Python script inside the Open WebUI container
-        logger.info("Executing Python script inside 'open-webui' container...")
-        cmd = ['docker', 'exec', 'open-webui', 'python', '-c', python_script]
-        logger.debug(f"Command: docker exec open-webui python -c <script>")
+def _get_registered_urls_direct(db_path: str) -> list[str]:
+    # Let SQLite project just the URL array instead of decoding the whole
+    # openai section (keys and per-connection configs included).
+    with _db_cursor(db_path) as cursor:
+        cursor.execute(SELECT_URLS_SQL)
+        row = cursor.fetchone()
+    if not row or not row[0]:
+        return []
+    return _json_loads(row[0])
+
 
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=10
+def _apply_add(openai_config: dict | None, entries: list[tuple[str, str]]):
+    """Append every (base_url, api_key) not yet registered. Returns (openai_config, added_urls)."""
+    # Ensure openai section exists
+    if openai_config is None:
+        openai_config = {
+            "enable": True, "api_base_urls": [], "api_keys": [], "api_configs": {},
+        }
+    api_base_urls = openai_config.get("api_base_urls", [])
+    api_keys = openai_config.get("api_keys", [])
+    api_configs = openai_config.get("api_configs", {})
+
+    added = []
+    for base_url, api_key in entries:
+        if base_url in api_base_urls:
+            logger.info(f"Service already registered: {base_url}")
+            continue
+        api_base_urls.append(base_url)
+        api_keys.append(api_key)
+        api_configs[str(len(api_base_urls) - 1)] = _default_api_config()
+        added.append(base_url)
+
+    if added:
+        openai_config["enable"] = True
+        openai_config["api_base_urls"] = api_base_urls
+        openai_config["api_keys"] = api_keys
+        openai_config["api_configs"] = api_configs
+    return openai_config, added
+
+
+def _apply_remove(openai_config: dict | None, base_url: str):
+    """Drop base_url and its key/config, reindexing the rest. Returns (openai_config, removed)."""
+    openai_config = openai_config or {}
+    api_base_urls = openai_config.get("api_base_urls", [])
+    if base_url not in api_base_urls:
+        logger.info(f"Service not found: {base_url}")
+        return openai_config, False
+
+    # Indices that survive; everything else is rebuilt from them in one pass
+    keep = [i for i, url in enumerate(api_base_urls) if url != base_url]
+    api_keys = openai_config.get("api_keys", [])
+    old_configs = openai_config.get("api_configs", {})
+
+    new_configs = {}
+    for new_i, old_i in enumerate(keep):
+        api_config = old_configs.get(str(old_i))
+        # Default config for entries without existing config
+        new_configs[str(new_i)] = (
+            api_config if api_config is not None else _default_api_config()
         )
 
-        logger.info(f"subprocess return code: {result.returncode}")
-        logger.info(f"subprocess stdout: {result.stdout.strip()}")
-        if result.stderr:
-            logger.info(f"subprocess stderr: {result.stderr.strip()}")
+    openai_config["api_base_urls"] = [api_base_urls[i] for i in keep]
+    openai_config["api_keys"] = [
+        key
+        for i, key in enumerate(api_keys)
+        if i >= len(api_base_urls) or api_base_urls[i] != base_url
+    ]
+    openai_config["api_configs"] = new_configs
+    return openai_config, True
+
+
+def _apply_changes(openai_config: dict | None, changes: list[tuple[str, str, str]]):
+    """Apply ("add"|"remove", base_url, api_key) changes in order. Returns (openai_config, changed)."""
+    changed = False
+    for op, base_url, api_key in changes:
+        if op == "add":
+            openai_config, added = _apply_add(openai_config, [(base_url, api_key)])
+            changed = changed or bool(added)
+        else:
+            openai_config, removed = _apply_remove(openai_config, base_url)
+            changed = changed or removed
+    return openai_config, changed
+
 
-        if result.returncode != 0:
-            logger.error(f"FAILED to add service to Open WebUI!")
-            logger.error(f"  returncode: {result.returncode}")
-            logger.error(f"  stderr: {result.stderr}")
-            logger.error(f"  stdout: {result.stdout}")
-            return False
+def _update_openai_direct(db_path: str, apply, *args):
+    """
+    Read-modify-write the openai section in one webui.db transaction.
 
-        logger.info(f"SUCCESS: Service '{service_name}' registered with Open WebUI")
-        return True
+    Same contract as _update_openai_via_helper: returns apply's result
+    (nothing is written when it is falsy), or None on failure.
+    """
+    with _db_cursor(db_path, write=True) as cursor:
+        config_id, openai_config = _read_openai(cursor)
+        if config_id is None:
+            logger.error("No Open WebUI config found")
+            return None
+        openai_config, result = apply(openai_config, *args)
+        if result:
+            _write_openai(cursor, config_id, openai_config)
+    return result
+
+
+def _update_openai(apply, *args):
+    """Run _update_openai_direct when webui.db is reachable, else go through the helper."""
+    db_path = _direct_db_path()
+    if db_path:
+        return _update_openai_direct(db_path, apply, *args)
+    return _update_openai_via_helper(apply, *args)
+
+
+def _fetch_registered_urls() -> list[str]:
+    """
+    Read the registered API base URLs from Open WebUI, bypassing the cache.
 
-    except subprocess.TimeoutExpired:
-        logger.error("TIMEOUT while adding service to Open WebUI (10s)")
-        return False
+    Returns:
+        List of registered URLs, or empty list on error
+    """
+    try:
+        db_path = _direct_db_path()
+        if db_path:
+            return _get_registered_urls_direct(db_path)
+
+        got = _helper_call({"op": "urls"})
+        if not got.get("ok"):
+            logger.error(f"Error getting registered URLs: {got.get('error')}")
+            return []
+        return got["urls"]
     except Exception as e:
-        logger.error(f"EXCEPTION in add_service_to_openwebui: {e}", exc_info=True)
-        return False
+        logger.error(f"Error getting registered URLs: {e}")
+        return []
 
 
-def remove_service_from_openwebui(service_name: str, engine: str):
+def get_openwebui_registered_urls() -> frozenset[str]:
     """
-    Remove a service from Open WebUI's configuration.
+    Get all registered API base URLs from Open WebUI.
 
-    Args:
-        service_name: Name of the service to remove
-        engine: Engine type ("llamacpp" or "vllm")
+    The set is cached for _URL_CACHE_TTL seconds, so repeated membership
+    checks reuse the same frozenset.
 
     Returns:
-        bool: True if successful, False otherwise
+        Frozenset of registered URLs, or an empty frozenset on error
     """
-    logger.info("=" * 60)
-    logger.info("OPEN WEBUI INTEGRATION: remove_service_from_openwebui() called")
-    logger.info(f"  service_name: {service_name}")
-    logger.info(f"  engine: {engine}")
-    logger.info("=" * 60)
+    now = time.monotonic()
+    if now - _url_cache["ts"] < _URL_CACHE_TTL:
+        return _url_cache["urls"]
+    urls = frozenset(_fetch_registered_urls())
+    _url_cache["urls"] = urls
+    _url_cache["ts"] = now
+    return urls
 
-    try:
-        # Construct the base URL
-        internal_port = 8080 if engine == "llamacpp" else 8000
-        base_url = f"http://{service_name}:{internal_port}/v1"
 
-        logger.info(f"Constructed base URL to remove: {base_url}")
+def _base_url(service_name: str, engine: str) -> str:
+    """Internal docker network URL: port 8080 for llamacpp, 8000 for vllm."""
+    internal_port = 8080 if engine == "llamacpp" else 8000
+    return f"http://{service_name}:{internal_port}/v1"
 
-        # Python script to execute inside the Open WebUI container
-        python_script = f"""
-import sqlite3
-import json
-from datetime import datetime
 
-try:
-    conn = sqlite3.connect('/app/backend/data/webui.db')
-    cursor = conn.cursor()
+def _event(name: str, fields: dict) -> str:
+    """Render a log event as 'name key=value ...' for the plain-text log."""
+    return " ".join([name, *(f"{key}={value}" for key, value in fields.items())])
 
-    # Read current config
-    cursor.execute('SELECT id, data, version FROM config WHERE id = 1')
-    row = cursor.fetchone()
 
-    if not row:
-        print('ERROR: No config found')
-        exit(1)
+def _log_done(name: str, fields: dict, ok: bool, start: float):
+    """Log the exit event for a register/unregister with its status and elapsed time."""
+    done = {
+        **fields,
+        "status": "ok" if ok else "failed",
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    logger.log(logging.INFO if ok else logging.ERROR, _event(f"{name}.done", done), extra=done)
+
+
+def is_service_registered_in_openwebui(service_name: str, engine: str) -> bool:
+    """
+    Check if a service is registered in Open WebUI.
+
+    Args:
+        service_name: Name of the service
+        engine: Engine type ("llamacpp" or "vllm")
+
+    Returns:
+        True if registered, False otherwise
+    """
+    return _base_url(service_name, engine) in get_openwebui_registered_urls()
 
-    config_id, data_json, version = row
-    data = json.loads(data_json)
 
-    # Check if openai section exists
-    if 'openai' not in data or 'api_base_urls' not in data['openai']:
-        print('No services registered in Open WebUI')
-        exit(0)
+# Register/unregister requests from the dashboard routes are queued and applied
+# by one worker thread. Requests that arrive within _QUEUE_BATCH_WINDOW of each
+# other are written in a single config update. Task state is kept for the
+# status endpoint; only the newest _MAX_TASKS entries are retained.
+_QUEUE_BATCH_WINDOW = 0.05
+_MAX_TASKS = 256
+_registration_queue: queue.Queue = queue.Queue()
+_registration_tasks: dict[str, dict] = {}
+_registration_lock = threading.Lock()
+_registration_worker: threading.Thread | None = None
 
-    openai_config = data['openai']
-    base_url = '{base_url}'
 
-    # Find and remove the service
-    api_base_urls = openai_config.get('api_base_urls', [])
+def _set_task_state(task_ids: list[str], state: str, error: str | None = None):
+    with _registration_lock:
+        for task_id in task_ids:
+            task = _registration_tasks.get(task_id)
+            if task is not None:
+                task["state"] = state
+                task["error"] = error
 
-    if base_url not in api_base_urls:
-        print(f'Service not found: {{base_url}}')
-        exit(0)
-
-    # Get the index to remove
-    index_to_remove = api_base_urls.index(base_url)
-
-    # Remove from all arrays
-    api_base_urls.pop(index_to_remove)
-    api_keys = openai_config.get('api_keys', [])
-    if index_to_remove < len(api_keys):
-        api_keys.pop(index_to_remove)
-
-    # Rebuild api_configs with new indices
-    old_configs = openai_config.get('api_configs', {{}})
-    new_configs = {{}}
-
-    for i in range(len(api_base_urls)):
-        old_index = str(i if i < index_to_remove else i + 1)
-        if old_index in old_configs:
-            new_configs[str(i)] = old_configs[old_index]
-        else:
-            # Default config for entries without existing config
-            new_configs[str(i)] = {{
-                'enable': True,
-                'tags': [],
-                'prefix_id': '',
-                'model_ids': [],
-                'connection_type': 'external',
-                'auth_type': 'bearer'
-            }}
-
-    # Update openai section
-    openai_config['api_base_urls'] = api_base_urls
-    openai_config['api_keys'] = api_keys
-    openai_config['api_configs'] = new_configs
-
-    data['openai'] = openai_config
-
-    # Save back to database
-    updated_json = json.dumps(data)
-    now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')
-
-    cursor.execute(
-        'UPDATE config SET data = ?, updated_at = ? WHERE id = ?',
-        (updated_json, now, config_id)
-    )
-
-    conn.commit()
-    conn.close()
-
-    print(f'Successfully removed {{base_url}} from Open WebUI')
-
-except Exception as e:
-    print(f'ERROR: {{str(e)}}')
-    import traceback
-    traceback.print_exc()
-    exit(1)
-"""
 
-        # Execute the Python script inside the Open WebUI container
-        logger.info("Executing Python script inside 'open-webui' container...")
-        cmd = ['docker', 'exec', 'open-webui', 'python', '-c', python_script]
+def _change_event(op: str) -> str:
+    return "openwebui.register" if op == "add" else "openwebui.unregister"
+
 
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=10
+def _run_registration_batch(batch: list[tuple[str, str, str, str, dict, float]]):
+    """
+    Apply a batch of (task_id, op, base_url, api_key, fields, start) in one
+    config update, then log each task's .done event. elapsed_ms counts from
+    when the task was queued.
+    """
+    task_ids = [task_id for task_id, *_ in batch]
+    _set_task_state(task_ids, "running")
+    error = None
+    try:
+        result = _update_openai(
+            _apply_changes, [(op, base_url, api_key) for _, op, base_url, api_key, *_ in batch]
         )
+        if result is None:
+            error = "Failed to update Open WebUI config. Check dashboard logs."
+    except Exception as e:
+        logger.error(f"EXCEPTION applying queued Open WebUI changes: {e}", exc_info=True)
+        error = str(e)
+
+    for _, op, _, _, fields, start in batch:
+        _log_done(_change_event(op), fields, error is None, start)
+    if error is None:
+        _url_cache["ts"] = 0.0
+        _set_task_state(task_ids, "succeeded")
+        logger.info(f"Applied {len(batch)} queued Open WebUI change(s)")
+    else:
+        _set_task_state(task_ids, "failed", error)
 
-        logger.info(f"subprocess return code: {result.returncode}")
-        logger.info(f"subprocess stdout: {result.stdout.strip()}")
-        if result.stderr:
-            logger.info(f"subprocess stderr: {result.stderr.strip()}")
 
-        if result.returncode != 0:
-            logger.error(f"FAILED to remove service from Open WebUI!")
-            logger.error(f"  returncode: {result.returncode}")
-            logger.error(f"  stderr: {result.stderr}")
-            logger.error(f"  stdout: {result.stdout}")
-            return False
+def _registration_worker_loop():
+    while True:
+        batch = [_registration_queue.get()]
+        deadline = time.monotonic() + _QUEUE_BATCH_WINDOW
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(_registration_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        _run_registration_batch(batch)
 
-        logger.info(f"SUCCESS: Service '{service_name}' removed from Open WebUI")
-        return True
 
-    except subprocess.TimeoutExpired:
-        logger.error("TIMEOUT while removing service from Open WebUI (10s)")
-        return False
-    except Exception as e:
-        logger.error(f"EXCEPTION in remove_service_from_openwebui: {e}", exc_info=True)
-        return False
+def queue_openwebui_change(op: str, service_name: str, engine: str, api_key: str = "") -> str:
+    """
+    Queue registering (op="add") or unregistering (op="remove") a service.
+
+    Args:
+        op: "add" or "remove"
+        service_name: Name of the service
+        engine: Engine type ("llamacpp" or "vllm")
+        api_key: API key for the service (only used for "add")
+
+    Returns:
+        Task id to pass to get_openwebui_change_status()
+    """
+    global _registration_worker
+    if op not in ("add", "remove"):
+        raise ValueError(f"Unknown Open WebUI change: {op}")
+
+    base_url = _base_url(service_name, engine)
+    task_id = uuid.uuid4().hex
+    fields = {"task_id": task_id, "service": service_name, "engine": engine, "base_url": base_url}
+    logger.info(_event(_change_event(op), fields), extra=fields)
+
+    with _registration_lock:
+        _registration_tasks[task_id] = {
+            "task_id": task_id,
+            "op": op,
+            "service": service_name,
+            "state": "queued",
+            "error": None,
+        }
+        if len(_registration_tasks) > _MAX_TASKS:
+            for old_id in list(_registration_tasks)[: len(_registration_tasks) - _MAX_TASKS]:
+                del _registration_tasks[old_id]
+        if _registration_worker is None or not _registration_worker.is_alive():
+            _registration_worker = threading.Thread(
+                target=_registration_worker_loop, name="openwebui-registration", daemon=True
+            )
+            _registration_worker.start()
+
+    _registration_queue.put((task_id, op, base_url, api_key, fields, time.perf_counter()))
+    return task_id
+
+
+def get_openwebui_change_status(task_id: str) -> dict | None:
+    """
+    Look up a task queued by queue_openwebui_change().
+
+    Returns:
+        Dict with task_id, op, service, state (queued/running/succeeded/failed)
+        and error, or None if the task id is unknown
+    """
+    with _registration_lock:
+        task = _registration_tasks.get(task_id)
+        return dict(task) if task is not None else None
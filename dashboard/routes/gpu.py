@@ -1,24 +1,41 @@
 import json
 import logging
+import threading
 import time
-from datetime import datetime
 from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 from auth import require_auth
 from docker_utils import get_gpu_stats
+from timestamps import utc_now_iso
 
 logger = logging.getLogger(__name__)
 
 gpu_bp = Blueprint("gpu", __name__)
 
+# Pollers and stream subscribers share one nvidia-smi result for this long,
+# so the fork happens at most a couple of times per second.
+_GPU_CACHE_TTL = 0.5
+_gpu_cache = {"ts": 0.0, "data": None}
+_gpu_cache_lock = threading.Lock()
+
+
+def _cached_gpu_stats():
+    """Return (gpus, timestamp), reusing a result younger than _GPU_CACHE_TTL."""
+    with _gpu_cache_lock:
+        if _gpu_cache["data"] is None or time.monotonic() - _gpu_cache["ts"] >= _GPU_CACHE_TTL:
+            gpus = get_gpu_stats()
+            _gpu_cache["data"] = (gpus, utc_now_iso())
+            _gpu_cache["ts"] = time.monotonic()
+        return _gpu_cache["data"]
+
 
 @gpu_bp.route("/api/gpu", methods=["GET"])
 @require_auth
 def gpu_stats():
     """Get GPU statistics"""
     try:
-        gpus = get_gpu_stats()
-        return jsonify({"gpus": gpus, "timestamp": datetime.utcnow().isoformat() + "Z"})
+        gpus, timestamp = _cached_gpu_stats()
+        return jsonify({"gpus": gpus, "timestamp": timestamp})
     except Exception as e:
         logger.error(f"Failed to get GPU stats: {e}")
         return jsonify({"error": f"Failed to retrieve GPU information: {e}"}), 500
@@ -38,11 +55,8 @@ def gpu_stream():
         try:
             while True:
                 try:
-                    gpus = get_gpu_stats()
-                    payload = {
-                        "gpus": gpus,
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                    }
+                    gpus, timestamp = _cached_gpu_stats()
+                    payload = {"gpus": gpus, "timestamp": timestamp}
                     yield f"data: {json.dumps(payload)}\n\n"
                 except Exception as e:
                     logger.error(f"gpu stream tick failed: {e}")
@@ -103,11 +103,11 @@ def _fetch_metrics(host_port: int, engine: str, api_key: str = "") -> dict:
             f"http://127.0.0.1:{host_port}/metrics", timeout=2, headers=headers
         )
         if resp.status_code != 200:
-            logger.debug(f"Metrics endpoint returned {resp.status_code}")
+            logger.debug("Metrics endpoint returned %s", resp.status_code)
             return {}
         return _parse_metrics(resp.text, engine)
     except (requests.ConnectionError, requests.Timeout, requests.RequestException) as e:
-        logger.debug(f"Failed to fetch metrics: {e}")
+        logger.debug("Failed to fetch metrics: %s", e)
         return {}
 
 
@@ -120,11 +120,11 @@ def _fetch_slots(host_port: int, api_key: str = ""):
             f"http://127.0.0.1:{host_port}/slots", timeout=2, headers=headers
         )
         if resp.status_code != 200:
-            logger.debug(f"Slots endpoint returned {resp.status_code}")
+            logger.debug("Slots endpoint returned %s", resp.status_code)
             return None
         return resp.json()
     except (requests.ConnectionError, requests.Timeout, requests.RequestException, ValueError) as e:
-        logger.debug(f"Failed to fetch slots: {e}")
+        logger.debug("Failed to fetch slots: %s", e)
         return None
 
 
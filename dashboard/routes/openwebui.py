@@ -1,14 +1,18 @@
 import logging
-import subprocess
-from flask import Blueprint, jsonify, request
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import docker
+from flask import Blueprint, g, jsonify, request
 
 from auth import require_auth
 from config import COMPOSE_FILE
 from compose_manager import ComposeManager
+from docker_utils import _docker_call
 from openwebui_integration import (
-    add_service_to_openwebui,
-    remove_service_from_openwebui,
+    get_openwebui_change_status,
     is_service_registered_in_openwebui,
+    queue_openwebui_change,
 )
 
 logger = logging.getLogger(__name__)
@@ -16,13 +20,20 @@ logger = logging.getLogger(__name__)
 openwebui_bp = Blueprint("openwebui", __name__)
 
 
+def _get_compose_manager() -> ComposeManager:
+    """ComposeManager for the current request, created once and shared by every call in it."""
+    if "compose_mgr" not in g:
+        g.compose_mgr = ComposeManager(COMPOSE_FILE)
+    return g.compose_mgr
+
+
 @openwebui_bp.route("/api/services/<service_name>/register-openwebui", methods=["POST"])
 @require_auth
 def register_service_openwebui(service_name):
     """Manually register a service with Open WebUI."""
     try:
         logger.info(f"=== MANUAL REGISTER OPENWEBUI REQUEST for {service_name} ===")
-        compose_mgr = ComposeManager(COMPOSE_FILE)
+        compose_mgr = _get_compose_manager()
 
         service_config = compose_mgr.get_service_from_db(service_name)
         if not service_config:
@@ -44,22 +55,15 @@ def register_service_openwebui(service_name):
                 }
             ), 200
 
-        success = add_service_to_openwebui(service_name, port, api_key, engine)
-
-        if success:
-            return jsonify(
-                {
-                    "success": True,
-                    "message": f'Service "{service_name}" registered with Open WebUI',
-                }
-            ), 200
-        else:
-            return jsonify(
-                {
-                    "success": False,
-                    "error": "Failed to register service with Open WebUI. Check dashboard logs.",
-                }
-            ), 500
+        logger.info(f"Queueing Open WebUI registration for {service_name} (port {port})")
+        task_id = queue_openwebui_change("add", service_name, engine, api_key)
+        return jsonify(
+            {
+                "success": True,
+                "message": f'Registration of "{service_name}" with Open WebUI queued',
+                "task_id": task_id,
+            }
+        ), 202
 
     except Exception as e:
         logger.error(f"Failed to register service with Open WebUI: {e}", exc_info=True)
@@ -72,7 +76,7 @@ def unregister_service_openwebui(service_name):
     """Manually unregister a service from Open WebUI."""
     try:
         logger.info(f"=== MANUAL UNREGISTER OPENWEBUI REQUEST for {service_name} ===")
-        compose_mgr = ComposeManager(COMPOSE_FILE)
+        compose_mgr = _get_compose_manager()
 
         service_config = compose_mgr.get_service_from_db(service_name)
         if not service_config:
@@ -92,22 +96,14 @@ def unregister_service_openwebui(service_name):
                 }
             ), 200
 
-        success = remove_service_from_openwebui(service_name, engine)
-
-        if success:
-            return jsonify(
-                {
-                    "success": True,
-                    "message": f'Service "{service_name}" unregistered from Open WebUI',
-                }
-            ), 200
-        else:
-            return jsonify(
-                {
-                    "success": False,
-                    "error": "Failed to unregister service from Open WebUI. Check dashboard logs.",
-                }
-            ), 500
+        task_id = queue_openwebui_change("remove", service_name, engine)
+        return jsonify(
+            {
+                "success": True,
+                "message": f'Unregistration of "{service_name}" from Open WebUI queued',
+                "task_id": task_id,
+            }
+        ), 202
 
     except Exception as e:
         logger.error(
@@ -116,36 +112,78 @@ def unregister_service_openwebui(service_name):
         return jsonify({"error": str(e)}), 500
 
 
-@openwebui_bp.route("/api/openwebui/restart", methods=["POST"])
+@openwebui_bp.route("/api/openwebui/tasks/<task_id>", methods=["GET"])
 @require_auth
-def restart_openwebui():
-    """Restart the Open WebUI container to apply configuration changes."""
+def openwebui_task_status(task_id):
+    """Report the state of a queued register/unregister (queued/running/succeeded/failed)."""
+    task = get_openwebui_change_status(task_id)
+    if task is None:
+        return jsonify({"error": f'Task "{task_id}" not found'}), 404
+    return jsonify(task), 200
+
+
+# `docker restart open-webui` can take most of a minute; run it on a single
+# background worker and let the UI poll /api/openwebui/restart/status.
+_restart_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="openwebui-restart")
+_restart_lock = threading.Lock()
+_restart_status = {"state": "idle", "error": None}
+
+
+def _set_restart_status(state, error=None):
+    with _restart_lock:
+        _restart_status["state"] = state
+        _restart_status["error"] = error
+
+
+def _restart_openwebui_worker():
+    """Restart the Open WebUI container and record the outcome in _restart_status."""
     try:
         logger.info("=== RESTARTING OPEN WEBUI CONTAINER ===")
 
-        result = subprocess.run(
-            ["docker", "restart", "open-webui"],
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )
-
-        if result.returncode != 0:
-            logger.error(f"Failed to restart Open WebUI: {result.stderr}")
-            return jsonify(
-                {"success": False, "error": f"Failed to restart: {result.stderr}"}
-            ), 500
+        # The SDK extends the client's HTTP timeout by the restart timeout.
+        _docker_call(lambda client: client.containers.get("open-webui").restart(timeout=30))
 
         logger.info("Open WebUI container restarted successfully")
-        return jsonify(
-            {"success": True, "message": "Open WebUI restarted successfully"}
-        ), 200
+        _set_restart_status("succeeded")
+
+    except docker.errors.NotFound:
+        logger.error("Failed to restart Open WebUI: container not found")
+        _set_restart_status("failed", "Failed to restart: open-webui container not found")
+    except docker.errors.APIError as e:
+        logger.error(f"Failed to restart Open WebUI: {e}")
+        _set_restart_status("failed", f"Failed to restart: {e.explanation or e}")
+    except Exception as e:
+        logger.error(f"Failed to restart Open WebUI: {e}", exc_info=True)
+        _set_restart_status("failed", str(e))
+
 
-    except subprocess.TimeoutExpired:
-        logger.error("Timeout while restarting Open WebUI")
+@openwebui_bp.route("/api/openwebui/restart", methods=["POST"])
+@require_auth
+def restart_openwebui():
+    """Queue a restart of the Open WebUI container to apply configuration changes."""
+    try:
+        with _restart_lock:
+            if _restart_status["state"] == "running":
+                return jsonify(
+                    {"success": True, "state": "running", "message": "Open WebUI restart already in progress"}
+                ), 202
+            _restart_status["state"] = "running"
+            _restart_status["error"] = None
+
+        _restart_executor.submit(_restart_openwebui_worker)
         return jsonify(
-            {"success": False, "error": "Timeout while restarting Open WebUI"}
-        ), 500
+            {"success": True, "state": "running", "message": "Open WebUI restart started"}
+        ), 202
+
     except Exception as e:
-        logger.error(f"Failed to restart Open WebUI: {e}", exc_info=True)
+        logger.error(f"Failed to queue Open WebUI restart: {e}", exc_info=True)
+        _set_restart_status("failed", str(e))
         return jsonify({"error": str(e)}), 500
+
+
+@openwebui_bp.route("/api/openwebui/restart/status", methods=["GET"])
+@require_auth
+def restart_openwebui_status():
+    """Report the state of the most recent Open WebUI restart (idle/running/succeeded/failed)."""
+    with _restart_lock:
+        return jsonify(dict(_restart_status)), 200
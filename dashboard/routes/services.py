@@ -1,31 +1,42 @@
+import hashlib
 import json
 import logging
 import threading
 import time
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Generator
-from flask import Blueprint, jsonify, request, Response, stream_with_context, current_app
+from flask import Blueprint, g, jsonify, request, Response, stream_with_context, current_app
+from werkzeug.exceptions import HTTPException
 
 from auth import require_auth
 from db_lock import SERVICES_DB_LOCK, serialize_db
 import config
 from config import COMPOSE_FILE
-from compose_manager import ComposeManager
-from docker_utils import get_docker_services, get_service_container, control_service
+from compose_manager import ComposeManager, ServiceInputError
+from docker_utils import (
+    get_docker_services,
+    get_service_container,
+    get_service_containers,
+    control_service,
+)
 from model_discovery import compute_model_size
 from service_templates import generate_api_key
+from timestamps import utc_now_iso
 from key_rotation import rotate_keys_in_db
+from services import event_manager
 from flag_metadata import (
     generate_service_name as gen_service_name,
+    validate_port,
     validate_service_config,
     get_flag_metadata,
     MANDATORY_FIELDS,
 )
 from openwebui_integration import (
-    add_service_to_openwebui,
-    remove_service_from_openwebui,
+    get_openwebui_registered_urls,
     is_service_registered_in_openwebui,
+    queue_openwebui_change,
 )
 
 logger = logging.getLogger(__name__)
@@ -36,26 +47,137 @@ services_bp = Blueprint("services", __name__)
 # existing private-looking names used throughout this module.
 _SERVICES_DB_LOCK = SERVICES_DB_LOCK
 _serialize_db = serialize_db
+
+# Fields that update_service can validate on their own; an update touching
+# only these skips the full validate_service_config pass.
+_SINGLE_FIELD_UPDATES = frozenset({"port"})
+
+# Walking a model directory for its size can take seconds on a cold cache.
+# New or re-pointed services get it computed here, filling compute_model_size's
+# cache before the next listing asks for it.
+_model_size_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-size")
+
+
+def _warm_model_size(config):
+    _model_size_executor.submit(
+        compute_model_size, config.get("model_path"), config.get("model_name")
+    )
+
+
+# The /api/services listing, rebuilt at most every _SERVICES_CACHE_TTL
+# seconds. Docker events, mutating requests on this blueprint and changes to
+# the Open WebUI registrations invalidate it sooner; ?fresh=1 bypasses it.
+_SERVICES_CACHE_TTL = 10.0
+_services_cache = {"data": None, "ts": 0.0, "owu_urls": None, "generation": 0}
+_services_cache_lock = threading.Lock()
+
+
+def get_cached_services(fresh=False):
+    """get_docker_services(), served from the cache while it is current.
+
+    The returned list is shared with later callers and must not be mutated.
+    """
+    with _services_cache_lock:
+        entry = dict(_services_cache)
+    owu_urls = get_openwebui_registered_urls()
+    if (
+        not fresh
+        and entry["data"] is not None
+        and time.monotonic() - entry["ts"] < _SERVICES_CACHE_TTL
+        and entry["owu_urls"] == owu_urls
+    ):
+        return entry["data"]
+    services = get_docker_services()
+    set_services_cache(services, owu_urls, entry["generation"])
+    return services
+
+
+def set_services_cache(services, owu_urls, generation):
+    """Store a listing unless the cache was invalidated while it was built."""
+    with _services_cache_lock:
+        if _services_cache["generation"] != generation:
+            return
+        _services_cache.update(data=services, ts=time.monotonic(), owu_urls=owu_urls)
+
+
+def invalidate_services_cache(event=None):
+    """Drop the cached listing. Also registered as a Docker event callback."""
+    with _services_cache_lock:
+        _services_cache["data"] = None
+        _services_cache["generation"] += 1
+
+
+event_manager.register_callback(invalidate_services_cache)
+
+
+@services_bp.after_request
+def _invalidate_services_cache_on_write(response):
+    if request.method != "GET":
+        invalidate_services_cache()
+    return response
+
+
+def _get_compose_manager() -> ComposeManager:
+    """ComposeManager for the current request, created once and shared by every call in it."""
+    if "compose_mgr" not in g:
+        g.compose_mgr = ComposeManager(COMPOSE_FILE)
+    return g.compose_mgr
+
+
+# Only input errors are the client's fault; any other ValueError (an invalid
+# rebuilt compose file, no free port) falls through to the 500 handler.
+@services_bp.errorhandler(ServiceInputError)
+def _handle_input_error(e):
+    return jsonify({"error": str(e)}), 400
+
+
+@services_bp.errorhandler(Exception)
+def _handle_unexpected_error(e):
+    if isinstance(e, HTTPException):
+        return e
+    logger.error("%s failed: %s", request.endpoint, e, exc_info=True)
+    return jsonify({"error": str(e)}), 500
+
+
 def _recreate_if_running(service_name):
     """Recreate the container if it was running. Returns restart status dict."""
-    container = get_service_container(service_name)
-    if not container or container.status != "running":
-        return {"restarted": False}
+    return _recreate_running([service_name])[service_name]
+
+
+def _recreate_running(service_names):
+    """Recreate whichever of the given containers are running.
+
+    All running services go to a single ``docker compose up`` call, which
+    recreates them concurrently. Returns {service_name: restart status dict}.
+    """
+    results = {}
+    running = []
+    for service_name, container in get_service_containers(service_names).items():
+        if not container or container.status != "running":
+            results[service_name] = {"restarted": False}
+        else:
+            running.append(service_name)
+
+    if not running:
+        return results
 
     result = subprocess.run(
         [
             "docker", "compose", "-f", COMPOSE_FILE,
-            "up", "-d", "--force-recreate", service_name,
+            "up", "-d", "--force-recreate", *running,
         ],
-        capture_output=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
         text=True,
         timeout=60,
     )
     if result.returncode != 0:
-        logger.warning(f"Failed to restart {service_name}: {result.stderr}")
-        return {"restarted": False, "error": result.stderr}
-    logger.info(f"Restarted service: {service_name}")
-    return {"restarted": True}
+        logger.warning("Failed to restart %s: %s", ", ".join(running), result.stderr)
+        results.update({name: {"restarted": False, "error": result.stderr} for name in running})
+        return results
+    logger.info("Restarted service(s): %s", ", ".join(running))
+    results.update({name: {"restarted": True} for name in running})
+    return results
 
 
 def _rebuild_and_restart(compose_mgr, service_name):
@@ -69,22 +191,45 @@ def _rebuild_and_restart(compose_mgr, service_name):
 # ============================================
 
 
+# Encoded /api/services body for the most recent listing object:
+# (services list, body, etag). A cached listing is encoded only once.
+_services_list_encoded = {"entry": (None, b"", "")}
+
+
+def _services_list_body(services):
+    data, body, etag = _services_list_encoded["entry"]
+    if data is services:
+        return body, etag
+    running = 0
+    for s in services:
+        running += s["status"] == "running"
+    body = current_app.json.dumps(
+        {
+            "services": services,
+            "total": len(services),
+            "running": running,
+            "stopped": len(services) - running,
+        }
+    ).encode()
+    etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+    _services_list_encoded["entry"] = (services, body, etag)
+    return body, etag
+
+
 @services_bp.route("/api/services", methods=["GET"])
 @require_auth
 def list_services():
     """List all Docker Compose services with live status"""
     try:
-        services = get_docker_services()
-        return jsonify(
-            {
-                "services": services,
-                "total": len(services),
-                "running": sum(1 for s in services if s["status"] == "running"),
-                "stopped": sum(1 for s in services if s["status"] != "running"),
-            }
-        )
+        services = get_cached_services(fresh=request.args.get("fresh") == "1")
+        body, etag = _services_list_body(services)
+        # The UI polls this endpoint; let it revalidate with If-None-Match
+        # and get a 304 when nothing changed.
+        response = Response(body, mimetype="application/json")
+        response.set_etag(etag)
+        return response.make_conditional(request)
     except Exception as e:
-        logger.error(f"Failed to get services: {e}")
+        logger.error("Failed to get services: %s", e)
         return jsonify({"error": "Failed to retrieve service information"}), 500
 
 
@@ -92,25 +237,20 @@ def list_services():
 @require_auth
 def get_service(service_name):
     """Get service configuration from database"""
-    try:
-        compose_mgr = ComposeManager(COMPOSE_FILE)
-        config = compose_mgr.get_service_from_db(service_name)
+    compose_mgr = _get_compose_manager()
+    config = compose_mgr.get_service_from_db(service_name)
 
-        if not config:
-            return jsonify({"error": f'Service "{service_name}" not found'}), 404
+    if not config:
+        return jsonify({"error": f'Service "{service_name}" not found'}), 404
 
-        # Compute model size on-the-fly
-        size, size_str = compute_model_size(
-            config.get("model_path"), config.get("model_name")
-        )
-        config["model_size"] = size
-        config["model_size_str"] = size_str
-
-        return jsonify({"service_name": service_name, "config": config}), 200
+    # Compute model size on-the-fly
+    size, size_str = compute_model_size(
+        config.get("model_path"), config.get("model_name")
+    )
+    config["model_size"] = size
+    config["model_size_str"] = size_str
 
-    except Exception as e:
-        logger.error(f"Failed to get service: {e}")
-        return jsonify({"error": str(e)}), 500
+    return jsonify({"service_name": service_name, "config": config}), 200
 
 
 # ============================================
@@ -132,10 +272,10 @@ def start_service(service_name):
     result = control_service(service_name, "start")
 
     if result["success"]:
-        logger.info(f"Started service: {service_name}")
+        logger.info("Started service: %s", service_name)
         return jsonify(result)
     else:
-        logger.warning(f"Failed to start service {service_name}: {result.get('error')}")
+        logger.warning("Failed to start service %s: %s", service_name, result.get("error"))
         return jsonify(result), 400
 
 
@@ -148,10 +288,10 @@ def stop_service(service_name):
     result = control_service(service_name, "stop")
 
     if result["success"]:
-        logger.info(f"Stopped service: {service_name}")
+        logger.info("Stopped service: %s", service_name)
         return jsonify(result)
     else:
-        logger.warning(f"Failed to stop service {service_name}: {result.get('error')}")
+        logger.warning("Failed to stop service %s: %s", service_name, result.get("error"))
         return jsonify(result), 400
 
 
@@ -164,24 +304,27 @@ def stop_service(service_name):
 @require_auth
 def preview_service(service_name):
     """Get the rendered YAML for a service"""
-    try:
-        manager = ComposeManager(COMPOSE_FILE)
-        yaml_content = manager.preview_service(service_name)
-
-        if yaml_content is None:
-            return jsonify({"error": f"Service {service_name} not found in database"}), 404
+    manager = _get_compose_manager()
+    yaml_content = manager.preview_service(service_name)
 
-        return jsonify({"service_name": service_name, "yaml": yaml_content})
+    if yaml_content is None:
+        return jsonify({"error": f"Service {service_name} not found in database"}), 404
 
-    except Exception as e:
-        logger.error(f"Failed to preview service {service_name}: {e}")
-        return jsonify({"error": str(e)}), 500
+    return jsonify({"service_name": service_name, "yaml": yaml_content})
 
 
 @services_bp.route("/api/services/<service_name>/logs", methods=["GET"])
 @require_auth
 def get_service_logs(service_name):
-    """Get logs from a Docker Compose service"""
+    """Get logs from a Docker Compose service.
+
+    Returns JSON by default. With ?format=text the tail is streamed as
+    plain text chunk by chunk, so it is never held in memory as a whole.
+    """
+    fmt = request.args.get("format", default="json")
+    if fmt not in ("json", "text"):
+        return jsonify({"error": "format must be 'json' or 'text'"}), 400
+
     try:
         container = get_service_container(service_name)
 
@@ -192,19 +335,39 @@ def get_service_logs(service_name):
         tail = request.args.get("tail", default=100, type=int)
         tail = min(tail, 1000)  # Max 1000 lines
 
-        logs = container.logs(tail=tail, timestamps=True).decode("utf-8")
+        if fmt == "text":
+            chunks = container.logs(stream=True, follow=False, tail=tail, timestamps=True)
+
+            def generate():
+                try:
+                    yield from chunks
+                finally:
+                    close = getattr(chunks, "close", None)
+                    if close is not None:
+                        close()
+
+            return Response(
+                stream_with_context(generate()),
+                mimetype="text/plain",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        raw = container.logs(tail=tail, timestamps=True)
+        # Count on the bytes: a memchr scan instead of building a list of lines.
+        lines = raw.count(b"\n") + (not raw.endswith(b"\n")) if raw else 0
+        logs = raw.decode("utf-8", errors="replace")
 
         return jsonify(
             {
                 "service": service_name,
                 "logs": logs,
-                "lines": len(logs.split("\n")) if logs else 0,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "lines": lines,
+                "timestamp": utc_now_iso(),
             }
         )
 
     except Exception as e:
-        logger.error(f"Failed to get logs for service {service_name}: {e}")
+        logger.error("Failed to get logs for service %s: %s", service_name, e)
         return jsonify({"error": f"Failed to retrieve logs: {str(e)}"}), 500
 
 
@@ -234,59 +397,55 @@ def create_service():
         }
     }
     """
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "Request body is required"}), 400
-
-        template_type = data.get("template_type")
-        if not template_type:
-            return jsonify({"error": "template_type is required"}), 400
-        if template_type not in ["llamacpp", "vllm", "ds4"]:
-            return jsonify({"error": 'template_type must be "llamacpp", "vllm", or "ds4"'}), 400
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Request body is required"}), 400
 
-        # Auto-generate API key if not provided
-        if not data.get("api_key"):
-            data["api_key"] = generate_api_key()
+    template_type = data.get("template_type")
+    if not template_type:
+        return jsonify({"error": "template_type is required"}), 400
+    if template_type not in ["llamacpp", "vllm", "ds4"]:
+        return jsonify({"error": 'template_type must be "llamacpp", "vllm", or "ds4"'}), 400
 
-        # Validate configuration
-        valid, errors = validate_service_config(template_type, data)
-        if not valid:
-            return jsonify({"error": "Validation failed", "details": errors}), 400
+    # Auto-generate API key if not provided
+    if not data.get("api_key"):
+        data["api_key"] = generate_api_key()
 
-        # Generate service name from alias
-        service_name = gen_service_name(template_type, data.get("alias"))
+    # Validate configuration
+    valid, errors = validate_service_config(template_type, data)
+    if not valid:
+        return jsonify({"error": "Validation failed", "details": errors}), 400
 
-        compose_mgr = ComposeManager(COMPOSE_FILE)
+    # Generate service name from alias
+    service_name = gen_service_name(template_type, data.get("alias"))
 
-        # Check if service already exists
-        if compose_mgr.get_service_from_db(service_name):
-            return jsonify({"error": f'Service "{service_name}" already exists'}), 409
+    compose_mgr = _get_compose_manager()
 
-        # Check port availability
-        port = int(data["port"])
-        if port in compose_mgr.get_used_ports():
-            return jsonify({"error": f"Port {port} is already in use"}), 409
+    # Check if service already exists
+    if compose_mgr.get_service_from_db(service_name):
+        return jsonify({"error": f'Service "{service_name}" already exists'}), 409
 
-        # Add to database and rebuild
-        compose_mgr.add_service_to_db(service_name, data)
-        compose_mgr.rebuild_compose_file()
+    # Check port availability
+    port = int(data["port"])
+    if compose_mgr.is_port_used(port):
+        return jsonify({"error": f"Port {port} is already in use"}), 409
 
-        logger.info(f"Service created: {service_name} on port {port}")
+    # Add to database and rebuild
+    compose_mgr.add_service_to_db(service_name, data)
+    compose_mgr.rebuild_compose_file()
+    _warm_model_size(data)
 
-        return jsonify(
-            {
-                "success": True,
-                "service_name": service_name,
-                "port": port,
-                "api_key": data["api_key"],
-                "message": f'Service "{service_name}" created successfully',
-            }
-        ), 201
+    logger.info("Service created: %s on port %s", service_name, port)
 
-    except Exception as e:
-        logger.error(f"Failed to create service: {e}", exc_info=True)
-        return jsonify({"error": str(e)}), 500
+    return jsonify(
+        {
+            "success": True,
+            "service_name": service_name,
+            "port": port,
+            "api_key": data["api_key"],
+            "message": f'Service "{service_name}" created successfully',
+        }
+    ), 201
 
 
 # ============================================
@@ -303,65 +462,80 @@ def update_service(service_name):
 
     Note: template_type cannot be changed.
     """
-    try:
-        data = request.get_json()
+    data = request.get_json()
 
-        if not data:
-            return jsonify({"error": "Request body is required"}), 400
+    if not data:
+        return jsonify({"error": "Request body is required"}), 400
 
-        compose_mgr = ComposeManager(COMPOSE_FILE)
+    compose_mgr = _get_compose_manager()
 
-        # Check if service exists
-        existing = compose_mgr.get_service_from_db(service_name)
-        if not existing:
-            return jsonify({"error": f'Service "{service_name}" not found'}), 404
-
-        # Prevent template_type change
-        if (
-            "template_type" in data
-            and data["template_type"] != existing["template_type"]
-        ):
-            return jsonify(
-                {"error": "Cannot change template_type of existing service"}
-            ), 400
-
-        # Use existing template_type
-        template_type = existing["template_type"]
-        data["template_type"] = template_type
-
-        # Validate updated configuration
-        valid, errors = validate_service_config(template_type, data)
-        if not valid:
-            return jsonify({"error": "Validation failed", "details": errors}), 400
-
-        # Check port if changed
-        if "port" in data and int(data["port"]) != int(existing.get("port", 0)):
-            used_ports = compose_mgr.get_used_ports()
-            new_port = int(data["port"])
-            if new_port in used_ports:
-                return jsonify({"error": f"Port {new_port} is already in use"}), 409
+    # Check if service exists
+    existing = compose_mgr.get_service_from_db(service_name)
+    if not existing:
+        return jsonify({"error": f'Service "{service_name}" not found'}), 404
 
-        # Update in database — merge into existing to preserve fields not
-        # sent by the client (favorite, etc.)
-        existing.update(data)
-        compose_mgr.update_service_in_db(service_name, existing)
-
-        # Rebuild compose file
-        compose_mgr.rebuild_compose_file()
+    # Prevent template_type change
+    if (
+        "template_type" in data
+        and data["template_type"] != existing["template_type"]
+    ):
+        return jsonify(
+            {"error": "Cannot change template_type of existing service"}
+        ), 400
 
-        logger.info(f"Service updated: {service_name}")
+    # Use existing template_type
+    template_type = existing["template_type"]
+    data["template_type"] = template_type
 
+    changed = {k: v for k, v in data.items() if existing.get(k) != v}
+    if not changed:
         return jsonify(
             {
                 "success": True,
+                "no_change": True,
                 "service_name": service_name,
-                "message": f'Service "{service_name}" updated successfully',
+                "message": f'Service "{service_name}" is already up to date',
             }
         ), 200
 
-    except Exception as e:
-        logger.error(f"Failed to update service: {e}")
-        return jsonify({"error": str(e)}), 500
+    # Validate only what changed when the update touches nothing but
+    # fields with a standalone validator; otherwise validate in full. A body
+    # missing mandatory fields always gets the full pass, so it is rejected
+    # as before rather than merged into the stored config.
+    mandatory = MANDATORY_FIELDS.get(template_type, [])
+    if changed.keys() <= _SINGLE_FIELD_UPDATES and all(f in data for f in mandatory):
+        port_error = validate_port(changed["port"]) if "port" in changed else None
+        errors = [port_error] if port_error else []
+    else:
+        _, errors = validate_service_config(template_type, data)
+    if errors:
+        return jsonify({"error": "Validation failed", "details": errors}), 400
+
+    # Check port if changed
+    if "port" in data and int(data["port"]) != int(existing.get("port", 0)):
+        new_port = int(data["port"])
+        if compose_mgr.is_port_used(new_port):
+            return jsonify({"error": f"Port {new_port} is already in use"}), 409
+
+    # Update in database — merge into existing to preserve fields not
+    # sent by the client (favorite, etc.)
+    existing.update(data)
+    compose_mgr.update_service_in_db(service_name, existing)
+
+    # Rebuild compose file
+    compose_mgr.rebuild_compose_file()
+    if "model_path" in changed or "model_name" in changed:
+        _warm_model_size(existing)
+
+    logger.info("Service updated: %s", service_name)
+
+    return jsonify(
+        {
+            "success": True,
+            "service_name": service_name,
+            "message": f'Service "{service_name}" updated successfully',
+        }
+    ), 200
 
 
 @services_bp.route("/api/services/<service_name>", methods=["DELETE"])
@@ -369,57 +543,46 @@ def update_service(service_name):
 @_serialize_db
 def delete_service(service_name):
     """Delete service from database and rebuild compose file"""
-    try:
-        compose_mgr = ComposeManager(COMPOSE_FILE)
-
-        # Check if service exists
-        service_config = compose_mgr.get_service_from_db(service_name)
-        if not service_config:
-            return jsonify({"error": f'Service "{service_name}" not found'}), 404
+    compose_mgr = _get_compose_manager()
 
-        # Stop and remove container if running
-        try:
-            subprocess.run(
-                ["docker", "compose", "-f", COMPOSE_FILE, "stop", service_name],
-                capture_output=True,
-                timeout=30,
-            )
-            subprocess.run(
-                ["docker", "compose", "-f", COMPOSE_FILE, "rm", "-f", service_name],
-                capture_output=True,
-                timeout=10,
-            )
-            logger.info(f"Stopped and removed container for: {service_name}")
-        except Exception as e:
-            logger.warning(f"Error stopping container (may not be running): {e}")
+    # Check if service exists
+    service_config = compose_mgr.get_service_from_db(service_name)
+    if not service_config:
+        return jsonify({"error": f'Service "{service_name}" not found'}), 404
 
-        # Remove from database
-        compose_mgr.remove_service_from_db(service_name)
+    # Stop and remove the container through the daemon; no compose CLI needed
+    try:
+        container = get_service_container(service_name)
+        if container:
+            if container.status == "running":
+                container.stop(timeout=30)
+            container.remove(force=True)
+            logger.info("Stopped and removed container for: %s", service_name)
+    except Exception as e:
+        logger.warning("Error stopping container (may not be running): %s", e)
 
-        # Rebuild compose file
-        compose_mgr.rebuild_compose_file()
+    # Remove from database
+    compose_mgr.remove_service_from_db(service_name)
 
-        from services import event_manager
-        event_manager.emit({
-            "service_name": service_name,
-            "action": "service-deleted",
-            "status": "deleted",
-            "container_id": "",
-            "timestamp": time.time(),
-        })
+    # Rebuild compose file
+    compose_mgr.rebuild_compose_file()
 
-        logger.info(f"Service deleted: {service_name}")
+    event_manager.emit({
+        "service_name": service_name,
+        "action": "service-deleted",
+        "status": "deleted",
+        "container_id": "",
+        "timestamp": time.time(),
+    })
 
-        return jsonify(
-            {
-                "success": True,
-                "message": f'Service "{service_name}" deleted successfully',
-            }
-        ), 200
+    logger.info("Service deleted: %s", service_name)
 
-    except Exception as e:
-        logger.error(f"Failed to delete service: {e}")
-        return jsonify({"error": str(e)}), 500
+    return jsonify(
+        {
+            "success": True,
+            "message": f'Service "{service_name}" deleted successfully',
+        }
+    ), 200
 
 
 # ============================================
@@ -436,88 +599,76 @@ def rename_service(service_name):
 
     Request body: {"new_name": "my-new-name"}
     """
-    try:
-        data = request.get_json()
-        if not data or not data.get("new_name"):
-            return jsonify({"error": "new_name is required"}), 400
+    data = request.get_json()
+    if not data or not data.get("new_name"):
+        return jsonify({"error": "new_name is required"}), 400
 
-        new_name = data["new_name"].strip()
+    new_name = data["new_name"].strip()
 
-        compose_mgr = ComposeManager(COMPOSE_FILE)
+    compose_mgr = _get_compose_manager()
 
-        # Check service exists
-        service_config = compose_mgr.get_service_from_db(service_name)
-        if not service_config:
-            return jsonify({"error": f'Service "{service_name}" not found'}), 404
-
-        # Check service is not running
-        container = get_service_container(service_name)
-        if container and container.status == "running":
-            return jsonify(
-                {"error": "Service must be stopped before renaming"}
-            ), 409
-
-        # Handle Open WebUI: unregister old name (best-effort)
-        engine = service_config.get("template_type", "")
-        owu_was_registered = False
-        if engine:
-            try:
-                if is_service_registered_in_openwebui(service_name, engine):
-                    owu_was_registered = True
-                    remove_service_from_openwebui(service_name, engine)
-            except Exception as e:
-                logger.warning(f"Failed to unregister old name from Open WebUI: {e}")
-
-        # Remove old container if it exists (stopped/exited)
-        if container:
-            try:
-                subprocess.run(
-                    ["docker", "compose", "-f", COMPOSE_FILE, "rm", "-f", service_name],
-                    capture_output=True,
-                    timeout=10,
-                )
-            except Exception as e:
-                logger.warning(f"Failed to remove old container: {e}")
-
-        # Rename in services DB and rebuild compose
-        compose_mgr.rename_service(service_name, new_name)
-
-        # Rename in benchmark DB
-        from benchmarking.routes import rename_service as bench_rename
+    # Check service exists
+    service_config = compose_mgr.get_service_from_db(service_name)
+    if not service_config:
+        return jsonify({"error": f'Service "{service_name}" not found'}), 404
 
+    # Check service is not running
+    container = get_service_container(service_name)
+    if container and container.status == "running":
+        return jsonify(
+            {"error": "Service must be stopped before renaming"}
+        ), 409
+
+    # Remember whether Open WebUI knows the old name; it is re-registered
+    # under the new name once the rename is done.
+    engine = service_config.get("template_type", "")
+    owu_was_registered = False
+    if engine:
         try:
-            updated = bench_rename(service_name, new_name)
-            logger.info(
-                f"Updated {updated} benchmark records from '{service_name}' to '{new_name}'"
-            )
+            owu_was_registered = is_service_registered_in_openwebui(service_name, engine)
         except Exception as e:
-            logger.warning(f"Failed to rename benchmarks (non-fatal): {e}")
+            logger.warning("Failed to check Open WebUI registration: %s", e)
 
-        # Re-register with Open WebUI under new name (best-effort)
-        if owu_was_registered and engine:
-            try:
-                port = service_config.get("port", 0)
-                api_key = service_config.get("api_key", "")
-                add_service_to_openwebui(new_name, port, api_key, engine)
-            except Exception as e:
-                logger.warning(f"Failed to re-register new name with Open WebUI: {e}")
+    # Remove old container if it exists (stopped/exited)
+    if container:
+        try:
+            container.remove(force=True)
+        except Exception as e:
+            logger.warning("Failed to remove old container: %s", e)
 
-        logger.info(f"Service renamed: {service_name} -> {new_name}")
+    # Rename in services DB and rebuild compose
+    compose_mgr.rename_service(service_name, new_name)
 
-        return jsonify(
-            {
-                "success": True,
-                "old_name": service_name,
-                "new_name": new_name,
-                "message": f'Service renamed from "{service_name}" to "{new_name}"',
-            }
-        ), 200
+    # Rename in benchmark DB
+    from benchmarking.routes import rename_service as bench_rename
 
-    except ValueError as e:
-        return jsonify({"error": str(e)}), 400
+    try:
+        updated = bench_rename(service_name, new_name)
+        logger.info(
+            "Updated %s benchmark records from '%s' to '%s'", updated, service_name, new_name
+        )
     except Exception as e:
-        logger.error(f"Failed to rename service: {e}", exc_info=True)
-        return jsonify({"error": str(e)}), 500
+        logger.warning("Failed to rename benchmarks (non-fatal): %s", e)
+
+    # Move the Open WebUI registration to the new name (best-effort). Both
+    # changes go on the background queue and land in one config update,
+    # so the rename doesn't wait on webui.db or the helper container.
+    if owu_was_registered:
+        queue_openwebui_change("remove", service_name, engine)
+        queue_openwebui_change(
+            "add", new_name, engine, service_config.get("api_key", "")
+        )
+
+    logger.info("Service renamed: %s -> %s", service_name, new_name)
+
+    return jsonify(
+        {
+            "success": True,
+            "old_name": service_name,
+            "new_name": new_name,
+            "message": f'Service renamed from "{service_name}" to "{new_name}"',
+        }
+    ), 200
 
 
 # ============================================
@@ -525,28 +676,40 @@ def rename_service(service_name):
 # ============================================
 
 
-@services_bp.route("/api/flag-metadata/<template_type>", methods=["GET"])
-@require_auth
-def get_flags_metadata(template_type):
-    """Get flag metadata for a template type"""
-    try:
-        if template_type not in ["llamacpp", "llamacpp_bench", "vllm", "ds4"]:
-            return jsonify({"error": 'template_type must be "llamacpp", "llamacpp_bench", "vllm", or "ds4"'}), 400
+# Flag metadata is static for the life of the process, so each template type's
+# response body and ETag are encoded once: {template_type: (body, etag)}
+_flag_metadata_bodies: dict[str, tuple[bytes, str]] = {}
 
-        metadata = get_flag_metadata(template_type)
-        mandatory = MANDATORY_FIELDS.get(template_type, [])
 
-        return jsonify(
+def _flag_metadata_body(template_type):
+    cached = _flag_metadata_bodies.get(template_type)
+    if cached is None:
+        body = current_app.json.dumps(
             {
                 "template_type": template_type,
-                "mandatory_fields": mandatory,
-                "optional_flags": metadata,
+                "mandatory_fields": MANDATORY_FIELDS.get(template_type, []),
+                "optional_flags": get_flag_metadata(template_type),
             }
-        ), 200
+        ).encode()
+        cached = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+        _flag_metadata_bodies[template_type] = cached
+    return cached
 
-    except Exception as e:
-        logger.error(f"Failed to get flag metadata: {e}")
-        return jsonify({"error": str(e)}), 500
+
+@services_bp.route("/api/flag-metadata/<template_type>", methods=["GET"])
+@require_auth
+def get_flags_metadata(template_type):
+    """Get flag metadata for a template type"""
+    if template_type not in ["llamacpp", "llamacpp_bench", "vllm", "ds4"]:
+        return jsonify({"error": 'template_type must be "llamacpp", "llamacpp_bench", "vllm", or "ds4"'}), 400
+
+    body, etag = _flag_metadata_body(template_type)
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    # Only changes with a dashboard upgrade; behind auth, so private caches only.
+    response.cache_control.private = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
 
 
 # ============================================
@@ -562,93 +725,86 @@ def set_public_port(service_name):
     Set service to use the public port (3301).
     If another service is using 3301, reassign it to a random 33XX port.
     """
-    try:
-        compose_mgr = ComposeManager(COMPOSE_FILE)
-
-        # Check if service exists
-        service_config = compose_mgr.get_service_from_db(service_name)
-        if not service_config:
-            return jsonify({"error": f'Service "{service_name}" not found'}), 404
-
-        # Check if service is already on 3301
-        current_port = service_config.get("port")
-        if current_port == 3301:
-            return jsonify(
-                {
-                    "success": True,
-                    "message": f'Service "{service_name}" is already on port 3301',
-                    "no_change": True,
-                }
-            ), 200
+    compose_mgr = _get_compose_manager()
 
-        # Find service currently using port 3301
-        all_services = compose_mgr.list_services_in_db()
-        conflicting_service = None
-        conflicting_service_name = None
+    # Check if service exists
+    service_config = compose_mgr.get_service_from_db(service_name)
+    if not service_config:
+        return jsonify({"error": f'Service "{service_name}" not found'}), 404
 
-        for svc_name, svc_config in all_services.items():
-            if svc_config.get("port") == 3301:
-                conflicting_service = svc_config
-                conflicting_service_name = svc_name
-                break
-
-        # Prepare updates
-        updates_made = []
+    # Check if service is already on 3301
+    current_port = service_config.get("port")
+    if current_port == 3301:
+        return jsonify(
+            {
+                "success": True,
+                "message": f'Service "{service_name}" is already on port 3301',
+                "no_change": True,
+            }
+        ), 200
 
-        if conflicting_service:
-            # Reassign conflicting service to random 33XX port
-            new_port = compose_mgr.get_next_available_port(
-                start_port=3300, end_port=3399
-            )
-            conflicting_service["port"] = new_port
-            compose_mgr.update_service_in_db(
-                conflicting_service_name, conflicting_service
-            )
+    # Find service currently using port 3301
+    conflicting_service_name = compose_mgr.service_on_port(3301)
+    conflicting_service = (
+        compose_mgr.get_service_from_db(conflicting_service_name)
+        if conflicting_service_name
+        else None
+    )
 
-            updates_made.append(
-                {
-                    "service": conflicting_service_name,
-                    "old_port": 3301,
-                    "new_port": new_port,
-                }
-            )
+    # Prepare updates
+    updates_made = []
 
-        # Set requested service to 3301
-        service_config["port"] = 3301
-        compose_mgr.update_service_in_db(service_name, service_config)
+    if conflicting_service:
+        # Reassign conflicting service to random 33XX port
+        new_port = compose_mgr.get_next_available_port(
+            start_port=3300, end_port=3399
+        )
+        conflicting_service["port"] = new_port
+        compose_mgr.update_service_in_db(
+            conflicting_service_name, conflicting_service
+        )
 
         updates_made.append(
-            {"service": service_name, "old_port": current_port, "new_port": 3301}
+            {
+                "service": conflicting_service_name,
+                "old_port": 3301,
+                "new_port": new_port,
+            }
         )
 
-        # Rebuild compose file and restart affected services
-        compose_mgr.rebuild_compose_file()
+    # Set requested service to 3301
+    service_config["port"] = 3301
+    compose_mgr.update_service_in_db(service_name, service_config)
 
-        services_to_restart = [service_name]
-        if conflicting_service_name:
-            services_to_restart.append(conflicting_service_name)
+    updates_made.append(
+        {"service": service_name, "old_port": current_port, "new_port": 3301}
+    )
 
-        restart_results = []
-        for svc in services_to_restart:
-            try:
-                restart_results.append({"service": svc, **_recreate_if_running(svc)})
-            except Exception as e:
-                restart_results.append(
-                    {"service": svc, "restarted": False, "error": str(e)}
-                )
+    # Rebuild compose file and restart affected services
+    compose_mgr.rebuild_compose_file()
 
-        return jsonify(
-            {
-                "success": True,
-                "message": f'Service "{service_name}" now on port 3301',
-                "updates": updates_made,
-                "restarts": restart_results,
-            }
-        ), 200
+    services_to_restart = [service_name]
+    if conflicting_service_name:
+        services_to_restart.append(conflicting_service_name)
 
+    try:
+        restarted = _recreate_running(services_to_restart)
     except Exception as e:
-        logger.error(f"Failed to set public port: {e}", exc_info=True)
-        return jsonify({"error": str(e)}), 500
+        restarted = {
+            svc: {"restarted": False, "error": str(e)} for svc in services_to_restart
+        }
+    restart_results = [
+        {"service": svc, **restarted[svc]} for svc in services_to_restart
+    ]
+
+    return jsonify(
+        {
+            "success": True,
+            "message": f'Service "{service_name}" now on port 3301',
+            "updates": updates_made,
+            "restarts": restart_results,
+        }
+    ), 200
 
 
 @services_bp.route("/api/services/<service_name>/favorite", methods=["POST"])
@@ -656,37 +812,31 @@ def set_public_port(service_name):
 @_serialize_db
 def set_favorite(service_name):
     """Set or unset the favorite flag for a service."""
-    try:
-        if service_name == "open-webui":
-            return jsonify({"error": "Cannot favorite infrastructure services"}), 400
+    if service_name == "open-webui":
+        return jsonify({"error": "Cannot favorite infrastructure services"}), 400
 
-        data = request.get_json(silent=True) or {}
-        favorite = bool(data.get("favorite", True))
+    data = request.get_json(silent=True) or {}
+    favorite = bool(data.get("favorite", True))
 
-        compose_mgr = ComposeManager(COMPOSE_FILE)
-        service_config = compose_mgr.get_service_from_db(service_name)
-        if not service_config:
-            return jsonify({"error": f'Service "{service_name}" not found'}), 404
-
-        service_config["favorite"] = favorite
-        compose_mgr.update_service_in_db(service_name, service_config)
+    compose_mgr = _get_compose_manager()
+    service_config = compose_mgr.get_service_from_db(service_name)
+    if not service_config:
+        return jsonify({"error": f'Service "{service_name}" not found'}), 404
 
-        from services import event_manager
-        event_manager.emit({
-            "service_name": service_name,
-            "action": "metadata-changed",
-            "status": None,
-            "container_id": None,
-            "metadata": {"favorite": favorite},
-            "timestamp": time.time(),
-        })
+    service_config["favorite"] = favorite
+    compose_mgr.update_service_in_db(service_name, service_config)
 
-        logger.info(f"Service favorite updated: {service_name} -> {favorite}")
-        return jsonify({"success": True, "favorite": favorite}), 200
+    event_manager.emit({
+        "service_name": service_name,
+        "action": "metadata-changed",
+        "status": None,
+        "container_id": None,
+        "metadata": {"favorite": favorite},
+        "timestamp": time.time(),
+    })
 
-    except Exception as e:
-        logger.error(f"Failed to update favorite: {e}", exc_info=True)
-        return jsonify({"error": str(e)}), 500
+    logger.info("Service favorite updated: %s -> %s", service_name, favorite)
+    return jsonify({"success": True, "favorite": favorite}), 200
 
 
 # ============================================
@@ -697,10 +847,6 @@ def _sse_data(payload: dict) -> str:
     return "data: " + json.dumps(payload) + "\n\n"
 
 
-def _now() -> str:
-    return datetime.utcnow().isoformat() + "Z"
-
-
 # ============================================
 # SSE Stream Endpoint
 # ============================================
@@ -719,7 +865,6 @@ def services_stream():
     Yields an initial snapshot of all services on connect,
     then streams delta updates as Docker events occur.
     """
-    from services import event_manager
 
     def generate() -> Generator[str, None, None]:
         callback = None
@@ -735,7 +880,7 @@ def services_stream():
                     "running": sum(1 for s in snapshot if s["status"] == "running"),
                     "stopped": sum(1 for s in snapshot if s["status"] != "running"),
                 },
-                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "timestamp": utc_now_iso(),
             }
             yield "data: " + json.dumps(payload) + "\n\n"
 
@@ -810,14 +955,14 @@ def stream_service_logs(service_name):
     def generate():
         stop = threading.Event()
         try:
-            yield _sse_data({"type": "snapshot_start", "service": service_name, "timestamp": _now()})
+            yield _sse_data({"type": "snapshot_start", "service": service_name, "timestamp": utc_now_iso()})
             for event_type, data in iter_log_events(container, tail, stop):
                 if event_type == "log":
                     yield _sse_data({"type": "log", "service": service_name, "line": data})
                 elif event_type == "snapshot_end":
-                    yield _sse_data({"type": "snapshot_end", "service": service_name, "timestamp": _now()})
+                    yield _sse_data({"type": "snapshot_end", "service": service_name, "timestamp": utc_now_iso()})
                 elif event_type == "stream_end":
-                    yield _sse_data({"type": "stream_end", "service": service_name, "timestamp": _now()})
+                    yield _sse_data({"type": "stream_end", "service": service_name, "timestamp": utc_now_iso()})
                 elif event_type == "error":
                     yield _sse_data({"type": "error", "service": service_name, "message": data})
                 elif event_type == "keepalive":
@@ -854,7 +999,7 @@ def get_global_api_key():
         ), 200
 
     except Exception as e:
-        logger.error(f"Failed to get global API key: {e}")
+        logger.error("Failed to get global API key: %s", e)
         return jsonify(
             {"api_key": None, "error": "Failed to retrieve global API key"}
         ), 500
@@ -877,19 +1022,32 @@ def set_service_global_api_key(service_name):
                 }
             ), 400
 
-        compose_mgr = ComposeManager(COMPOSE_FILE)
+        compose_mgr = _get_compose_manager()
 
         service_config = compose_mgr.get_service_from_db(service_name)
         if not service_config:
             return jsonify({"error": f'Service "{service_name}" not found'}), 404
 
         old_api_key = service_config.get("api_key", "")
+        if old_api_key == config.GLOBAL_API_KEY:
+            # Already on the global key: skip the rebuild and container recreate
+            return jsonify(
+                {
+                    "success": True,
+                    "no_change": True,
+                    "service_name": service_name,
+                    "old_api_key": old_api_key[:10] + "...",
+                    "new_api_key": config.GLOBAL_API_KEY[:10] + "...",
+                    "message": f'Service "{service_name}" already uses the global API key',
+                }
+            ), 200
+
         service_config["api_key"] = config.GLOBAL_API_KEY
         compose_mgr.update_service_in_db(service_name, service_config)
 
         _rebuild_and_restart(compose_mgr, service_name)
 
-        logger.info(f"Service '{service_name}' API key updated to global API key")
+        logger.info("Service '%s' API key updated to global API key", service_name)
 
         return jsonify(
             {
@@ -902,7 +1060,7 @@ def set_service_global_api_key(service_name):
         ), 200
 
     except Exception as e:
-        logger.error(f"Failed to set global API key: {e}", exc_info=True)
+        logger.error("Failed to set global API key: %s", e, exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
@@ -913,7 +1071,7 @@ def _affected_services_state():
     containers like open-webui are never in services.json so they're excluded
     naturally.
     """
-    compose_mgr = ComposeManager(COMPOSE_FILE)
+    compose_mgr = _get_compose_manager()
     db_services = set(compose_mgr.list_services_in_db().keys())
 
     running = []
@@ -934,18 +1092,14 @@ def _affected_services_state():
 @require_auth
 def default_api_key_rotation_preview():
     """Describe the impact of rotating the default API key without changing anything."""
-    try:
-        db_services, running, openwebui_registered = _affected_services_state()
-        return jsonify(
-            {
-                "total_services": len(db_services),
-                "running": running,
-                "openwebui_registered": openwebui_registered,
-            }
-        ), 200
-    except Exception as e:
-        logger.error(f"Failed to build rotation preview: {e}", exc_info=True)
-        return jsonify({"error": str(e)}), 500
+    db_services, running, openwebui_registered = _affected_services_state()
+    return jsonify(
+        {
+            "total_services": len(db_services),
+            "running": running,
+            "openwebui_registered": openwebui_registered,
+        }
+    ), 200
 
 
 @services_bp.route("/api/default-api-key/rotate", methods=["POST"])
@@ -964,7 +1118,7 @@ def rotate_default_api_key():
             db_services, running, openwebui_registered = _affected_services_state()
 
             new_key = generate_api_key()
-            compose_mgr = ComposeManager(COMPOSE_FILE)
+            compose_mgr = _get_compose_manager()
 
             # Snapshot before any mutation so a late failure can fully roll back.
             services_before = compose_mgr.list_services_in_db()
@@ -1036,5 +1190,5 @@ def rotate_default_api_key():
         ), (200 if ok else 207)
 
     except Exception as e:
-        logger.error(f"Failed to rotate default API key: {e}", exc_info=True)
+        logger.error("Failed to rotate default API key: %s", e, exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
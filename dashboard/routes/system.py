@@ -1,5 +1,7 @@
 import logging
 import secrets
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from flask import Blueprint, current_app, jsonify, request
 
@@ -9,22 +11,39 @@ import pyotp
 from auth import require_auth, _totp_sessions, TOTP_TOKEN_EXPIRY_SECONDS, _cleanup_sessions
 from docker_utils import check_docker, check_nvidia_smi, get_image_build_metadata
 from model_discovery import discover_all_models, get_disk_usage
+from timestamps import utc_now_iso
 
 logger = logging.getLogger(__name__)
 
 system_bp = Blueprint("system", __name__)
 
+# /api/health is unauthenticated and polled; share the Docker ping and the
+# nvidia-smi fork between polls for this long.
+_HEALTH_CACHE_TTL = 5.0
+_health_cache = {"ts": 0.0, "data": None}
+_health_cache_lock = threading.Lock()
+
+
+def _cached_health_probes():
+    """Return (docker_available, nvidia_available), reusing a result younger than _HEALTH_CACHE_TTL."""
+    with _health_cache_lock:
+        if _health_cache["data"] is None or time.monotonic() - _health_cache["ts"] >= _HEALTH_CACHE_TTL:
+            _health_cache["data"] = (check_docker(), check_nvidia_smi())
+            _health_cache["ts"] = time.monotonic()
+        return _health_cache["data"]
+
 
 @system_bp.route("/api/health", methods=["GET"])
 def health():
     """Health check endpoint - no authentication required"""
+    docker_available, nvidia_available = _cached_health_probes()
     return jsonify(
         {
             "status": "healthy",
             "version": "1.0.0",
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "docker_available": check_docker(),
-            "nvidia_available": check_nvidia_smi(),
+            "timestamp": utc_now_iso(),
+            "docker_available": docker_available,
+            "nvidia_available": nvidia_available,
         }
     )
 
@@ -100,7 +119,7 @@ def get_images_metadata():
             "llamacpp": get_image_build_metadata("llm-dock-llamacpp"),
             "vllm": get_image_build_metadata("llm-dock-vllm"),
             "ds4": get_image_build_metadata("llm-dock-ds4"),
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": utc_now_iso(),
         }
     )
 
@@ -120,7 +139,7 @@ def get_system_info():
                 "models": models,
                 "model_count": len(models),
                 "total_model_size": total_model_size,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "timestamp": utc_now_iso(),
             }
         )
 
@@ -2,10 +2,19 @@
 Service templates for llama.cpp and vllm docker-compose services.
 """
 
+import os
 import re
 import secrets
 from typing import Dict, Any, Optional
 
+# sanitize_service_name: underscores/spaces -> hyphens, then drop anything
+# else that is not [a-z0-9-] and collapse hyphen runs
+_SEPARATORS = str.maketrans('_ ', '--')
+_INVALID_CHARS_RE = re.compile(r'[^a-z0-9-]')
+_HYPHEN_RUN_RE = re.compile(r'-+')
+# Names the rules above would return unchanged (length is checked separately)
+_VALID_NAME_RE = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*')
+
 
 def generate_api_key() -> str:
     """Generate a secure random API key"""
@@ -21,17 +30,18 @@ def sanitize_service_name(name: str) -> str:
     - Alphanumeric + hyphens only
     - Max 63 characters
     """
-    # Convert to lowercase
-    name = name.lower()
+    # Already valid (e.g. re-sanitizing an engine-prefixed name): nothing to do
+    if len(name) <= 63 and _VALID_NAME_RE.fullmatch(name):
+        return name
 
-    # Replace underscores and spaces with hyphens
-    name = name.replace('_', '-').replace(' ', '-')
+    # Lowercase, replacing underscores and spaces with hyphens
+    name = name.lower().translate(_SEPARATORS)
 
     # Remove any character that's not alphanumeric or hyphen
-    name = re.sub(r'[^a-z0-9-]', '', name)
+    name = _INVALID_CHARS_RE.sub('', name)
 
     # Remove consecutive hyphens
-    name = re.sub(r'-+', '-', name)
+    name = _HYPHEN_RUN_RE.sub('-', name)
 
     # Trim hyphens from start/end
     name = name.strip('-')
@@ -264,9 +274,11 @@ def validate_model_compatibility(model_data: Dict[str, Any], engine: str) -> tup
     if not files:
         return False, "No model files found"
 
-    has_gguf = any(f['name'].endswith('.gguf') for f in files)
-    has_safetensors = any(f['name'].endswith('.safetensors') for f in files)
-    has_bin = any(f['name'].endswith('.bin') for f in files)
+    # One pass over the (possibly many-shard) file list
+    extensions = {os.path.splitext(f['name'])[1] for f in files}
+    has_gguf = '.gguf' in extensions
+    has_safetensors = '.safetensors' in extensions
+    has_bin = '.bin' in extensions
 
     if engine == 'llamacpp':
         if not has_gguf:
@@ -200,6 +200,23 @@ async function toggleOpenWebUI(serviceName, register) {
 
         const result = await fetchAPI(`/services/${serviceName}/${endpoint}`, { method: 'POST' });
 
+        // The change is applied in the background; wait for it to land.
+        if (result.success && result.task_id) {
+            let task = { state: 'queued' };
+            while (task.state === 'queued' || task.state === 'running') {
+                await new Promise(resolve => setTimeout(resolve, 250));
+                task = await fetchAPI(`/openwebui/tasks/${result.task_id}`);
+            }
+            if (task.state !== 'succeeded') {
+                result.success = false;
+                result.error = task.error;
+            } else {
+                result.message = register
+                    ? `Service "${serviceName}" registered with Open WebUI`
+                    : `Service "${serviceName}" unregistered from Open WebUI`;
+            }
+        }
+
         if (result.success) {
             showToast(result.message);
 
@@ -228,12 +245,19 @@ async function restartOpenWebUI() {
     try {
         showToast('Restarting Open WebUI...');
 
-        const result = await fetchAPI('/openwebui/restart', { method: 'POST' });
+        await fetchAPI('/openwebui/restart', { method: 'POST' });
 
-        if (result.success) {
+        // The restart runs in the background; poll until it finishes.
+        let status = { state: 'running' };
+        while (status.state === 'running') {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            status = await fetchAPI('/openwebui/restart/status');
+        }
+
+        if (status.state === 'succeeded') {
             showToast('Open WebUI restarted successfully');
         } else {
-            showToast(result.error || 'Failed to restart Open WebUI', true);
+            showToast(status.error || 'Failed to restart Open WebUI', true);
         }
     } catch (error) {
         console.error('Failed to restart Open WebUI:', error);
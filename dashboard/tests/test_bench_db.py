@@ -37,19 +37,24 @@ class TestCreateAndGetRun:
         assert created.params_json == params
         assert created.params_json["-fa"] == ""
 
+    def test_create_runs_inserts_batch(self, db_file):
+        runs = [
+            BenchmarkRun(id=f"r{i}", service_name="svc", model_path="/m.gguf",
+                         params_json={"-p": str(i)})
+            for i in range(3)
+        ]
+        assert db_file.create_runs(runs) == 3
+        assert db_file.get_run("r2").params_json == {"-p": "2"}
+        assert db_file.list_runs(service_name="svc")[1] == 3
+
 
 class TestListRuns:
     def _create_runs(self, db, service, count):
-        ids = []
-        for i in range(count):
-            run_id = str(uuid.uuid4())
-            run = BenchmarkRun(
-                id=run_id,
-                service_name=service,
-                model_path="/models/test.gguf",
-            )
-            db.create_run(run)
-            ids.append(run_id)
+        ids = [str(uuid.uuid4()) for _ in range(count)]
+        db.create_runs([
+            BenchmarkRun(id=run_id, service_name=service, model_path="/models/test.gguf")
+            for run_id in ids
+        ])
         return ids
 
     def test_list_all(self, db):
@@ -155,6 +160,30 @@ class TestUpdateResults:
         assert updated.model_type == "7B"
         assert updated.gpu_info == "RTX 4090"
 
+    def test_complete_run_stores_results_and_status(self, db):
+        run_id = str(uuid.uuid4())
+        db.create_run(BenchmarkRun(
+            id=run_id,
+            service_name="llamacpp-test",
+            model_path="/models/test.gguf",
+        ))
+        db.update_status(run_id, "running", started_at="2025-01-01T00:00:00Z")
+
+        db.complete_run(
+            run_id,
+            completed_at="2025-01-01T00:05:00Z",
+            pp_avg_ts=1200.5,
+            tg_avg_ts=85.3,
+            raw_output="[]",
+        )
+        updated = db.get_run(run_id)
+        assert updated.status == "completed"
+        assert updated.started_at == "2025-01-01T00:00:00Z"
+        assert updated.completed_at == "2025-01-01T00:05:00Z"
+        assert updated.pp_avg_ts == 1200.5
+        assert updated.tg_avg_ts == 85.3
+        assert updated.raw_output == "[]"
+
 
 class TestDeleteRun:
     def test_delete_existing(self, db):
@@ -252,3 +281,13 @@ class TestRecoverStaleRuns:
 
         updated = db.get_run(run.id)
         assert updated.status == "completed"
+
+
+class TestConnectionPragmas:
+    def test_file_db_uses_wal_with_normal_sync(self, db_file):
+        conn = db_file._get_conn()
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        finally:
+            db_file._close_conn(conn)
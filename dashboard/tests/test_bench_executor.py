@@ -3,6 +3,7 @@ import os
 import uuid
 from unittest.mock import patch, MagicMock
 import pytest
+import yaml
 
 from benchmarking.db import BenchmarkDB
 from benchmarking.executor import BenchmarkExecutor, LLAMA_BENCH_PATH, LLAMACPP_IMAGE
@@ -97,7 +98,6 @@ class TestBuildDockerCmd:
             }
         }
         compose_file = tmp_path / "docker-compose.yml"
-        import yaml
         with open(compose_file, "w") as f:
             yaml.dump(compose_content, f)
 
@@ -128,7 +128,6 @@ class TestBuildDockerCmd:
             }
         }
         compose_file = tmp_path / "docker-compose.yml"
-        import yaml
         with open(compose_file, "w") as f:
             yaml.dump(compose_content, f)
 
@@ -138,6 +137,21 @@ class TestBuildDockerCmd:
         gpus_idx = cmd.index("--gpus")
         assert cmd[gpus_idx + 1] == "1"
 
+    def test_compose_parsed_once_per_file_version(self, executor, tmp_path):
+        """Repeated builds reuse the parsed compose file until it changes"""
+        compose_file = tmp_path / "docker-compose.yml"
+        compose_file.write_text("services:\n  llamacpp-test:\n    ipc: host\n")
+        executor.compose_file = str(compose_file)
+
+        executor._build_docker_cmd("llamacpp-test", "/models/test.gguf", {})
+        with patch("benchmarking.executor.yaml.load", side_effect=AssertionError("re-parsed")):
+            cmd = executor._build_docker_cmd("llamacpp-test", "/models/test.gguf", {})
+        assert cmd[cmd.index("--ipc") + 1] == "host"
+
+        compose_file.write_text("services:\n  llamacpp-test:\n    ipc: private\n")
+        cmd = executor._build_docker_cmd("llamacpp-test", "/models/test.gguf", {})
+        assert cmd[cmd.index("--ipc") + 1] == "private"
+
 
 class TestExecuteBenchmark:
     @patch("benchmarking.executor.subprocess.Popen")
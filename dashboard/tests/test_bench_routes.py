@@ -2,29 +2,26 @@ import json
 import os
 import sys
 import uuid
-from unittest.mock import patch, MagicMock
 import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from benchmarking.executor import BenchmarkExecutor
+from benchmarking.models import BenchmarkRun
+from compose_manager import ComposeManager
+
 TEST_TOKEN = "test-token-for-benchmarks"
+AUTH_HEADERS = {"Authorization": f"Bearer {TEST_TOKEN}"}
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(scope="module", autouse=True)
 def set_env_vars():
-    """Ensure required env vars are set before any imports."""
+    """Set the env vars config reads; app and benchmarking.routes are imported after this."""
     os.environ["DASHBOARD_TOKEN"] = TEST_TOKEN
     os.environ["COMPOSE_FILE"] = "/dev/null"
 
 
-def _auth_headers():
-    return {"Authorization": f"Bearer {TEST_TOKEN}"}
-
-
-@pytest.fixture
-def simple_client(tmp_path):
-    """Create a test client using the app factory."""
-    compose_content = """services:
+COMPOSE_CONTENT = """services:
   # <<<<<<< BEGIN DYNAMIC
   # >>>>>>> END DYNAMIC
 
@@ -32,241 +29,203 @@ networks:
   llm-network:
     driver: bridge
 """
-    compose_path = tmp_path / "docker-compose.yml"
-    compose_path.write_text(compose_content)
-
-    services_json = {
-        "llamacpp-test": {
-            "template_type": "llamacpp",
-            "alias": "test",
-            "port": 3301,
-            "model_path": "/models/test.gguf",
-            "api_key": "test-key",
-            "params": {
-                "-ngl": "99",
-                "-b": "2048",
-                "-fa": "",
-            },
-        },
-        "vllm-test": {
-            "template_type": "vllm",
-            "alias": "vllm-test",
-            "port": 3302,
-            "model_name": "org/model",
-            "api_key": "test-key",
-        },
-    }
-    services_path = tmp_path / "services.json"
-    services_path.write_text(json.dumps(services_json))
 
-    db_path = str(tmp_path / "test_benchmarks.db")
+SERVICES_JSON = json.dumps({
+    "llamacpp-test": {
+        "template_type": "llamacpp",
+        "alias": "test",
+        "port": 3301,
+        "model_path": "/models/test.gguf",
+        "api_key": "test-key",
+        "params": {
+            "-ngl": "99",
+            "-b": "2048",
+            "-fa": "",
+        },
+    },
+    "vllm-test": {
+        "template_type": "vllm",
+        "alias": "vllm-test",
+        "port": 3302,
+        "model_name": "org/model",
+        "api_key": "test-key",
+    },
+})
+
+
+@pytest.fixture(scope="module")
+def bench_app(set_env_vars, tmp_path_factory):
+    """Build the app once per module; registering every blueprint dominates setup."""
+    app_dir = tmp_path_factory.mktemp("bench_app")
+    # Only read by the routes under test, so one copy serves the module
+    compose_path = app_dir / "docker-compose.yml"
+    compose_path.write_text(COMPOSE_CONTENT)
 
     from app import create_app
 
-    app = create_app(config={
+    return create_app(config={
         "TESTING": True,
         "COMPOSE_FILE": str(compose_path),
-        "BENCHMARK_DB_PATH": db_path,
+        "BENCHMARK_DB_PATH": str(app_dir / "benchmarks.db"),
         "DASHBOARD_TOKEN": TEST_TOKEN,
     })
 
-    # Override _get_compose_manager to use test services.json
-    from compose_manager import ComposeManager
-    from benchmarking import routes as routes_mod
 
-    original_get_cm = routes_mod._get_compose_manager
+@pytest.fixture(scope="module")
+def bench_client(bench_app):
+    """One test client for the module; the routes under test set no cookies."""
+    return bench_app.test_client()
 
-    def mock_get_compose_manager():
-        return ComposeManager(str(compose_path), services_db_file=str(services_path))
 
-    routes_mod._get_compose_manager = mock_get_compose_manager
+@pytest.fixture
+def client(bench_app, bench_client, db, tmp_path, monkeypatch):
+    """Test client on the shared app, wired to this test's ``db`` and services.json."""
+    compose_path = bench_app.config["COMPOSE_FILE"]
+    # Per test: applying a benchmark rewrites the service's params here
+    services_path = tmp_path / "services.json"
+    services_path.write_text(SERVICES_JSON)
 
-    test_db = app.config["BENCHMARK_DB"]
-    client = app.test_client()
+    monkeypatch.setitem(bench_app.config, "BENCHMARK_DB", db)
+    monkeypatch.setitem(bench_app.config, "BENCHMARK_EXECUTOR", BenchmarkExecutor(db, compose_path))
 
-    yield client, test_db, services_path
+    # Override _get_compose_manager to use test services.json. Imported here:
+    # benchmarking.routes pulls in config, which needs DASHBOARD_TOKEN set.
+    from benchmarking import routes as routes_mod
 
-    routes_mod._get_compose_manager = original_get_cm
+    compose_mgr = ComposeManager(compose_path, services_db_file=str(services_path))
+    monkeypatch.setattr(routes_mod, "_get_compose_manager", lambda: compose_mgr)
+
+    return bench_client
+
+
+@pytest.fixture
+def make_run(db):
+    """Create and store a BenchmarkRun, defaulting to the llamacpp-test service."""
+    def _make(**fields):
+        fields.setdefault("id", str(uuid.uuid4()))
+        fields.setdefault("service_name", "llamacpp-test")
+        fields.setdefault("model_path", "/m")
+        return db.create_run(BenchmarkRun(**fields))
+
+    return _make
 
 
 class TestStartBenchmark:
-    @patch("benchmarking.executor.BenchmarkExecutor.start_benchmark")
-    def test_start_success(self, mock_start, simple_client):
-        client, db, _ = simple_client
-        from benchmarking.models import BenchmarkRun
+    def test_start_success(self, client, monkeypatch):
         mock_run = BenchmarkRun(
             id="test-id", service_name="llamacpp-test",
             model_path="/models/test.gguf", status="pending"
         )
-        mock_start.return_value = mock_run
+        monkeypatch.setattr(BenchmarkExecutor, "start_benchmark", lambda self, *a, **kw: mock_run)
 
         resp = client.post("/api/benchmarks",
             json={"service_name": "llamacpp-test", "params": {"-p": "512", "-n": "128"}},
-            headers=_auth_headers())
+            headers=AUTH_HEADERS)
         assert resp.status_code == 202
         data = resp.get_json()
         assert data["id"] == "test-id"
         assert data["status"] == "pending"
 
-    def test_start_missing_body(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.post("/api/benchmarks",
-            content_type="application/json",
-            headers=_auth_headers())
-        assert resp.status_code == 400
-
-    def test_start_missing_service_name(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.post("/api/benchmarks",
-            json={"params": {}},
-            headers=_auth_headers())
-        assert resp.status_code == 400
-
-    def test_start_nonexistent_service(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.post("/api/benchmarks",
-            json={"service_name": "nonexistent-service", "params": {}},
-            headers=_auth_headers())
-        assert resp.status_code == 404
-
-    def test_start_vllm_service_rejected(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.post("/api/benchmarks",
-            json={"service_name": "vllm-test", "params": {}},
-            headers=_auth_headers())
-        assert resp.status_code == 400
-        assert "llama.cpp" in resp.get_json()["error"]
-
-    def test_start_invalid_params(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.post("/api/benchmarks",
-            json={"service_name": "llamacpp-test", "params": {"-m": "/evil/path"}},
-            headers=_auth_headers())
-        assert resp.status_code == 400
-        assert "Reserved" in resp.get_json()["error"]
-
-    @patch("benchmarking.executor.BenchmarkExecutor.is_running_for_service")
-    def test_start_concurrent_rejected(self, mock_running, simple_client):
-        client, db, _ = simple_client
-        mock_running.return_value = True
+    @pytest.mark.parametrize("body,auth,expected_status,error_substr", [
+        (None, True, 400, None),
+        ({"params": {}}, True, 400, None),
+        ({"service_name": "nonexistent-service", "params": {}}, True, 404, None),
+        ({"service_name": "vllm-test", "params": {}}, True, 400, "llama.cpp"),
+        ({"service_name": "llamacpp-test", "params": {"-m": "/evil/path"}}, True, 400, "Reserved"),
+        ({"service_name": "llamacpp-test", "params": {}}, False, 401, None),
+    ], ids=["missing_body", "missing_service_name", "nonexistent_service",
+            "vllm_service_rejected", "invalid_params", "no_auth"])
+    def test_start_rejected(self, client, body, auth, expected_status, error_substr):
+        headers = AUTH_HEADERS if auth else {}
+        if body is None:
+            resp = client.post("/api/benchmarks", content_type="application/json", headers=headers)
+        else:
+            resp = client.post("/api/benchmarks", json=body, headers=headers)
+        assert resp.status_code == expected_status
+        if error_substr:
+            assert error_substr in resp.get_json()["error"]
+
+    def test_start_concurrent_rejected(self, client, monkeypatch):
+        monkeypatch.setattr(BenchmarkExecutor, "is_running_for_service", lambda self, name: True)
         resp = client.post("/api/benchmarks",
             json={"service_name": "llamacpp-test", "params": {"-p": "512"}},
-            headers=_auth_headers())
+            headers=AUTH_HEADERS)
         assert resp.status_code == 409
 
-    def test_start_no_auth(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.post("/api/benchmarks",
-            json={"service_name": "llamacpp-test", "params": {}})
-        assert resp.status_code == 401
-
 
 class TestListBenchmarks:
-    def test_list_empty(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.get("/api/benchmarks", headers=_auth_headers())
+    def test_list_empty(self, client):
+        resp = client.get("/api/benchmarks", headers=AUTH_HEADERS)
         assert resp.status_code == 200
         data = resp.get_json()
         assert data["runs"] == []
         assert data["total"] == 0
 
-    def test_list_with_runs(self, simple_client):
-        client, db, _ = simple_client
-        from benchmarking.models import BenchmarkRun
+    def test_list_with_runs(self, client, make_run):
         for i in range(3):
-            db.create_run(BenchmarkRun(
-                id=str(uuid.uuid4()),
-                service_name="llamacpp-test",
-                model_path="/models/test.gguf",
-            ))
+            make_run(model_path="/models/test.gguf")
 
-        resp = client.get("/api/benchmarks", headers=_auth_headers())
+        resp = client.get("/api/benchmarks", headers=AUTH_HEADERS)
         data = resp.get_json()
         assert data["total"] == 3
         assert len(data["runs"]) == 3
 
-    def test_list_by_service(self, simple_client):
-        client, db, _ = simple_client
-        from benchmarking.models import BenchmarkRun
-        db.create_run(BenchmarkRun(id=str(uuid.uuid4()), service_name="svc-a", model_path="/m"))
-        db.create_run(BenchmarkRun(id=str(uuid.uuid4()), service_name="svc-b", model_path="/m"))
+    def test_list_by_service(self, client, make_run):
+        make_run(service_name="svc-a")
+        make_run(service_name="svc-b")
 
-        resp = client.get("/api/benchmarks?service_name=svc-a", headers=_auth_headers())
+        resp = client.get("/api/benchmarks?service_name=svc-a", headers=AUTH_HEADERS)
         data = resp.get_json()
         assert data["total"] == 1
 
 
 class TestGetBenchmark:
-    def test_get_existing(self, simple_client):
-        client, db, _ = simple_client
-        from benchmarking.models import BenchmarkRun
-        run_id = str(uuid.uuid4())
-        db.create_run(BenchmarkRun(
-            id=run_id, service_name="llamacpp-test",
-            model_path="/models/test.gguf",
-            params_json={"-p": "512"},
-        ))
+    def test_get_existing(self, client, make_run):
+        run_id = make_run(model_path="/models/test.gguf", params_json={"-p": "512"}).id
 
-        resp = client.get(f"/api/benchmarks/{run_id}", headers=_auth_headers())
+        resp = client.get(f"/api/benchmarks/{run_id}", headers=AUTH_HEADERS)
         assert resp.status_code == 200
         data = resp.get_json()
         assert data["id"] == run_id
         assert data["params"] == {"-p": "512"}
 
-    def test_get_nonexistent(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.get("/api/benchmarks/nonexistent", headers=_auth_headers())
+    def test_get_nonexistent(self, client):
+        resp = client.get("/api/benchmarks/nonexistent", headers=AUTH_HEADERS)
         assert resp.status_code == 404
 
 
 class TestDeleteBenchmark:
-    def test_delete_completed(self, simple_client):
-        client, db, _ = simple_client
-        from benchmarking.models import BenchmarkRun
-        run_id = str(uuid.uuid4())
-        db.create_run(BenchmarkRun(
-            id=run_id, service_name="llamacpp-test", model_path="/m"
-        ))
+    def test_delete_completed(self, client, db, make_run):
+        run_id = make_run().id
         db.update_status(run_id, "completed")
 
-        resp = client.delete(f"/api/benchmarks/{run_id}", headers=_auth_headers())
+        resp = client.delete(f"/api/benchmarks/{run_id}", headers=AUTH_HEADERS)
         assert resp.status_code == 200
         assert db.get_run(run_id) is None
 
-    @patch("benchmarking.executor.BenchmarkExecutor.cancel_benchmark")
-    def test_delete_running_cancels(self, mock_cancel, simple_client):
-        client, db, _ = simple_client
-        mock_cancel.return_value = True
-        from benchmarking.models import BenchmarkRun
-        run_id = str(uuid.uuid4())
-        db.create_run(BenchmarkRun(
-            id=run_id, service_name="llamacpp-test", model_path="/m"
-        ))
+    def test_delete_running_cancels(self, client, db, make_run, monkeypatch):
+        monkeypatch.setattr(BenchmarkExecutor, "cancel_benchmark", lambda self, run_id: True)
+        run_id = make_run().id
         db.update_status(run_id, "running")
 
-        resp = client.delete(f"/api/benchmarks/{run_id}", headers=_auth_headers())
+        resp = client.delete(f"/api/benchmarks/{run_id}", headers=AUTH_HEADERS)
         assert resp.status_code == 200
         assert "cancelled" in resp.get_json()["message"].lower()
 
-    def test_delete_nonexistent(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.delete("/api/benchmarks/nonexistent", headers=_auth_headers())
+    def test_delete_nonexistent(self, client):
+        resp = client.delete("/api/benchmarks/nonexistent", headers=AUTH_HEADERS)
         assert resp.status_code == 404
 
 
 class TestApplyBenchmark:
-    def test_apply_completed_run(self, simple_client):
-        client, db, services_path = simple_client
-        from benchmarking.models import BenchmarkRun
-        run_id = str(uuid.uuid4())
-        db.create_run(BenchmarkRun(
-            id=run_id, service_name="llamacpp-test",
+    def test_apply_completed_run(self, client, db, make_run):
+        run_id = make_run(
             model_path="/models/test.gguf",
             params_json={"-p": "512", "-n": "128", "-ngl": "80", "-b": "4096", "-fa": ""},
-        ))
+        ).id
         db.update_status(run_id, "completed")
 
-        resp = client.put(f"/api/benchmarks/{run_id}/apply", headers=_auth_headers())
+        resp = client.put(f"/api/benchmarks/{run_id}/apply", headers=AUTH_HEADERS)
         assert resp.status_code == 200
         data = resp.get_json()
         assert data["success"] is True
@@ -276,34 +235,21 @@ class TestApplyBenchmark:
         assert "-p" in data["skipped_flags"]
         assert "-n" in data["skipped_flags"]
 
-    def test_apply_non_completed_rejected(self, simple_client):
-        client, db, _ = simple_client
-        from benchmarking.models import BenchmarkRun
-        run_id = str(uuid.uuid4())
-        db.create_run(BenchmarkRun(
-            id=run_id, service_name="llamacpp-test", model_path="/m"
-        ))
+    def test_apply_non_completed_rejected(self, client, make_run):
+        run_id = make_run().id
 
-        resp = client.put(f"/api/benchmarks/{run_id}/apply", headers=_auth_headers())
+        resp = client.put(f"/api/benchmarks/{run_id}/apply", headers=AUTH_HEADERS)
         assert resp.status_code == 400
 
-    def test_apply_nonexistent(self, simple_client):
-        client, db, _ = simple_client
-        resp = client.put("/api/benchmarks/nonexistent/apply", headers=_auth_headers())
+    def test_apply_nonexistent(self, client):
+        resp = client.put("/api/benchmarks/nonexistent/apply", headers=AUTH_HEADERS)
         assert resp.status_code == 404
 
-    def test_denylist_flags_never_applied(self, simple_client):
-        client, db, _ = simple_client
-        from benchmarking.models import BenchmarkRun
-        run_id = str(uuid.uuid4())
-        db.create_run(BenchmarkRun(
-            id=run_id, service_name="llamacpp-test",
-            model_path="/m",
-            params_json={"-p": "512", "-n": "128", "-r": "5", "-ngl": "99"},
-        ))
+    def test_denylist_flags_never_applied(self, client, db, make_run):
+        run_id = make_run(params_json={"-p": "512", "-n": "128", "-r": "5", "-ngl": "99"}).id
         db.update_status(run_id, "completed")
 
-        resp = client.put(f"/api/benchmarks/{run_id}/apply", headers=_auth_headers())
+        resp = client.put(f"/api/benchmarks/{run_id}/apply", headers=AUTH_HEADERS)
         data = resp.get_json()
         for flag in ["-p", "-n", "-r"]:
             assert flag in data["skipped_flags"]
@@ -311,10 +257,9 @@ class TestApplyBenchmark:
 
 
 class TestServiceDefaults:
-    def test_get_defaults(self, simple_client):
-        client, db, _ = simple_client
+    def test_get_defaults(self, client):
         resp = client.get("/api/benchmarks/service-defaults/llamacpp-test",
-            headers=_auth_headers())
+            headers=AUTH_HEADERS)
         assert resp.status_code == 200
         data = resp.get_json()
         assert data["service_name"] == "llamacpp-test"
@@ -327,14 +272,12 @@ class TestServiceDefaults:
         assert params["-b"] == "2048"
         assert params["-fa"] == ""
 
-    def test_nonexistent_service(self, simple_client):
-        client, db, _ = simple_client
+    def test_nonexistent_service(self, client):
         resp = client.get("/api/benchmarks/service-defaults/nonexistent",
-            headers=_auth_headers())
+            headers=AUTH_HEADERS)
         assert resp.status_code == 404
 
-    def test_vllm_service_rejected(self, simple_client):
-        client, db, _ = simple_client
+    def test_vllm_service_rejected(self, client):
         resp = client.get("/api/benchmarks/service-defaults/vllm-test",
-            headers=_auth_headers())
+            headers=AUTH_HEADERS)
         assert resp.status_code == 400
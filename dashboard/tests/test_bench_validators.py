@@ -14,34 +14,21 @@ class TestValidateFlagName:
         assert valid is True
         assert err is None
 
-    def test_empty_flag(self):
-        valid, err = validate_flag_name("")
-        assert valid is False
-        assert "empty" in err.lower()
-
-    def test_no_dash_prefix(self):
-        valid, err = validate_flag_name("ngl")
-        assert valid is False
-        assert "start with" in err.lower()
-
-    def test_reserved_flag_m(self):
-        valid, err = validate_flag_name("-m")
-        assert valid is False
-        assert "Reserved" in err
-
-    def test_reserved_flag_o(self):
-        valid, err = validate_flag_name("-o")
-        assert valid is False
-        assert "Reserved" in err
-
-    @pytest.mark.parametrize("flag", ["-;inject", "-$var", "-flag name", "-a&b"])
-    def test_invalid_characters(self, flag):
+    @pytest.mark.parametrize("flag,error_substr", [
+        ("", "empty"),
+        ("ngl", "start with"),
+        ("-m", "Reserved"),
+        ("-o", "Reserved"),
+        ("--", "Invalid flag format"),
+        ("-;inject", "Invalid flag format"),
+        ("-$var", "Invalid flag format"),
+        ("-flag name", "Invalid flag format"),
+        ("-a&b", "Invalid flag format"),
+    ])
+    def test_invalid_flags(self, flag, error_substr):
         valid, err = validate_flag_name(flag)
         assert valid is False
-
-    def test_just_dashes(self):
-        valid, err = validate_flag_name("--")
-        assert valid is False
+        assert error_substr in err
 
 
 class TestValidateFlagValue:
@@ -106,18 +93,8 @@ class TestValidateServiceName:
         valid, err = validate_service_name(name)
         assert valid is True
 
-    def test_empty_name(self):
-        valid, err = validate_service_name("")
-        assert valid is False
-
-    def test_none_name(self):
-        valid, err = validate_service_name(None)
-        assert valid is False
-
-    def test_too_long(self):
-        valid, err = validate_service_name("a" * 101)
-        assert valid is False
-
-    def test_special_characters(self):
-        valid, err = validate_service_name("svc;drop table")
+    @pytest.mark.parametrize("name", ["", None, "a" * 101, "svc;drop table"],
+                             ids=["empty", "none", "too_long", "special_characters"])
+    def test_invalid_names(self, name):
+        valid, err = validate_service_name(name)
         assert valid is False
@@ -107,3 +107,111 @@ class TestAddServiceUsesValidation:
             config = compose_manager._load_services_db()
             config.pop("new-svc", None)
             compose_manager._save_services_db(config)
+
+
+class TestServicesDbCache:
+    def test_returned_dict_is_a_private_copy(self, compose_manager):
+        services = compose_manager._load_services_db()
+        services["test-svc"]["port"] = 9999
+        services.pop("test-svc")
+
+        assert compose_manager._load_services_db()["test-svc"]["port"] == 3301
+
+    def test_external_edit_is_picked_up(self, compose_manager):
+        compose_manager._load_services_db()
+        compose_manager.services_db_path.write_text(json.dumps({"other-svc": {}}))
+
+        assert list(compose_manager._load_services_db()) == ["other-svc"]
+
+    def test_save_refreshes_cache(self, compose_manager):
+        compose_manager.add_service_to_db("new-svc", {"template_type": "llamacpp"})
+
+        with patch("builtins.open", side_effect=AssertionError("re-read")):
+            assert "new-svc" in compose_manager._load_services_db()
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_parse_with_and_without_orjson(self, compose_manager, monkeypatch, use_orjson):
+        import compose_manager as cm
+
+        if not use_orjson:
+            monkeypatch.setattr(cm, "orjson", None)
+        assert compose_manager._load_services_db()["test-svc"]["port"] == 3301
+
+        compose_manager.services_db_path.write_text("{not json")
+        assert compose_manager._load_services_db() == {}
+
+    def test_get_service_copies_only_that_entry(self, compose_manager):
+        config = compose_manager.get_service_from_db("test-svc")
+        config["params"]["-c"] = "1"
+
+        assert compose_manager.get_service_from_db("test-svc")["params"] == {}
+        assert compose_manager.get_service_from_db("missing") is None
+
+
+class TestRenderCache:
+    def test_unchanged_config_is_not_rerendered(self, compose_manager):
+        config = compose_manager.get_service_from_db("test-svc")
+        first = compose_manager._render_service("test-svc", config)
+
+        with patch.object(
+            ComposeManager, "_render_service_uncached", side_effect=AssertionError("re-render")
+        ):
+            assert compose_manager._render_service("test-svc", dict(config)) == first
+
+    def test_changed_config_is_rerendered(self, compose_manager):
+        config = compose_manager.get_service_from_db("test-svc")
+        compose_manager._render_service("test-svc", config)
+
+        config["port"] = 3399
+        assert "3399" in compose_manager._render_service("test-svc", config)
+
+
+class TestPortIndex:
+    def test_service_on_port(self, compose_manager):
+        assert compose_manager.service_on_port(3301) == "test-svc"
+        assert compose_manager.service_on_port(3302) is None
+
+    def test_index_follows_db_writes(self, compose_manager):
+        config = compose_manager.get_service_from_db("test-svc")
+        config["port"] = 3305
+        compose_manager.update_service_in_db("test-svc", config)
+
+        assert compose_manager.service_on_port(3301) is None
+        assert compose_manager.service_on_port(3305) == "test-svc"
+
+    def test_used_ports_parsed_once_per_compose_file_version(self, compose_manager):
+        compose_manager.compose_path.write_text(
+            "services:\n  a:\n    ports:\n      - \"3301:8080\"\n"
+        )
+        assert compose_manager.get_used_ports() == {3301}
+        assert compose_manager.is_port_used(3301)
+
+        with patch.object(ComposeManager, "_read_compose", side_effect=AssertionError("re-read")):
+            used = compose_manager.get_used_ports()
+            used.add(3399)
+            assert compose_manager.get_used_ports() == {3301}
+
+    def test_validation_uses_cached_compose_index(self, compose_manager):
+        compose_manager.get_used_ports()
+
+        with patch.object(ComposeManager, "_read_compose", side_effect=AssertionError("re-read")):
+            assert compose_manager.validate_service_name("test-svc") == (
+                False, "Service 'test-svc' already exists"
+            )
+            assert compose_manager.validate_service_name("fresh-svc") == (True, None)
+            assert compose_manager.validate_port(3302) == (True, None)
+            assert not compose_manager.is_port_used(3302)
+
+
+class TestRebuildSkipsUnchangedFile:
+    @patch.object(ComposeManager, "_validate_compose_file")
+    def test_second_rebuild_is_a_noop(self, mock_validate, compose_manager):
+        mock_validate.return_value = {"valid": True, "error": None}
+        compose_manager.rebuild_compose_file()
+        assert mock_validate.call_count == 1
+        before = compose_manager.compose_path.read_text()
+
+        compose_manager.rebuild_compose_file()
+
+        assert mock_validate.call_count == 1
+        assert compose_manager.compose_path.read_text() == before
@@ -0,0 +1,76 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import docker_utils
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    created = []
+
+    def from_env():
+        client = MagicMock()
+        client.containers.list.return_value = []
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(docker_utils.docker, "from_env", from_env)
+    monkeypatch.setattr(docker_utils, "_docker_client", None)
+    monkeypatch.setattr(docker_utils, "get_compose_services", lambda: {"svc"})
+    return created
+
+
+def test_client_is_reused_across_calls(clients):
+    docker_utils.get_service_container("svc")
+    docker_utils.get_service_container("svc")
+    assert len(clients) == 1
+    assert clients[0].containers.list.call_count == 2
+
+
+def test_stale_connection_reconnects_once(clients):
+    docker_utils.get_service_container("svc")
+    clients[0].containers.list.side_effect = requests.exceptions.ConnectionError()
+
+    assert docker_utils.get_service_container("svc") is None
+    assert len(clients) == 2
+    clients[0].close.assert_called_once()
+    assert docker_utils._docker_client is clients[1]
+
+
+def test_service_containers_are_looked_up_in_one_call(clients, monkeypatch):
+    monkeypatch.setattr(docker_utils, "get_compose_services", lambda: {"a", "b"})
+    a = MagicMock(labels={"com.docker.compose.service": "a"})
+    other = MagicMock(labels={"com.docker.compose.service": "c"})
+    docker_utils.get_service_container("a")
+    clients[0].containers.list.reset_mock()
+    clients[0].containers.list.return_value = [a, other]
+
+    assert docker_utils.get_service_containers(["a", "b", "c"]) == {
+        "a": a, "b": None, "c": None,
+    }
+    assert clients[0].containers.list.call_count == 1
+
+
+def test_compose_file_is_parsed_once_per_version(tmp_path, monkeypatch):
+    compose = tmp_path / "docker-compose.yml"
+    compose.write_text("services:\n  a:\n    ports: ['3301:8080']\n  b: {}\n")
+    monkeypatch.setattr(docker_utils, "COMPOSE_FILE", str(compose))
+    parses = []
+    real_load = docker_utils.yaml.safe_load
+    monkeypatch.setattr(
+        docker_utils.yaml, "safe_load", lambda f: parses.append(1) or real_load(f)
+    )
+
+    assert docker_utils.get_compose_services() == {"a", "b"}
+    assert docker_utils.get_compose_service_ports() == {"a": 3301, "b": 9999}
+    assert len(parses) == 1
+
+    compose.write_text("services:\n  c:\n    ports: [3302]\n")
+    assert docker_utils.get_compose_service_ports() == {"c": 3302}
+    assert len(parses) == 2
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("DASHBOARD_TOKEN", "test-token")
+
+HDR = {"Authorization": "Bearer test-token"}
+
+
+@pytest.fixture
+def gpu_mod(monkeypatch):
+    import routes.gpu as mod
+
+    calls = []
+
+    def fake_stats():
+        calls.append(1)
+        return [{"index": 0, "name": "GPU", "call": len(calls)}]
+
+    monkeypatch.setattr(mod, "get_gpu_stats", fake_stats)
+    monkeypatch.setitem(mod._gpu_cache, "ts", 0.0)
+    monkeypatch.setitem(mod._gpu_cache, "data", None)
+    mod.calls = calls
+    return mod
+
+
+@pytest.fixture
+def client():
+    from app import create_app
+
+    app = create_app(config={"TESTING": True, "DASHBOARD_TOKEN": "test-token"})
+    return app.test_client()
+
+
+def test_gpu_stats_reuses_recent_result(gpu_mod, client):
+    first = client.get("/api/gpu", headers=HDR).get_json()
+    second = client.get("/api/gpu", headers=HDR).get_json()
+
+    assert len(gpu_mod.calls) == 1
+    assert first == second
+    assert first["timestamp"].endswith("Z")
+
+
+def test_gpu_stats_refreshes_after_ttl(gpu_mod, client, monkeypatch):
+    client.get("/api/gpu", headers=HDR)
+    monkeypatch.setitem(gpu_mod._gpu_cache, "ts", gpu_mod._gpu_cache["ts"] - gpu_mod._GPU_CACHE_TTL)
+
+    data = client.get("/api/gpu", headers=HDR).get_json()
+    assert len(gpu_mod.calls) == 2
+    assert data["gpus"][0]["call"] == 2
@@ -0,0 +1,61 @@
+import datetime
+import os
+import sys
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from json_provider import ORJSONProvider, orjson
+
+pytestmark = pytest.mark.skipif(orjson is None, reason="orjson not installed")
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+@pytest.fixture
+def providers(app):
+    fast, default = ORJSONProvider(app), DefaultJSONProvider(app)
+    fast.sort_keys = default.sort_keys = False
+    return fast, default
+
+
+def test_matches_default_provider(providers):
+    fast, default = providers
+    obj = {
+        "b": 1,
+        "a": [1.5, None, True, "é"],
+        "when": datetime.datetime(2026, 1, 2, 3, 4, 5),
+        3: "int key",
+    }
+    assert fast.loads(fast.dumps(obj)) == default.loads(default.dumps(obj))
+    assert list(fast.loads(fast.dumps(obj))) == ["b", "a", "when", "3"]
+
+
+def test_falls_back_for_wide_ints(providers):
+    fast, _ = providers
+    assert fast.loads(fast.dumps({"n": 2**70})) == {"n": 2**70}
+    # Not representable as a float: must round-trip as an exact int.
+    assert fast.loads(b'{"n": %d}' % (2**70 + 1)) == {"n": 2**70 + 1}
+
+
+def test_loads_accepts_what_the_stdlib_accepts(providers):
+    fast, default = providers
+    parsed = fast.loads('{"a": NaN, "b": Infinity, "c": 1e400}')
+    assert parsed["a"] != parsed["a"]
+    assert parsed["b"] == parsed["c"] == float("inf")
+    with pytest.raises(ValueError):
+        fast.loads("{not json")
+
+
+def test_response_is_compact_json_with_newline(app, providers):
+    fast, _ = providers
+    with app.app_context():
+        resp = fast.response({"logs": "line\n" * 3})
+    assert resp.mimetype == "application/json"
+    assert resp.get_data() == b'{"logs":"line\\nline\\nline\\n"}\n'
@@ -0,0 +1,392 @@
+import ctypes
+import errno
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import model_discovery
+from model_discovery import GenericModelDiscovery, HuggingFaceDiscovery, ModelDiscovery
+
+
+def _write_blob(blobs_dir, blob_hash, size):
+    blob = blobs_dir / blob_hash
+    blob.write_bytes(b"\0" * size)
+    return blob
+
+
+def _link(snapshot_dir, rel_name, blob):
+    link = snapshot_dir / rel_name
+    link.parent.mkdir(parents=True, exist_ok=True)
+    link.symlink_to(os.path.relpath(blob, link.parent))
+    return link
+
+
+@pytest.fixture
+def hf_cache(tmp_path):
+    """Build a small HuggingFace cache with file-based, directory-based and safetensors models."""
+    hub = tmp_path / "hub"
+
+    flat = hub / "models--org--flat"
+    (flat / "refs").mkdir(parents=True)
+    (flat / "refs" / "main").write_text("abc\n")
+    blobs = flat / "blobs"
+    blobs.mkdir()
+    snap = flat / "snapshots" / "abc"
+    snap.mkdir(parents=True)
+    _link(snap, "Model-Q4_K_M.gguf", _write_blob(blobs, "h-q4", 100))
+    _link(snap, "Model-Q8_0-00001-of-00002.gguf", _write_blob(blobs, "h-q8a", 200))
+    _link(snap, "Model-Q8_0-00002-of-00002.gguf", _write_blob(blobs, "h-q8b", 300))
+    _link(snap, "mmproj-model-f16.gguf", _write_blob(blobs, "h-mmproj", 50))
+
+    dirq = hub / "models--org--dirq"
+    (dirq / "refs").mkdir(parents=True)
+    (dirq / "refs" / "main").write_text("def")
+    blobs = dirq / "blobs"
+    blobs.mkdir()
+    snap = dirq / "snapshots" / "def"
+    snap.mkdir(parents=True)
+    _link(snap, "UD-Q6_K_XL/model-00001-of-00002.gguf", _write_blob(blobs, "d1", 400))
+    _link(snap, "UD-Q6_K_XL/model-00002-of-00002.gguf", _write_blob(blobs, "d2", 500))
+    _link(snap, "Q4_0/model.gguf", _write_blob(blobs, "d3", 60))
+
+    st = hub / "models--org--st"
+    (st / "refs").mkdir(parents=True)
+    (st / "refs" / "main").write_text("ghi")
+    blobs = st / "blobs"
+    blobs.mkdir()
+    snap = st / "snapshots" / "ghi"
+    snap.mkdir(parents=True)
+    _link(snap, "model.safetensors", _write_blob(blobs, "s1", 700))
+    _link(snap, "config.json", _write_blob(blobs, "s2", 10))
+
+    return hub
+
+
+def _by_key(models):
+    return {(m["name"], m.get("quantization")): m for m in models}
+
+
+class TestHuggingFaceDiscovery:
+    def test_file_based_quantizations_sum_shard_blobs(self, hf_cache):
+        models = _by_key(HuggingFaceDiscovery(hf_cache).discover())
+
+        q8 = models[("org/flat", "Q8_0")]
+        assert q8["quantization_type"] == "file"
+        assert q8["size"] == 500
+        assert [f["name"] for f in q8["files"]] == [
+            "Model-Q8_0-00001-of-00002.gguf",
+            "mmproj-model-f16.gguf",
+            "Model-Q8_0-00002-of-00002.gguf",
+        ]
+
+        blobs = hf_cache / "models--org--flat" / "blobs"
+        assert [f["actual_path"] for f in q8["files"]] == [
+            str(blobs / "h-q8a"),
+            str(blobs / "h-mmproj"),
+            str(blobs / "h-q8b"),
+        ]
+        assert q8["files"][1]["related"] is True
+
+        q4 = models[("org/flat", "Q4_K_M")]
+        assert q4["size"] == 100
+        assert q4["size_str"] == "100.00 B"
+
+    def test_directory_based_quantizations(self, hf_cache):
+        models = _by_key(HuggingFaceDiscovery(hf_cache).discover())
+
+        ud = models[("org/dirq", "UD-Q6_K_XL")]
+        assert ud["quantization_type"] == "directory"
+        assert ud["size"] == 900
+        assert [f["name"] for f in ud["files"]] == [
+            "model-00001-of-00002.gguf",
+            "model-00002-of-00002.gguf",
+        ]
+        assert models[("org/dirq", "Q4_0")]["size"] == 60
+
+        first = ud["files"][0]
+        snapshot = hf_cache / "models--org--dirq" / "snapshots" / "def"
+        assert first["path"] == str(snapshot / "UD-Q6_K_XL" / "model-00001-of-00002.gguf")
+        assert first["actual_path"] == str(hf_cache / "models--org--dirq" / "blobs" / "d1")
+        assert first["size"] == 400
+
+    def test_actual_path_resolves_symlinked_cache_dir(self, hf_cache, tmp_path):
+        linked_hub = tmp_path / "linked-hub"
+        linked_hub.symlink_to(hf_cache)
+        models = _by_key(HuggingFaceDiscovery(linked_hub).discover())
+
+        first = models[("org/dirq", "UD-Q6_K_XL")]["files"][0]
+        assert first["path"].startswith(str(linked_hub))
+        assert first["actual_path"] == str(hf_cache / "models--org--dirq" / "blobs" / "d1")
+
+    def test_safetensors_model_lists_snapshot_files(self, hf_cache):
+        models = _by_key(HuggingFaceDiscovery(hf_cache).discover())
+
+        st = models[("org/st", None)]
+        assert st["size"] == 713
+        assert [f["name"] for f in st["files"]] == ["model.safetensors"]
+        assert st["files"][0]["size"] == 700
+
+    def test_results_sorted_by_size_descending(self, hf_cache):
+        sizes = [m["size"] for m in HuggingFaceDiscovery(hf_cache).discover()]
+        assert sizes == sorted(sizes, reverse=True)
+
+    def test_dangling_blob_symlinks_are_skipped(self, hf_cache):
+        (hf_cache / "models--org--flat" / "blobs" / "h-q4").unlink()
+        models = _by_key(HuggingFaceDiscovery(hf_cache).discover())
+        assert ("org/flat", "Q4_K_M") not in models
+        assert models[("org/flat", "Q8_0")]["size"] == 500
+
+    def test_ref_to_missing_snapshot_lists_whole_model(self, hf_cache):
+        (hf_cache / "models--org--st" / "refs" / "main").write_text("gone")
+        models = _by_key(HuggingFaceDiscovery(hf_cache).discover())
+
+        st = models[("org/st", None)]
+        assert "files" not in st
+        assert st["size"] == 714
+
+    def test_missing_cache_dir_returns_empty(self, tmp_path):
+        assert HuggingFaceDiscovery(tmp_path / "nope").discover() == []
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    """Build a generic GGUF directory with a nested model, an mmproj sibling and a top-level file."""
+    base = tmp_path / "models"
+    nested = base / "vendor" / "vision"
+    nested.mkdir(parents=True)
+    (nested / "vision-Q4_K_M.gguf").write_bytes(b"\0" * 300)
+    (nested / "vision-Q8_0.gguf").write_bytes(b"\0" * 600)
+    (nested / "vision.mmproj").write_bytes(b"\0" * 40)
+    (nested / "README.md").write_text("ignored")
+    (base / "tiny.gguf").write_bytes(b"\0" * 10)
+    return base
+
+
+class TestGenericModelDiscovery:
+    def test_lists_each_gguf_with_mmproj_siblings(self, models_dir):
+        models = {m["name"]: m for m in GenericModelDiscovery(models_dir).discover()}
+
+        assert set(models) == {"vendor/vision/vision-Q4_K_M", "vendor/vision/vision-Q8_0", "tiny"}
+
+        q8 = models["vendor/vision/vision-Q8_0"]
+        assert q8["path"] == str(models_dir / "vendor" / "vision")
+        assert [f["name"] for f in q8["files"]] == ["vision-Q8_0.gguf", "vision.mmproj"]
+        assert q8["files"][1]["related"] is True
+        assert q8["size"] == 640
+        assert q8["source_path"] == str(models_dir)
+
+        assert models["tiny"]["files"][0]["path"] == str(models_dir / "tiny.gguf")
+        assert models["tiny"]["size"] == 10
+
+    def test_sorted_by_size_descending(self, models_dir):
+        sizes = [m["size"] for m in GenericModelDiscovery(models_dir).discover()]
+        assert sizes == [640, 340, 10]
+
+    def test_missing_dir_returns_empty(self, tmp_path):
+        assert GenericModelDiscovery(tmp_path / "nope").discover() == []
+
+
+class TestExtractQuantization:
+    @pytest.mark.parametrize(
+        "filename,expected",
+        [
+            ("Model-Q4_0.gguf", "Q4_0"),
+            ("Model-UD-Q6_K_XL.gguf", "UD-Q6_K_XL"),
+            ("Model-IQ3_XXS.gguf", "IQ3_XXS"),
+            ("model-q5_k_m.gguf", "Q5_K_M"),
+            ("Qwen2.5-7B-Instruct-Q8_0-00001-of-00002.gguf", "Q8_0"),
+            ("mmproj-model-f16.gguf", None),
+        ],
+    )
+    def test_extracts_tag(self, filename, expected):
+        assert HuggingFaceDiscovery(None)._extract_quantization_from_filename(filename) == expected
+
+
+class TestFormatSize:
+    @pytest.mark.parametrize(
+        "size,expected",
+        [
+            (0, "0.00 B"),
+            (1023, "1023.00 B"),
+            (1024, "1.00 KB"),
+            (1536, "1.50 KB"),
+            (5 * 1024**3, "5.00 GB"),
+            (2 * 1024**5, "2.00 PB"),
+            (2048 * 1024**5, "2048.00 PB"),
+        ],
+    )
+    def test_formats(self, size, expected):
+        assert model_discovery.format_size(size) == expected
+        assert ModelDiscovery(None).format_size(size) == expected
+
+
+class TestFastSize:
+    def test_matches_os_stat(self, tmp_path):
+        f = tmp_path / "blob"
+        f.write_bytes(b"x" * 1234)
+        assert model_discovery._fast_size(str(f)) == os.stat(f).st_size
+
+    def test_follows_symlinks(self, tmp_path):
+        f = tmp_path / "blob"
+        f.write_bytes(b"x" * 99)
+        link = tmp_path / "link"
+        link.symlink_to(f)
+        assert model_discovery._fast_size(str(link)) == 99
+
+    def test_missing_file_raises_file_not_found(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            model_discovery._fast_size(str(tmp_path / "missing"))
+
+    def test_falls_back_to_os_stat_without_statx(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(model_discovery, "_libc_statx", False)
+        f = tmp_path / "blob"
+        f.write_bytes(b"x" * 7)
+        assert model_discovery._fast_size(str(f)) == 7
+
+    def test_statx_blocked_by_seccomp_falls_back_and_is_remembered(self, tmp_path, monkeypatch):
+        calls = []
+
+        def blocked_statx(*args):
+            calls.append(args)
+            ctypes.set_errno(errno.EPERM)
+            return -1
+
+        monkeypatch.setattr(model_discovery, "_libc_statx", blocked_statx)
+        f = tmp_path / "blob"
+        f.write_bytes(b"x" * 7)
+        assert model_discovery._fast_size(str(f)) == 7
+        assert model_discovery._fast_size(str(f)) == 7
+        assert len(calls) == 1
+        assert model_discovery._libc_statx is False
+
+
+class TestDiscoveryCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self, monkeypatch):
+        monkeypatch.setattr(model_discovery, "_discovery_cache", {})
+
+    def test_repeat_call_reuses_result(self, hf_cache):
+        first = model_discovery.discover_huggingface_models(str(hf_cache))
+        assert model_discovery.discover_huggingface_models(str(hf_cache)) is first
+
+    def test_fresh_bypasses_cache(self, hf_cache):
+        first = model_discovery.discover_huggingface_models(str(hf_cache))
+        fresh = model_discovery.discover_huggingface_models_fresh(str(hf_cache))
+        assert fresh is not first
+        assert fresh == first
+
+    def test_root_change_invalidates(self, models_dir):
+        first = model_discovery.discover_generic_models(str(models_dir))
+        (models_dir / "new.gguf").write_bytes(b"\0" * 5)
+        os.utime(models_dir, ns=(0, os.stat(models_dir).st_mtime_ns + 1_000_000))
+
+        second = model_discovery.discover_generic_models(str(models_dir))
+        assert len(second) == len(first) + 1
+
+    def test_ttl_expiry_invalidates(self, hf_cache, monkeypatch):
+        first = model_discovery.discover_huggingface_models(str(hf_cache))
+        monkeypatch.setattr(model_discovery, "_DISCOVERY_CACHE_TTL", 0)
+        assert model_discovery.discover_huggingface_models(str(hf_cache)) is not first
+
+
+class TestComputeModelSize:
+    MODEL = "/hf-cache/models--org--flat/snapshots/abc/Model-Q4_K_M.gguf"
+
+    @pytest.fixture(autouse=True)
+    def host_paths(self, hf_cache, monkeypatch):
+        monkeypatch.setattr(model_discovery, "_model_size_cache", {})
+        monkeypatch.setattr(
+            model_discovery, "_CONTAINER_PATH_MAP", [("/hf-cache/", str(hf_cache) + "/")]
+        )
+
+    def test_sums_snapshot_once_per_blob(self, hf_cache):
+        snap = hf_cache / "models--org--flat" / "snapshots" / "abc"
+        _link(snap, "alias.gguf", hf_cache / "models--org--flat" / "blobs" / "h-q4")
+        assert model_discovery.compute_model_size(self.MODEL, None) == (650, "650.00 B")
+
+    def test_unchanged_directory_is_not_rewalked(self, monkeypatch):
+        first = model_discovery.compute_model_size(self.MODEL, None)
+
+        def fail_walk(path):
+            raise AssertionError("model directory re-walked")
+
+        monkeypatch.setattr(model_discovery, "_walk_size", fail_walk)
+        assert model_discovery.compute_model_size(self.MODEL, None) == first
+
+    def test_concurrent_call_does_not_rewalk(self, monkeypatch):
+        started = threading.Event()
+        release = threading.Event()
+        walk_size = model_discovery._walk_size
+        walks = []
+
+        def slow_walk(path):
+            walks.append(path)
+            started.set()
+            release.wait(5)
+            return walk_size(path)
+
+        monkeypatch.setattr(model_discovery, "_walk_size", slow_walk)
+        results = []
+        t = threading.Thread(
+            target=lambda: results.append(model_discovery.compute_model_size(self.MODEL, None))
+        )
+        t.start()
+        assert started.wait(5)
+        assert model_discovery.compute_model_size(self.MODEL, None) == (None, None)
+        release.set()
+        t.join(5)
+
+        assert results == [(650, "650.00 B")]
+        assert len(walks) == 1
+        assert model_discovery.compute_model_size(self.MODEL, None) == (650, "650.00 B")
+        assert not model_discovery._model_size_inflight
+
+
+class TestSnapshotRefCache:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self, monkeypatch):
+        monkeypatch.setattr(model_discovery, "_snapshot_ref_cache", {})
+
+    def test_unchanged_ref_is_not_reread(self, hf_cache, monkeypatch):
+        model = hf_cache / "models--org--st"
+        discovery = HuggingFaceDiscovery(hf_cache)
+        assert discovery._get_active_snapshot(model) == model / "snapshots" / "ghi"
+
+        def fail_open(*args, **kwargs):
+            raise AssertionError("refs/main re-read")
+
+        monkeypatch.setattr("builtins.open", fail_open)
+        assert discovery._get_active_snapshot(model) == model / "snapshots" / "ghi"
+
+    def test_rewritten_ref_is_picked_up(self, hf_cache):
+        model = hf_cache / "models--org--st"
+        discovery = HuggingFaceDiscovery(hf_cache)
+        discovery._get_active_snapshot(model)
+
+        (model / "snapshots" / "jkl").mkdir()
+        refs_main = model / "refs" / "main"
+        refs_main.write_text("jkl")
+        os.utime(refs_main, ns=(0, os.stat(refs_main).st_mtime_ns + 1_000_000))
+
+        assert discovery._get_active_snapshot(model) == model / "snapshots" / "jkl"
+
+
+class TestDiscoverAllModels:
+    def test_merges_sources_by_size(self, hf_cache, models_dir, monkeypatch):
+        monkeypatch.setattr(model_discovery, "_discovery_cache", {})
+        monkeypatch.setattr(
+            model_discovery, "discover_huggingface_models",
+            lambda: model_discovery.discover_huggingface_models_fresh(str(hf_cache)),
+        )
+        monkeypatch.setattr(os.path, "expanduser", lambda p: str(models_dir) if p == "~/.cache/models" else p)
+
+        models = model_discovery.discover_all_models()
+
+        sizes = [m["size"] for m in models]
+        assert sizes == sorted(sizes, reverse=True)
+        assert {m["type"] for m in models} == {"huggingface", "generic"}
+        assert len(models) == 5 + 3
@@ -0,0 +1,447 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import struct
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("DASHBOARD_TOKEN", "test-token")
+
+import config
+import docker_utils
+import openwebui_integration as owu
+
+
+@pytest.fixture(autouse=True)
+def reset_url_cache():
+    owu._url_cache["ts"] = 0.0
+    yield
+    owu._url_cache["ts"] = 0.0
+
+
+def _create_webui_db(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE config (id INTEGER PRIMARY KEY, data JSON NOT NULL, "
+        "version INTEGER NOT NULL, created_at DATETIME, updated_at DATETIME)"
+    )
+    conn.execute(
+        "INSERT INTO config (id, data, version) VALUES (1, ?, 0)",
+        (json.dumps({"ui": {"default_locale": "en"}}),),
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def webui_db(tmp_path, monkeypatch):
+    """Provide a minimal Open WebUI webui.db and point the integration at it."""
+    db_path = tmp_path / "webui.db"
+    _create_webui_db(db_path)
+    monkeypatch.setattr(config, "OPENWEBUI_DB_PATH", str(db_path))
+    return db_path
+
+
+def _openai_section(db_path):
+    conn = sqlite3.connect(db_path)
+    (data,) = conn.execute("SELECT data FROM config WHERE id = 1").fetchone()
+    conn.close()
+    return json.loads(data)["openai"]
+
+
+def _wait_for_tasks(task_ids, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        tasks = [owu.get_openwebui_change_status(t) for t in task_ids]
+        if all(t["state"] in ("succeeded", "failed") for t in tasks):
+            return tasks
+        time.sleep(0.01)
+    raise AssertionError(f"tasks did not finish: {tasks}")
+
+
+def _register(service_name, engine, api_key):
+    """Register through the queue as the routes do; True if the task succeeded."""
+    (task,) = _wait_for_tasks([owu.queue_openwebui_change("add", service_name, engine, api_key)])
+    return task["state"] == "succeeded"
+
+
+def _unregister(service_name, engine):
+    (task,) = _wait_for_tasks([owu.queue_openwebui_change("remove", service_name, engine)])
+    return task["state"] == "succeeded"
+
+
+def test_add_registers_url_key_and_config(webui_db):
+    assert _register("llamacpp-a", "llamacpp", "key-a") is True
+    assert _register("vllm-b", "vllm", "key-b") is True
+
+    openai = _openai_section(webui_db)
+    assert openai["enable"] is True
+    assert openai["api_base_urls"] == ["http://llamacpp-a:8080/v1", "http://vllm-b:8000/v1"]
+    assert openai["api_keys"] == ["key-a", "key-b"]
+    assert set(openai["api_configs"]) == {"0", "1"}
+    assert openai["api_configs"]["1"]["auth_type"] == "bearer"
+
+
+def test_add_is_idempotent(webui_db):
+    _register("llamacpp-a", "llamacpp", "key-a")
+    assert _register("llamacpp-a", "llamacpp", "key-a") is True
+    assert _openai_section(webui_db)["api_base_urls"] == ["http://llamacpp-a:8080/v1"]
+
+
+def test_add_keeps_quotes_in_api_key_verbatim(webui_db):
+    _register("llamacpp-a", "llamacpp", "it's\"odd")
+    assert _openai_section(webui_db)["api_keys"] == ["it's\"odd"]
+
+
+def test_remove_reindexes_remaining_configs(webui_db):
+    for name in ("a", "b", "c"):
+        _register(f"llamacpp-{name}", "llamacpp", f"key-{name}")
+    conn = sqlite3.connect(webui_db)
+    (data,) = conn.execute("SELECT data FROM config WHERE id = 1").fetchone()
+    data = json.loads(data)
+    data["openai"]["api_configs"]["2"]["prefix_id"] = "third"
+    conn.execute(
+        "UPDATE config SET data = ?, updated_at = '2099-01-01 00:00:00' WHERE id = 1",
+        (json.dumps(data),),
+    )
+    conn.commit()
+    conn.close()
+
+    assert _unregister("llamacpp-b", "llamacpp") is True
+
+    openai = _openai_section(webui_db)
+    assert openai["api_base_urls"] == ["http://llamacpp-a:8080/v1", "http://llamacpp-c:8080/v1"]
+    assert openai["api_keys"] == ["key-a", "key-c"]
+    assert set(openai["api_configs"]) == {"0", "1"}
+    assert openai["api_configs"]["1"]["prefix_id"] == "third"
+
+
+def test_remove_unknown_service_is_noop(webui_db):
+    _register("llamacpp-a", "llamacpp", "key-a")
+    assert _unregister("llamacpp-zzz", "llamacpp") is True
+    assert _openai_section(webui_db)["api_base_urls"] == ["http://llamacpp-a:8080/v1"]
+
+
+def test_registered_urls_and_status(webui_db):
+    assert owu.get_openwebui_registered_urls() == frozenset()
+    _register("vllm-b", "vllm", "key-b")
+
+    urls = owu.get_openwebui_registered_urls()
+    assert urls == {"http://vllm-b:8000/v1"}
+    assert owu.get_openwebui_registered_urls() is urls
+    assert owu.is_service_registered_in_openwebui("vllm-b", "vllm") is True
+    assert owu.is_service_registered_in_openwebui("vllm-b", "llamacpp") is False
+
+
+def test_connection_is_reused_across_calls(webui_db):
+    _register("llamacpp-a", "llamacpp", "key-a")
+    conn = owu._conn
+    owu.get_openwebui_registered_urls()
+    _unregister("llamacpp-a", "llamacpp")
+    assert owu._conn is conn
+
+
+def test_failed_write_rolls_back(webui_db, monkeypatch):
+    def boom(cursor, config_id, openai_config):
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(owu, "_write_openai", boom)
+    assert _register("llamacpp-a", "llamacpp", "key-a") is False
+
+    monkeypatch.undo()
+    monkeypatch.setattr(config, "OPENWEBUI_DB_PATH", str(webui_db))
+    assert _register("llamacpp-a", "llamacpp", "key-a") is True
+
+
+def test_registered_set_is_cached_until_add(webui_db, monkeypatch):
+    _register("llamacpp-a", "llamacpp", "key-a")
+    assert owu.is_service_registered_in_openwebui("llamacpp-a", "llamacpp") is True
+
+    direct = MagicMock(side_effect=owu._get_registered_urls_direct)
+    monkeypatch.setattr(owu, "_get_registered_urls_direct", direct)
+    assert owu.is_service_registered_in_openwebui("llamacpp-a", "llamacpp") is True
+    assert owu.is_service_registered_in_openwebui("vllm-b", "vllm") is False
+    direct.assert_not_called()
+
+    _register("vllm-b", "vllm", "key-b")
+    assert owu.is_service_registered_in_openwebui("vllm-b", "vllm") is True
+    assert direct.call_count == 1
+
+
+def test_batch_add_writes_config_once(webui_db, monkeypatch):
+    _register("llamacpp-a", "llamacpp", "key-a")
+    write = MagicMock(side_effect=owu._write_openai)
+    monkeypatch.setattr(owu, "_write_openai", write)
+
+    assert owu._update_openai(
+        owu._apply_changes,
+        [
+            ("add", "http://llamacpp-a:8080/v1", "key-a"),
+            ("add", "http://vllm-b:8000/v1", "key-b"),
+            ("add", "http://llamacpp-c:8080/v1", "key-c"),
+        ],
+    ) is True
+
+    write.assert_called_once()
+    openai = _openai_section(webui_db)
+    assert openai["api_base_urls"] == [
+        "http://llamacpp-a:8080/v1",
+        "http://vllm-b:8000/v1",
+        "http://llamacpp-c:8080/v1",
+    ]
+    assert openai["api_keys"] == ["key-a", "key-b", "key-c"]
+    assert set(openai["api_configs"]) == {"0", "1", "2"}
+
+
+def test_connection_uses_wal(webui_db):
+    owu.get_openwebui_registered_urls()
+    assert owu._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert owu._conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert owu._conn.execute("PRAGMA cache_size").fetchone()[0] == -16000
+
+
+def test_write_preserves_other_config_sections(webui_db):
+    _register("llamacpp-a", "llamacpp", "key-a")
+    conn = sqlite3.connect(webui_db)
+    (data,) = conn.execute("SELECT data FROM config WHERE id = 1").fetchone()
+    conn.close()
+    assert json.loads(data)["ui"] == {"default_locale": "en"}
+
+
+def test_external_config_change_is_picked_up(webui_db):
+    _register("llamacpp-a", "llamacpp", "key-a")
+
+    # Open WebUI rewrites the row (and bumps updated_at) behind our back.
+    conn = sqlite3.connect(webui_db)
+    (data,) = conn.execute("SELECT data FROM config WHERE id = 1").fetchone()
+    data = json.loads(data)
+    data["openai"]["api_base_urls"].append("http://manual:9000/v1")
+    data["openai"]["api_keys"].append("manual-key")
+    conn.execute(
+        "UPDATE config SET data = ?, updated_at = '2099-01-01 00:00:00' WHERE id = 1",
+        (json.dumps(data),),
+    )
+    conn.commit()
+    conn.close()
+
+    _register("vllm-b", "vllm", "key-b")
+    assert _openai_section(webui_db)["api_base_urls"] == [
+        "http://llamacpp-a:8080/v1",
+        "http://manual:9000/v1",
+        "http://vllm-b:8000/v1",
+    ]
+
+
+def test_external_change_with_same_updated_at_is_picked_up(webui_db):
+    _register("llamacpp-a", "llamacpp", "key-a")
+
+    # updated_at only has second granularity in some writers; a change
+    # within the same second must still be seen.
+    conn = sqlite3.connect(webui_db)
+    conn.execute(
+        "UPDATE config SET data = json_set(data, '$.openai.api_base_urls[#]', "
+        "'http://manual:9000/v1') WHERE id = 1"
+    )
+    conn.commit()
+    conn.close()
+
+    _register("vllm-b", "vllm", "key-b")
+    assert _openai_section(webui_db)["api_base_urls"] == [
+        "http://llamacpp-a:8080/v1",
+        "http://manual:9000/v1",
+        "http://vllm-b:8000/v1",
+    ]
+
+
+def test_works_without_orjson(webui_db, monkeypatch):
+    monkeypatch.setattr(owu, "orjson", None)
+    _register("llamacpp-a", "llamacpp", "key-a")
+    owu._openai_state["json"] = None
+    assert owu.get_openwebui_registered_urls() == {"http://llamacpp-a:8080/v1"}
+
+
+class _FakeContainer:
+    """
+    Runs the helper script as a local process against a temp webui.db and
+    frames its output the way a non-TTY Docker exec socket does.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.procs = []
+
+    def exec_run(self, cmd, **_kwargs):
+        script = cmd[-1].replace("/app/backend/data/webui.db", str(self.db_path))
+        proc = subprocess.Popen(
+            [sys.executable, "-u", "-c", script],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        self.procs.append(proc)
+        ours, theirs = socket.socketpair()
+        send_lock = threading.Lock()
+
+        def pump_in():
+            try:
+                while data := theirs.recv(4096):
+                    proc.stdin.write(data)
+                    proc.stdin.flush()
+                proc.stdin.close()
+            except OSError:
+                pass  # the process was killed
+
+        def pump_out(stream_id, pipe):
+            for chunk in iter(lambda: pipe.read1(4096), b""):
+                with send_lock:
+                    theirs.sendall(struct.pack(">BxxxL", stream_id, len(chunk)) + chunk)
+            if stream_id == 1:
+                theirs.shutdown(socket.SHUT_WR)
+
+        for target, args in ((pump_in, ()), (pump_out, (1, proc.stdout)), (pump_out, (2, proc.stderr))):
+            threading.Thread(target=target, args=args, daemon=True).start()
+        return None, ours
+
+
+
+@pytest.fixture
+def helper_db(tmp_path, monkeypatch):
+    """webui.db that is only reachable through the in-container helper."""
+    db_path = tmp_path / "webui.db"
+    _create_webui_db(db_path)
+    monkeypatch.setattr(config, "OPENWEBUI_DB_PATH", None)
+    container = _FakeContainer(db_path)
+    client = MagicMock()
+    client.containers.get.return_value = container
+    monkeypatch.setattr(docker_utils, "_docker_client", client)
+    monkeypatch.setattr(owu, "_helper", None)
+    yield container
+    if owu._helper is not None:
+        owu._helper.close()
+    for proc in container.procs:
+        proc.kill()
+        proc.wait()
+
+
+def test_helper_add_remove_and_list(helper_db):
+    assert owu._update_openai(
+        owu._apply_changes,
+        [("add", "http://llamacpp-a:8080/v1", "it's\"odd"), ("add", "http://vllm-b:8000/v1", "key-b")],
+    ) is True
+    assert _register("vllm-b", "vllm", "key-b") is True
+    assert owu.get_openwebui_registered_urls() == {
+        "http://llamacpp-a:8080/v1",
+        "http://vllm-b:8000/v1",
+    }
+
+    assert _unregister("llamacpp-a", "llamacpp") is True
+    openai = _openai_section(helper_db.db_path)
+    assert openai["api_base_urls"] == ["http://vllm-b:8000/v1"]
+    assert openai["api_keys"] == ["key-b"]
+    assert set(openai["api_configs"]) == {"0"}
+
+    # One warm helper process served every call.
+    assert len(helper_db.procs) == 1
+
+
+def test_helper_is_restarted_after_it_exits(helper_db):
+    assert owu.get_openwebui_registered_urls() == frozenset()
+    helper_db.procs[0].kill()
+    helper_db.procs[0].wait()
+
+    assert _register("llamacpp-a", "llamacpp", "key-a") is True
+    assert len(helper_db.procs) == 2
+    assert _openai_section(helper_db.db_path)["api_base_urls"] == ["http://llamacpp-a:8080/v1"]
+
+
+def test_helper_put_conflicts_after_external_write(helper_db):
+    got = owu._helper_call({"op": "get"})
+    # Open WebUI changes the openai section without touching updated_at.
+    conn = sqlite3.connect(helper_db.db_path)
+    conn.execute(
+        "UPDATE config SET data = json_set(data, '$.openai', json('{\"enable\": false}')) "
+        "WHERE id = 1"
+    )
+    conn.commit()
+    conn.close()
+
+    put = owu._helper_call(
+        {"op": "put", "digest": got["digest"], "openai": {"api_base_urls": []}}
+    )
+    assert put == {"ok": False, "conflict": True}
+
+    got = owu._helper_call({"op": "get"})
+    assert got["openai"] == {"enable": False}
+    put = owu._helper_call(
+        {"op": "put", "digest": got["digest"], "openai": {"api_base_urls": []}}
+    )
+    assert put == {"ok": True}
+    assert _openai_section(helper_db.db_path) == {"api_base_urls": []}
+
+
+def test_queued_changes_are_batched(webui_db, monkeypatch):
+    monkeypatch.setattr(owu, "_QUEUE_BATCH_WINDOW", 0.5)
+    write = MagicMock(side_effect=owu._write_openai)
+    monkeypatch.setattr(owu, "_write_openai", write)
+
+    task_ids = [
+        owu.queue_openwebui_change("add", "llamacpp-a", "llamacpp", "key-a"),
+        owu.queue_openwebui_change("add", "vllm-b", "vllm", "key-b"),
+        owu.queue_openwebui_change("remove", "llamacpp-a", "llamacpp"),
+    ]
+    tasks = _wait_for_tasks(task_ids)
+
+    assert [t["state"] for t in tasks] == ["succeeded"] * 3
+    write.assert_called_once()
+    openai = _openai_section(webui_db)
+    assert openai["api_base_urls"] == ["http://vllm-b:8000/v1"]
+    assert openai["api_keys"] == ["key-b"]
+
+
+def test_queued_change_failure_is_reported(monkeypatch):
+    monkeypatch.setattr(owu, "_update_openai", MagicMock(return_value=None))
+    (task,) = _wait_for_tasks([owu.queue_openwebui_change("add", "llamacpp-a", "llamacpp", "k")])
+    assert task["state"] == "failed"
+    assert task["error"]
+    assert owu.get_openwebui_change_status("nope") is None
+
+
+def test_queued_changes_log_one_event_each_way(webui_db, caplog):
+    caplog.set_level(logging.INFO, logger=owu.logger.name)
+    _wait_for_tasks([
+        owu.queue_openwebui_change("add", "llamacpp-a", "llamacpp", "key-a"),
+        owu.queue_openwebui_change("remove", "llamacpp-a", "llamacpp"),
+    ])
+
+    events = [r for r in caplog.records if r.getMessage().startswith("openwebui.")]
+    assert sorted(r.getMessage().split()[0] for r in events) == [
+        "openwebui.register",
+        "openwebui.register.done",
+        "openwebui.unregister",
+        "openwebui.unregister.done",
+    ]
+    register, done = (
+        r for r in events if r.getMessage().split()[0].startswith("openwebui.register")
+    )
+    assert register.base_url == "http://llamacpp-a:8080/v1"
+    assert done.task_id == register.task_id
+    assert done.status == "ok"
+    assert done.elapsed_ms >= 0
+
+
+def test_failed_queued_change_logs_failed_done_event(webui_db, monkeypatch, caplog):
+    caplog.set_level(logging.INFO, logger=owu.logger.name)
+    monkeypatch.setattr(owu, "_update_openai", MagicMock(side_effect=RuntimeError("locked")))
+    _wait_for_tasks([owu.queue_openwebui_change("remove", "vllm-b", "vllm")])
+
+    (done,) = [r for r in caplog.records if r.getMessage().startswith("openwebui.unregister.done")]
+    assert done.status == "failed"
+    assert done.levelno == logging.ERROR
+    assert not any("=" * 60 in r.getMessage() for r in caplog.records)
@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import docker
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("DASHBOARD_TOKEN", "test-token")
+
+import docker_utils
+
+HDR = {"Authorization": "Bearer test-token"}
+
+
+@pytest.fixture(autouse=True)
+def set_env_vars():
+    os.environ["DASHBOARD_TOKEN"] = "test-token"
+
+
+@pytest.fixture
+def routes_mod(monkeypatch):
+    import routes.openwebui as mod
+
+    monkeypatch.setitem(mod._restart_status, "state", "idle")
+    monkeypatch.setitem(mod._restart_status, "error", None)
+    return mod
+
+
+@pytest.fixture
+def client():
+    from app import create_app
+
+    app = create_app(config={"TESTING": True, "DASHBOARD_TOKEN": "test-token"})
+    return app.test_client()
+
+
+def test_restart_returns_202_and_runs_in_background(routes_mod, client, monkeypatch):
+    release = threading.Event()
+    client_mock = MagicMock()
+    client_mock.containers.get.return_value.restart.side_effect = lambda **kw: release.wait(5)
+    monkeypatch.setattr(docker_utils, "_docker_client", client_mock)
+
+    resp = client.post("/api/openwebui/restart", headers=HDR)
+    assert resp.status_code == 202
+    assert client.get("/api/openwebui/restart/status", headers=HDR).get_json()["state"] == "running"
+
+    again = client.post("/api/openwebui/restart", headers=HDR)
+    assert again.status_code == 202
+    assert "already" in again.get_json()["message"]
+
+    release.set()
+    routes_mod._restart_executor.submit(lambda: None).result(5)
+    status = client.get("/api/openwebui/restart/status", headers=HDR).get_json()
+    assert status == {"state": "succeeded", "error": None}
+    client_mock.containers.get.assert_called_with("open-webui")
+
+
+def test_restart_failure_is_reported_in_status(routes_mod, client, monkeypatch):
+    client_mock = MagicMock()
+    client_mock.containers.get.side_effect = docker.errors.NotFound("no such container")
+    monkeypatch.setattr(docker_utils, "_docker_client", client_mock)
+
+    assert client.post("/api/openwebui/restart", headers=HDR).status_code == 202
+    routes_mod._restart_executor.submit(lambda: None).result(5)
+
+    status = client.get("/api/openwebui/restart/status", headers=HDR).get_json()
+    assert status["state"] == "failed"
+    assert "container not found" in status["error"]
+
+
+def test_register_is_queued_and_reported(client, monkeypatch):
+    import routes.openwebui as mod
+
+    mgr = MagicMock()
+    mgr.get_service_from_db.return_value = {"template_type": "llamacpp", "port": 3301, "api_key": "k"}
+    monkeypatch.setattr(mod, "ComposeManager", lambda *_a, **_k: mgr)
+    monkeypatch.setattr(mod, "is_service_registered_in_openwebui", lambda *_a: False)
+    queued = MagicMock(return_value="task-1")
+    monkeypatch.setattr(mod, "queue_openwebui_change", queued)
+    monkeypatch.setattr(
+        mod, "get_openwebui_change_status",
+        lambda task_id: {"task_id": task_id, "state": "succeeded"} if task_id == "task-1" else None,
+    )
+
+    resp = client.post("/api/services/llamacpp-a/register-openwebui", headers=HDR)
+    assert resp.status_code == 202
+    assert resp.get_json()["task_id"] == "task-1"
+    queued.assert_called_once_with("add", "llamacpp-a", "llamacpp", "k")
+
+    assert client.get("/api/openwebui/tasks/task-1", headers=HDR).get_json()["state"] == "succeeded"
+    assert client.get("/api/openwebui/tasks/other", headers=HDR).status_code == 404
@@ -336,3 +336,38 @@ class TestIterLogEvents:
         log_lines = [e[1] for e in events if e[0] == "log"]
         assert len(log_lines) == 2
         assert "broken" in log_lines[1]
+
+
+# ---------------------------------------------------------------------------
+# Non-streaming /logs endpoint
+# ---------------------------------------------------------------------------
+
+class TestLogsSnapshot:
+    def test_line_count_matches_log_lines(self, client):
+        container = _make_container(["a", "b", "c"])
+        with patch("routes.services.get_service_container", return_value=container):
+            r = client.get("/api/services/my-svc/logs", headers=_auth())
+        body = r.get_json()
+        assert body["logs"] == "a\nb\nc\n"
+        assert body["lines"] == 3
+
+    def test_empty_logs_have_zero_lines(self, client):
+        container = _make_container([])
+        with patch("routes.services.get_service_container", return_value=container):
+            r = client.get("/api/services/my-svc/logs", headers=_auth())
+        assert r.get_json()["lines"] == 0
+
+    def test_text_format_streams_chunks(self, client):
+        container = _make_container([], follow_chunks=[b"a\n", b"b\n"])
+        with patch("routes.services.get_service_container", return_value=container):
+            r = client.get("/api/services/my-svc/logs?format=text&tail=5", headers=_auth())
+            assert r.is_streamed
+            assert r.mimetype == "text/plain"
+            assert r.get_data() == b"a\nb\n"
+        kwargs = container.logs.call_args.kwargs
+        assert kwargs["stream"] is True and kwargs["follow"] is False
+        assert kwargs["tail"] == 5
+
+    def test_unknown_format_rejected(self, client):
+        r = client.get("/api/services/my-svc/logs?format=xml", headers=_auth())
+        assert r.status_code == 400
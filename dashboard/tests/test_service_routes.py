@@ -0,0 +1,204 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("DASHBOARD_TOKEN", "test-token")
+
+HDR = {"Authorization": "Bearer test-token"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import routes.services as svc
+
+    compose = tmp_path / "docker-compose.yml"
+    compose.write_text(
+        "services:\n  open-webui:\n    image: open-webui\n"
+        "  # <<<<<<< BEGIN DYNAMIC\n  # >>>>>>> END DYNAMIC\n"
+        "networks:\n  llm-network:\n    driver: bridge\n"
+    )
+    base = {"template_type": "llamacpp", "model_path": "/m.gguf", "api_key": "k", "params": {}}
+    (tmp_path / "services.json").write_text(json.dumps({
+        "svc-a": {**base, "alias": "a", "port": 3310},
+        "svc-b": {**base, "alias": "b", "port": 3301},
+    }))
+    monkeypatch.setattr(svc, "COMPOSE_FILE", str(compose))
+    monkeypatch.setattr(svc.ComposeManager, "_validate_compose_file",
+                        lambda self, path: {"valid": True, "error": None})
+    monkeypatch.setattr(svc, "get_service_container",
+                        lambda name: SimpleNamespace(status="running"))
+    monkeypatch.setattr(svc, "get_service_containers",
+                        lambda names: {n: SimpleNamespace(status="running") for n in names})
+    run = MagicMock(return_value=SimpleNamespace(returncode=0, stderr=""))
+    monkeypatch.setattr(svc.subprocess, "run", run)
+
+    from app import create_app
+
+    app = create_app(config={"TESTING": True, "DASHBOARD_TOKEN": "test-token"})
+    client = app.test_client()
+    client.run = run
+    return client
+
+
+def test_swap_restarts_both_services_in_one_compose_call(client):
+    resp = client.post("/api/services/svc-a/set-public-port", headers=HDR)
+    assert resp.status_code == 200
+    data = resp.get_json()
+
+    assert client.run.call_count == 1
+    args = client.run.call_args.args[0]
+    assert args[-3:] == ["--force-recreate", "svc-a", "svc-b"]
+    assert data["restarts"] == [
+        {"service": "svc-a", "restarted": True},
+        {"service": "svc-b", "restarted": True},
+    ]
+
+
+def test_rename_moves_openwebui_registration_via_queue(client, monkeypatch):
+    import routes.services as svc
+
+    queued = []
+    monkeypatch.setattr(svc, "get_service_container", lambda name: None)
+    monkeypatch.setattr(svc, "is_service_registered_in_openwebui", lambda name, engine: True)
+    monkeypatch.setattr(
+        svc, "queue_openwebui_change", lambda *args: queued.append(args) or "task"
+    )
+
+    resp = client.post(
+        "/api/services/svc-a/rename", json={"new_name": "svc-c"}, headers=HDR
+    )
+
+    assert resp.status_code == 200
+    assert queued == [
+        ("remove", "svc-a", "llamacpp"),
+        ("add", "svc-c", "llamacpp", "k"),
+    ]
+
+
+def test_port_only_update_skips_full_validation(client, monkeypatch):
+    import routes.services as svc
+
+    full = MagicMock(return_value=(True, []))
+    monkeypatch.setattr(svc, "validate_service_config", full)
+    body = {"model_path": "/m.gguf", "alias": "a", "api_key": "k", "params": {}}
+
+    resp = client.put("/api/services/svc-a", json={**body, "port": 3320}, headers=HDR)
+    assert resp.status_code == 200
+    assert not full.called
+
+    resp = client.put("/api/services/svc-a", json={**body, "port": 80}, headers=HDR)
+    assert resp.status_code == 400
+    assert "between 1024 and 65535" in resp.get_json()["details"][0]
+
+    resp = client.put("/api/services/svc-a", json={**body, "port": 3320, "alias": "z"}, headers=HDR)
+    assert resp.status_code == 200
+    assert full.called
+
+
+def test_partial_port_update_still_requires_mandatory_fields(client):
+    resp = client.put("/api/services/svc-a", json={"port": 3320}, headers=HDR)
+
+    assert resp.status_code == 400
+    details = resp.get_json()["details"]
+    assert "Missing mandatory field: model_path" in details
+    assert "Missing mandatory field: alias" in details
+
+
+def test_blueprint_error_handlers_map_exceptions_to_json(client, monkeypatch):
+    import routes.services as svc
+
+    monkeypatch.setattr(svc, "get_service_container", lambda name: None)
+    resp = client.post(
+        "/api/services/svc-a/rename", json={"new_name": "x" * 64}, headers=HDR
+    )
+    assert resp.status_code == 400
+    assert "too long" in resp.get_json()["error"]
+
+    def boom(self, name):
+        raise RuntimeError("db unreadable")
+
+    monkeypatch.setattr(svc.ComposeManager, "get_service_from_db", boom)
+    resp = client.get("/api/services/svc-a/preview", headers=HDR)
+    assert resp.status_code == 500
+    assert resp.get_json() == {"error": "db unreadable"}
+
+    assert client.get("/api/services/svc-a/preview").status_code == 401
+
+
+def test_rebuild_failure_is_a_server_error(client, monkeypatch):
+    import routes.services as svc
+
+    def invalid(self):
+        raise ValueError("Generated compose file is invalid: bad yaml")
+
+    monkeypatch.setattr(svc.ComposeManager, "rebuild_compose_file", invalid)
+    resp = client.put(
+        "/api/services/svc-a",
+        json={"model_path": "/m.gguf", "alias": "a", "api_key": "k", "params": {}, "port": 3320},
+        headers=HDR,
+    )
+    assert resp.status_code == 500
+    assert resp.get_json() == {"error": "Generated compose file is invalid: bad yaml"}
+
+    monkeypatch.setattr(svc, "get_service_container", lambda name: None)
+    resp = client.post(
+        "/api/services/svc-b/rename", json={"new_name": "svc-c"}, headers=HDR
+    )
+    assert resp.status_code == 500
+
+
+def test_delete_removes_container_without_compose_cli(client, monkeypatch):
+    import routes.services as svc
+
+    container = MagicMock(status="running")
+    monkeypatch.setattr(svc, "get_service_container", lambda name: container)
+
+    resp = client.delete("/api/services/svc-a", headers=HDR)
+
+    assert resp.status_code == 200
+    container.stop.assert_called_once()
+    container.remove.assert_called_once_with(force=True)
+    assert not client.run.called
+
+
+def test_create_computes_model_size_in_background(client, monkeypatch):
+    import routes.services as svc
+
+    executor = MagicMock()
+    monkeypatch.setattr(svc, "_model_size_executor", executor)
+
+    resp = client.post("/api/services", json={
+        "template_type": "llamacpp", "port": 3320, "alias": "new",
+        "model_path": "/hf-cache/x.gguf",
+    }, headers=HDR)
+
+    assert resp.status_code == 201
+    executor.submit.assert_called_once_with(
+        svc.compute_model_size, "/hf-cache/x.gguf", None
+    )
+
+
+def test_noop_updates_skip_rebuild_and_restart(client, monkeypatch):
+    import config
+    import routes.services as svc
+
+    monkeypatch.setattr(config, "GLOBAL_API_KEY", "k")
+    rebuild = MagicMock()
+    monkeypatch.setattr(svc.ComposeManager, "rebuild_compose_file", rebuild)
+
+    resp = client.put("/api/services/svc-a/set-global-api-key", headers=HDR)
+    assert resp.status_code == 200
+    assert resp.get_json()["no_change"] is True
+
+    resp = client.put("/api/services/svc-a", json={"port": 3310}, headers=HDR)
+    assert resp.status_code == 200
+    assert resp.get_json()["no_change"] is True
+
+    assert not rebuild.called
+    assert not client.run.called
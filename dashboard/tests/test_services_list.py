@@ -0,0 +1,104 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("DASHBOARD_TOKEN", "test-token")
+
+HDR = {"Authorization": "Bearer test-token"}
+
+
+@pytest.fixture(autouse=True)
+def set_env_vars():
+    os.environ["DASHBOARD_TOKEN"] = "test-token"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import routes.services as svc
+
+    services = [
+        {"name": "a", "status": "running"},
+        {"name": "b", "status": "exited"},
+        {"name": "c", "status": "not-created"},
+    ]
+    calls = []
+    monkeypatch.setattr(
+        svc, "get_docker_services",
+        lambda: calls.append(1) or [dict(s) for s in services],
+    )
+    monkeypatch.setattr(svc, "get_openwebui_registered_urls", lambda: frozenset())
+    svc.invalidate_services_cache()
+    from app import create_app
+
+    app = create_app(config={"TESTING": True, "DASHBOARD_TOKEN": "test-token"})
+    client = app.test_client()
+    client.services = services
+    client.calls = calls
+    return client
+
+
+def test_list_services_counts(client):
+    resp = client.get("/api/services", headers=HDR)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert (data["total"], data["running"], data["stopped"]) == (3, 1, 2)
+    assert [s["name"] for s in data["services"]] == ["a", "b", "c"]
+
+
+def test_list_services_etag_revalidation(client):
+    import routes.services as svc
+
+    first = client.get("/api/services", headers=HDR)
+    etag = first.headers["ETag"]
+
+    cached = client.get("/api/services", headers={**HDR, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    client.services[1]["status"] = "running"
+    svc.invalidate_services_cache()
+    changed = client.get("/api/services", headers={**HDR, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["running"] == 2
+
+
+def test_list_services_is_cached_until_invalidated(client):
+    import routes.services as svc
+
+    first = client.get("/api/services", headers=HDR)
+    client.get("/api/services", headers=HDR)
+    assert len(client.calls) == 1
+    assert svc._services_list_encoded["entry"][1] == first.data
+
+    client.get("/api/services?fresh=1", headers=HDR)
+    assert len(client.calls) == 2
+
+    svc.invalidate_services_cache({"service_name": "a", "status": "exited"})
+    client.get("/api/services", headers=HDR)
+    assert len(client.calls) == 3
+
+    client.post("/api/services/a/favorite", json={"favorite": True}, headers=HDR)
+    client.get("/api/services", headers=HDR)
+    assert len(client.calls) == 4
+
+
+def test_flag_metadata_is_encoded_once_and_revalidates(client):
+    import routes.services as svc
+
+    svc._flag_metadata_bodies.clear()
+    first = client.get("/api/flag-metadata/vllm", headers=HDR)
+    assert first.status_code == 200
+    data = first.get_json()
+    assert data["template_type"] == "vllm"
+    assert data["optional_flags"]
+    assert list(svc._flag_metadata_bodies) == ["vllm"]
+    assert first.headers["Cache-Control"] == "private, max-age=3600"
+
+    cached = client.get(
+        "/api/flag-metadata/vllm", headers={**HDR, "If-None-Match": first.headers["ETag"]}
+    )
+    assert cached.status_code == 304
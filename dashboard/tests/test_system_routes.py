@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("DASHBOARD_TOKEN", "test-token")
+
+
+@pytest.fixture
+def system_mod(monkeypatch):
+    import routes.system as mod
+
+    calls = []
+    monkeypatch.setattr(mod, "check_docker", lambda: calls.append("docker") or True)
+    monkeypatch.setattr(mod, "check_nvidia_smi", lambda: calls.append("nvidia") or False)
+    monkeypatch.setitem(mod._health_cache, "ts", 0.0)
+    monkeypatch.setitem(mod._health_cache, "data", None)
+    monkeypatch.setattr(mod, "calls", calls, raising=False)
+    return mod
+
+
+@pytest.fixture
+def client():
+    from app import create_app
+
+    app = create_app(config={"TESTING": True, "DASHBOARD_TOKEN": "test-token"})
+    return app.test_client()
+
+
+def test_health_reuses_recent_probe_results(system_mod, client):
+    first = client.get("/api/health").get_json()
+    client.get("/api/health")
+
+    assert (first["docker_available"], first["nvidia_available"]) == (True, False)
+    assert system_mod.calls == ["docker", "nvidia"]
+
+
+def test_health_reprobes_after_ttl(system_mod, client, monkeypatch):
+    client.get("/api/health")
+    monkeypatch.setitem(
+        system_mod._health_cache, "ts", system_mod._health_cache["ts"] - system_mod._HEALTH_CACHE_TTL
+    )
+    client.get("/api/health")
+
+    assert system_mod.calls == ["docker", "nvidia", "docker", "nvidia"]
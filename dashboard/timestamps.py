@@ -0,0 +1,8 @@
+"""Timestamp formatting shared by the API blueprints."""
+
+from datetime import datetime, timezone
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as ISO 8601 with a Z suffix, e.g. 2026-05-03T00:00:01.123456Z."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")